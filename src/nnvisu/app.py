@@ -1,12 +1,17 @@
+import argparse
 import asyncio
 import importlib.resources
 import logging
 import os
+from concurrent.futures import Executor
 from pathlib import Path
 
 import tornado.web
 
-from nnvisu.handlers import NeuralWebSocket
+from nnvisu.handlers import NeuralWebSocket, SessionDataHandler, SessionMapHandler
+from nnvisu.logic.backends import TrainingBackend, ThreadBackend, create_backend
+from nnvisu.logic.render import create_render_executor
+from nnvisu.logic.session import SessionRegistry
 
 # Configure logging
 logging.basicConfig(
@@ -15,7 +20,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def make_app() -> tornado.web.Application:
+def make_app(
+    backend: TrainingBackend | None = None,
+    render_executor: Executor | None = None,
+    map_size: int | None = None,
+    adaptive_render: bool = False,
+    data_dir: str | None = None,
+    data_dir_size: int | None = None
+) -> tornado.web.Application:
+    # A single backend instance and render pool are shared by all connections
+    if backend is None:
+        backend = ThreadBackend()
+    if render_executor is None:
+        render_executor = create_render_executor()
+    sessions = SessionRegistry()
+
     try:
         # Use importlib.resources to locate the static files within the package
         static_path_traversable = importlib.resources.files("nnvisu").joinpath("static")
@@ -32,18 +51,103 @@ def make_app() -> tornado.web.Application:
         static_path = Path(os.path.dirname(__file__)) / "static"
 
     return tornado.web.Application([
-        (r"/ws", NeuralWebSocket),
+        (r"/ws", NeuralWebSocket, {
+            "backend": backend,
+            "render_executor": render_executor,
+            "map_size": map_size,
+            "adaptive_render": adaptive_render,
+            "sessions": sessions
+        }),
+        (r"/api/session/([0-9a-f-]+)/map", SessionMapHandler, {
+            "sessions": sessions,
+            "render_executor": render_executor,
+            "map_size": map_size,
+            "adaptive_render": adaptive_render
+        }),
+        (r"/api/session/([0-9a-f-]+)/data", SessionDataHandler, {
+            "sessions": sessions,
+            "data_dir": Path(data_dir) if data_dir else None,
+            "max_data_bytes": data_dir_size << 20 if data_dir_size else None
+        }),
         (r"/(.*)", tornado.web.StaticFileHandler, {
             "path": str(static_path), # Convert to string for Tornado compatibility
             "default_filename": "index.html"
         }),
     ])
 
-async def main() -> None:
-    app = make_app()
-    app.listen(8888)
-    logger.info("Server started on http://localhost:8888")
-    await asyncio.Event().wait()
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="nnvisu", description="Neural network training visualizer"
+    )
+    parser.add_argument("--port", type=int, default=8888, help="HTTP port to listen on")
+    parser.add_argument(
+        "--backend", choices=["thread", "process", "scheduler"], default="thread",
+        help="Where training loops run: per-session threads, pooled worker processes "
+             "or a shared fair-share scheduler"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Scheduler worker threads (default: number of CPU cores)"
+    )
+    parser.add_argument(
+        "--max-training-sessions", type=int, default=8,
+        help="Scheduler limit of concurrently training sessions; others are queued"
+    )
+    parser.add_argument(
+        "--batch-sessions", action="store_true",
+        help="Let the scheduler train sessions with identical architectures in one "
+             "batched pass"
+    )
+    parser.add_argument(
+        "--render-workers", type=int, default=None,
+        help="Threads rendering decision maps off the event loop (default: up to 4)"
+    )
+    parser.add_argument(
+        "--map-size", type=int, default=100,
+        help="Width and height of the decision map in pixels"
+    )
+    parser.add_argument(
+        "--adaptive-render", action="store_true",
+        help="Render maps with the quadtree renderer, refining only near decision "
+             "boundaries"
+    )
+    parser.add_argument(
+        "--data-dir", default=None,
+        help="Where imported datasets are stored as memory-mapped columns "
+             "(default: nnvisu-datasets in the temporary directory)"
+    )
+    parser.add_argument(
+        "--data-dir-size", type=int, default=None,
+        help="Total size in MB of the imported datasets kept in the data directory; "
+             "the least recently imported ones are deleted beyond it (default: 2048)"
+    )
+    return parser.parse_args(argv)
+
+async def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    options = {}
+    if args.backend == "scheduler":
+        options = {
+            "workers": args.workers,
+            "max_active": args.max_training_sessions,
+            "batch_sessions": args.batch_sessions
+        }
+    backend = create_backend(args.backend, **options)
+    render_executor = create_render_executor(args.render_workers)
+    app = make_app(
+        backend, render_executor, args.map_size, args.adaptive_render, args.data_dir,
+        args.data_dir_size
+    )
+    app.listen(args.port)
+    logger.info(
+        f"Server started on http://localhost:{args.port} "
+        f"(training backend: {backend.name})"
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        backend.shutdown()
+        render_executor.shutdown(wait=False)
 
 if __name__ == "__main__":
     asyncio.run(main())
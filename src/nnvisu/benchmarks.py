@@ -0,0 +1,268 @@
+"""
+Benchmarks for the server hot paths: training steps, map rendering, data
+generators and model serialization.
+
+Run with:
+
+    python -m nnvisu.benchmarks --output results.json \
+        --baseline benchmarks/baseline.json
+
+Results are written as JSON. When a baseline file is given, every case that
+became slower than `--tolerance` (relative) fails the run with exit code 1;
+a missing baseline file fails it with exit code 2. Use `--save-baseline` to
+record the baseline on the reference machine.
+"""
+import argparse
+import functools
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import torch
+
+from nnvisu.logic import generators
+from nnvisu.logic.dataset import Dataset
+from nnvisu.logic.engines import ENGINES, Model, create_model, create_trainer
+from nnvisu.logic.render import AdaptiveRenderContext, RenderContext
+from nnvisu.logic.trainer import StatelessTrainer
+from nnvisu.logic.weights import encode_weights
+from nnvisu.protocol import DataPoint
+
+Case = Callable[[], Any]
+
+def measure(func: Case, min_time: float = 0.2, repeats: int = 5) -> Dict[str, float]:
+    """
+    Median seconds per call of `func`, calibrated to run at least `min_time`
+    per repeat.
+    """
+    func()  # warm-up
+
+    # Calibrate the number of calls per repeat
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeats or number >= 1 << 20:
+            break
+        number *= 2
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+
+    return {
+        "seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        "calls": number * repeats
+    }
+
+def _random_points(n: int, num_classes: int = 2) -> List[DataPoint]:
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(-1, 1, size=(n, 2))
+    labels = rng.integers(0, num_classes, size=n)
+    return [
+        {"x": float(x), "y": float(y), "label": int(label)}
+        for (x, y), label in zip(coords, labels)
+    ]
+
+def training_cases(quick: bool) -> Dict[str, Case]:
+    architectures = [[10, 10], [50, 50]]
+    if not quick:
+        architectures.append([100] * 4)
+    batch_sizes = [0, 32]
+    dataset_sizes = [200] if quick else [200, 5000]
+
+    cases: Dict[str, Case] = {}
+    for engine in ENGINES:
+        for arch in architectures:
+            for n in dataset_sizes:
+                for batch_size in batch_sizes:
+                    model = create_model(engine, arch, output_dim=2)
+                    trainer = create_trainer(engine)
+                    tensors = Dataset.from_points(_random_points(n)).tensors()
+                    config = {
+                        "learningRate": 0.01,
+                        "optimizer": "adam",
+                        "batchSize": batch_size
+                    }
+                    name = (f"train_step/{engine}/arch={'-'.join(map(str, arch))}"
+                            f"/n={n}/batch={batch_size}")
+                    cases[name] = functools.partial(
+                        trainer.train_step_stateful, model, tensors, config
+                    )
+    return cases
+
+def render_cases(quick: bool) -> Dict[str, Case]:
+    resolutions = [50, 100] if quick else [50, 100, 200]
+    class_counts = [2, 8]
+
+    cases: Dict[str, Case] = {}
+    trainer = StatelessTrainer()
+    for num_classes in class_counts:
+        model = create_model("torch", [10, 10], output_dim=num_classes)
+        for size in resolutions:
+            suffix = f"{size}x{size}/classes={num_classes}"
+            big = f"{size * 4}x{size * 4}/classes={num_classes}"
+            # Uncached cost; generate_binary_map would only measure cache hits
+            cases[f"render/binary_map/{suffix}"] = functools.partial(
+                RenderContext(size, size).render, model
+            )
+            cases[f"render/adaptive_map/{big}"] = functools.partial(
+                AdaptiveRenderContext(size * 4, size * 4).render, model
+            )
+            cases[f"render/binary_map_cached/{suffix}"] = functools.partial(
+                trainer.generate_binary_map, model, size, size
+            )
+    return cases
+
+def generator_cases(quick: bool) -> Dict[str, Case]:
+    sample_sizes = [200, 20000] if quick else [200, 20000, 1000000]
+    cases: Dict[str, Case] = {}
+    for name, func in generators.GENERATORS.items():
+        for n in sample_sizes:
+            cases[f"generate/{name}/n={n}"] = functools.partial(
+                func, n_samples=n, n_classes=3
+            )
+    return cases
+
+def _state_dict_json(model: Model) -> Case:
+    return lambda: json.dumps(model.get_state_dict_as_list())
+
+def _state_dict_binary(model: Model, dtype: str) -> Case:
+    return lambda: encode_weights(model.get_state_dict_as_arrays(), dtype)
+
+def serialization_cases(quick: bool) -> Dict[str, Case]:
+    architectures = [[10, 10]] if quick else [[10, 10], [100] * 10]
+
+    cases: Dict[str, Case] = {}
+    for arch in architectures:
+        model = create_model("torch", arch, output_dim=2)
+        arch_name = '-'.join(map(str, arch))
+        cases[f"protocol/state_dict_json/arch={arch_name}"] = _state_dict_json(model)
+        for dtype in ("f32", "f16"):
+            cases[f"protocol/state_dict_binary/{dtype}/arch={arch_name}"] = (
+                _state_dict_binary(model, dtype)
+            )
+    return cases
+
+SUITES: Dict[str, Callable[[bool], Dict[str, Case]]] = {
+    "training": training_cases,
+    "render": render_cases,
+    "generators": generator_cases,
+    "protocol": serialization_cases,
+}
+
+def run(
+    suites: List[str], quick: bool = False, min_time: float = 0.2
+) -> Dict[str, Any]:
+    """Run the selected suites and return the machine-readable report."""
+    # Single-threaded torch keeps timings comparable between machines and runs
+    num_threads = torch.get_num_threads()
+    torch.set_num_threads(1)
+    torch.manual_seed(0)
+    np.random.seed(0)
+
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        for suite in suites:
+            for name, case in SUITES[suite](quick).items():
+                results[name] = measure(case, min_time=min_time)
+                micros = results[name]["seconds"] * 1e6
+                print(f"{name:<60} {micros:12.1f} us", file=sys.stderr)
+    finally:
+        torch.set_num_threads(num_threads)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+def compare(
+    report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Return a description of every case that is slower than the baseline allows."""
+    regressions = []
+    for name, current in report["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+        ratio = current["seconds"] / reference["seconds"]
+        if ratio > 1.0 + tolerance:
+            regressions.append(
+                f"{name}: {current['seconds'] * 1e6:.1f} us vs "
+                f"{reference['seconds'] * 1e6:.1f} us baseline ({ratio:.2f}x)"
+            )
+    return regressions
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m nnvisu.benchmarks", description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES),
+                        help="Suite to run (repeatable, default: all)")
+    parser.add_argument("--quick", action="store_true", help="Smaller parameter grid")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Minimum measuring time per case in seconds")
+    parser.add_argument("--output", type=Path,
+                        help="Write the JSON report to this file")
+    parser.add_argument("--baseline", type=Path,
+                        help="Baseline JSON report to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store the report as the new baseline instead of "
+                             "comparing")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown before a case counts as a "
+                             "regression")
+    args = parser.parse_args(argv)
+
+    report = run(args.suite or list(SUITES), quick=args.quick, min_time=args.min_time)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    if args.baseline is None:
+        if not args.output:
+            print(json.dumps(report, indent=2))
+        return 0
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not args.baseline.exists():
+        # A comparison was asked for; passing without one would hide regressions
+        print(f"Baseline {args.baseline} not found; record one with --save-baseline",
+              file=sys.stderr)
+        return 2
+
+    regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+    if regressions:
+        print("Performance regressions:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+    print("No regressions against the baseline", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,116 +1,187 @@
-import json
-import threading
+import struct
 import time
 import logging
-from typing import Any, Dict, cast, List
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Callable, Dict, cast, List, Optional
 
+import tornado.web
 import tornado.websocket
 import tornado.ioloop
 
 from nnvisu import __version__, __author__
-from nnvisu.logic.model import NeuralNetwork
-from nnvisu.logic.trainer import StatelessTrainer, StatefulTrainer
-from nnvisu.logic.session import TrainingSession
+from nnvisu.logic.backends import TrainingBackend, ThreadBackend
+from nnvisu.logic.engines import Model, create_model, create_trainer, normalize_engine
+from nnvisu.logic.frames import ENCODINGS, TICK_VERSION, FrameEncoder, encode_tick
+from nnvisu.logic.history import WeightHistory, copy_model, layer_dims
+from nnvisu.logic.importer import (
+    IMPORT_FORMATS, MAX_DATA_DIR_BYTES, default_data_dir, detect_format, import_dataset,
+    preview_points
+)
+from nnvisu.logic.dataset import Dataset
+from nnvisu.logic.render import (
+    DEFAULT_BOUNDS, FRAME_HEADER_SIZE, MAP_CACHE, Bounds, PIXEL_FORMAT_RGB,
+    PIXEL_FORMATS, FrameKey, RenderContext, create_render_context,
+    default_render_executor, encode_png, map_frame_key, model_version,
+    render_context_tag
+)
+from nnvisu.logic.trainer import PLATEAU_PAUSE, StatelessTrainer, StatefulTrainer
+from nnvisu.logic.session import SessionRegistry, TrainingSession
+from nnvisu.logic.weights import (
+    FRAME_TYPE_WEIGHTS, WEIGHT_DTYPES, decode_weights, encode_weights, state_dims
+)
 from nnvisu.protocol import (
-    GenerateDataRequest, DataPoint, TrainingPayload,
+    GenerateDataRequest, TrainingPayload,
     MSG_TYPE_START_TRAINING, MSG_TYPE_STOP_TRAINING, MSG_TYPE_RESET,
     MSG_TYPE_UPDATE_CONFIG, MSG_TYPE_GENERATE_DATA, MSG_TYPE_TRAIN_STEP,
     MSG_TYPE_UPDATE_DATA, MSG_TYPE_UPDATE_ARCHITECTURE, MSG_TYPE_ARCHITECTURE_SYNCED,
     MSG_TYPE_CONFIG, MSG_TYPE_STEP_RESULT, MSG_TYPE_DATA_GENERATED, MSG_TYPE_ERROR,
-    ArchitectureUpdateRequest
-)
-from nnvisu.logic.generators import (
-    generate_circles, generate_moons, generate_blobs,
-    generate_anisotropic, generate_varied_variance
+    MSG_TYPE_TRAINING_STATUS, MSG_TYPE_FRAME_FORMAT, MSG_TYPE_FRAME_ACK,
+    MSG_TYPE_REQUEST_KEYFRAME,
+    MSG_TYPE_SEEK, MSG_TYPE_VISIBILITY, MSG_TYPE_EDIT_POINTS, ArchitectureUpdateRequest,
+    ProtocolError, decode_message, encode_message
 )
+from nnvisu.logic.generators import GENERATORS, Columns
 
 logger = logging.getLogger(__name__)
 
+# Largest map side a seek request (or the HTTP map endpoint) may ask for
+MAX_SEEK_SIZE = 1024
+# Largest dataset generate_data may ask for (the browser keeps every point)
+MAX_GENERATED_SAMPLES = 100_000
+# Points of an imported dataset sent back for display
+MAX_PREVIEW_POINTS = 20_000
+# Frame pacing: binary frames the client may have outstanding before the
+# connection counts as congested, and the bounds of the adaptive interval
+MAX_PENDING_FRAMES = 2
+MIN_FRAME_INTERVAL = 1 / 30
+MAX_FRAME_INTERVAL = 1.0
+
 class NeuralWebSocket(tornado.websocket.WebSocketHandler): # type: ignore
-    def initialize(self) -> None:
+    def initialize(
+        self,
+        backend: TrainingBackend | None = None,
+        render_executor: Executor | None = None,
+        map_size: int | None = None,
+        adaptive_render: bool = False,
+        sessions: SessionRegistry | None = None
+    ) -> None:
         self.session = TrainingSession()
-        self.trainer = StatefulTrainer()
+        # Makes the session's map available over HTTP (SessionMapHandler)
+        self.sessions = sessions or SessionRegistry()
+        self.engine = normalize_engine(None)
+        self.trainer: StatefulTrainer = create_trainer(self.engine)
+        # Where the training loop runs (thread by default, see logic/backends.py)
+        self.backend = backend or ThreadBackend()
+        # Decision maps are rendered off the IOLoop, at most one per session at a time
+        self.render_executor = render_executor or default_render_executor()
+        self.render_in_flight = False
+        self.render_requested: Optional[Model] = None
+        # Reused frame buffers; only touched by the (single) in-flight render
+        # (the quadtree renderer makes large maps affordable, see render.py)
+        size = map_size or StatelessTrainer.GRID_WIDTH
+        self.adaptive_render = adaptive_render
+        self.render_context = create_render_context(
+            size, size, adaptive=adaptive_render
+        )
+        # Keyframe/delta encoding, set up once the client negotiates it (frame_format)
+        self.frame_encoder: Optional[FrameEncoder] = None
+        # Parameter encoding of binary weights frames, None for JSON (frame_format)
+        self.weights_dtype: Optional[str] = None
+        # Tick frame version (metrics, map and weights in one binary
+        # message), None for separate messages (frame_format)
+        self.tick_version: Optional[int] = None
+        # Weights frame waiting for the next tick's map
+        self.pending_weights: Optional[bytes] = None
+        # Weight snapshots for scrubbing through the run (seek); like live
+        # maps, at most one seek render is in flight and the latest request wins
+        self.history = WeightHistory()
+        self.seek_in_flight = False
+        self.seek_requested: Optional[tuple[int, int, int]] = None
+        # Frame pacing: frames written but not yet flushed to the client, the
+        # current interval between frames (follows how fast the client drains
+        # them) and whether the client's page is visible at all
+        self.pending_frames = 0
+        self.frame_interval = MIN_FRAME_INTERVAL
+        self.last_frame_time = 0.0
+        self.client_visible = True
         # Periodic callback for checking updates from the training thread
         self.callback = tornado.ioloop.PeriodicCallback(self.check_training_updates, 33) # ~30 FPS
         self.total_steps = 0
+        self.last_loss = 0.0
+        # Updates not sent yet (see flush_updates): metrics, the map and
+        # JSON weights of the latest training step
+        self.pending_metrics = False
+        self.map_dirty = False
+        self.model_dirty = False
         self.last_model_update_time = 0
         self.frame_counter = 0
         self.last_fps_log_time = time.time()
+        # Last (state, queue position) reported through training_status
+        self.training_status: tuple[str, int] | None = None
+        # Number of client-driven train_step calls, part of the model token
+        self.train_step_count = 0
 
     def check_origin(self, origin: str) -> bool:
         return True
 
     def open(self) -> None:
         logger.info("WebSocket opened")
+        self.sessions.register(self.session)
         # Start the update checker
         self.callback.start()
         
         # Send initial configuration and metadata
-        self.write_message(json.dumps({
+        self.write_message(encode_message({
             "type": MSG_TYPE_CONFIG,
             "payload": {
                 "version": __version__,
-                "author": __author__
+                "author": __author__,
+                "session_id": self.session.id
             }
         }))
 
     def check_training_updates(self) -> None:
         # Check for metric updates
         try:
+            # Let out-of-process backends publish their progress
+            self.backend.poll(self.session)
+            self.report_training_status()
+
+            # Datasets imported over HTTP (SessionDataHandler)
+            imported = self.session.take_import()
+            if imported is not None:
+                self._replace_data(imported)
+
             latest_metric = None
-            drained_count = 0
+            drained_steps = 0
             
             # Drain queue to get latest
             while not self.session.step_queue.empty():
                 try:
                     latest_metric = self.session.step_queue.get_nowait()
-                    drained_count += 1
+                    # A fused iteration reports several steps in one metric
+                    drained_steps += latest_metric.get("steps", 1)
                 except:
                     break
             
             if latest_metric:
-                self.total_steps += drained_count
-                
-                # 1. Quickly grab model and state under lock
+                self.total_steps += drained_steps
+                self.last_loss = latest_metric["loss"]
                 with self.session.lock:
                     model = self.session.model
-                    if not model:
-                        return
-                        
-                    # Throttle sending full model weights (JSON is heavy)
-                    now = time.time()
-                    model_state = None
-                    if now - self.last_model_update_time > 1.0: # Once per second
-                        model_state = model.get_state_dict_as_list()
-                        self.last_model_update_time = now
-
-                # 2. Perform expensive work (JSON/Binary map) OUTSIDE the lock
-                # This allows the training thread to continue uninterrupted.
-                # Minor tearing in the visualization is acceptable.
-                
-                # Send Metrics
-                self.write_message(json.dumps({
-                    "type": MSG_TYPE_STEP_RESULT,
-                    "model": model_state,
-                    "metrics": {
-                        "loss": latest_metric["loss"],
-                        "step": self.total_steps
-                    }
-                }))
-                
-                # Generate and send binary map (Computationally expensive)
-                width = StatelessTrainer.GRID_WIDTH
-                height = StatelessTrainer.GRID_HEIGHT
-                rgb_bytes = self.trainer.generate_binary_map(model, width, height)
-                
-                header = bytearray()
-                header.append(0x01) # TYPE: Map Update
-                header.extend(width.to_bytes(2, 'little'))
-                header.extend(height.to_bytes(2, 'little'))
-                
-                payload = header + rgb_bytes
-                self.write_message(bytes(payload), binary=True)
-                self.frame_counter += 1
+                    if model is not None:
+                        self.history.record(
+                            model, self.total_steps, self.last_loss,
+                            self.session.config.get("activation", "tanh")
+                        )
+                # Sent by flush_updates, possibly on a later check
+                self.pending_metrics = True
+                self.map_dirty = True
+                self.model_dirty = True
+
+            if self.pending_metrics or self.map_dirty or self.model_dirty:
+                self.flush_updates()
             
             # FPS Logging
             now = time.time()
@@ -126,20 +197,275 @@ class NeuralWebSocket(tornado.websocket.WebSocketHandler): # type: ignore
             logger.error(f"Update handler error: {e}", exc_info=True)
             pass
 
-    def on_message(self, message: str) -> None:
+    def flush_updates(self) -> None:
+        """
+        Send what changed since the last update: metrics, the map and the
+        weights. Anything that cannot go out yet (congested client, frame
+        not due, JSON weights throttled) stays pending and is retried on the
+        next check, so the last state before a stop or a plateau pause still
+        reaches the client.
+        """
+        if self.congested():
+            # The client has not taken the last frames yet; wait rather than
+            # buffer more (steps keep counting)
+            return
+
+        # 1. Quickly grab model and state under lock
+        with self.session.lock:
+            model = self.session.model
+            if not model:
+                return
+
+            frame_due = self.map_dirty and self.frame_due()
+            now = time.time()
+            model_state = None
+            weights_frame = None
+            if self.weights_dtype is not None:
+                # Binary weights go out with every map frame
+                self.model_dirty = False
+                if frame_due:
+                    weights_frame = encode_weights(
+                        model.get_state_dict_as_arrays(), self.weights_dtype,
+                        self.total_steps
+                    )
+            # Throttle sending full model weights (JSON is heavy) to once per
+            # second
+            elif self.model_dirty and now - self.last_model_update_time > 1.0:
+                model_state = model.get_state_dict_as_list()
+                self.last_model_update_time = now
+                self.model_dirty = False
+
+        # 2. Perform expensive work (JSON/Binary map) OUTSIDE the lock
+        # This allows the training thread to continue uninterrupted.
+        # Minor tearing in the visualization is acceptable.
+
+        # Send Metrics (tick clients get them with the map, unless
+        # JSON weights are due)
+        json_metrics = self.pending_metrics and self.tick_version is None
+        if json_metrics or model_state is not None:
+            self.write_message(encode_message({
+                "type": MSG_TYPE_STEP_RESULT,
+                "model": model_state,
+                "metrics": {
+                    "loss": self.last_loss,
+                    "step": self.total_steps
+                }
+            }))
+            self.pending_metrics = False
+
+        if weights_frame is not None:
+            if self.tick_version is not None:
+                self.pending_weights = weights_frame
+            else:
+                self.send_frame(weights_frame)
+
+        # Generate and send binary map (Computationally expensive),
+        # paced to what the client can take
+        if frame_due:
+            self.map_dirty = False
+            # Tick clients get the latest metrics with the rendered map
+            self.pending_metrics = False
+            self.request_map_render(model)
+        elif self.pending_metrics and self.tick_version is not None:
+            if not self.render_in_flight:
+                # Metrics only; these small ticks do not count for pacing
+                tick = encode_tick(self.total_steps, self.last_loss)
+                self.write_message(tick, binary=True)
+            # Otherwise the tick of the map in flight carries them
+            self.pending_metrics = False
+
+    def request_map_render(self, model: Model) -> None:
+        """
+        Render the decision map in the executor and send it when ready. While
+        a render is in flight, newer requests replace each other and only
+        the latest one runs afterwards.
+        """
+        if self.render_in_flight:
+            self.render_requested = model
+            return
+        self.render_in_flight = True
+        self.render_requested = None
+
+        future = tornado.ioloop.IOLoop.current().run_in_executor(
+            self.render_executor, self._render_map_frame,
+            self.trainer, model, self.render_context, self.frame_encoder
+        )
+        tornado.ioloop.IOLoop.current().add_future(future, self._on_map_rendered)
+
+    @staticmethod
+    def _render_map_frame(
+        trainer: StatelessTrainer,
+        model: Model,
+        context: RenderContext,
+        encoder: Optional[FrameEncoder]
+    ) -> Optional[bytes]:
+        # Runs in the render executor
+        frame = trainer.generate_map_frame(
+            model, context.width, context.height, context
+        )
+        if encoder is None:
+            return frame
+        data = memoryview(frame)[FRAME_HEADER_SIZE:]
+        return encoder.encode(data, context.width, context.height)
+
+    def congested(self) -> bool:
+        return self.pending_frames >= MAX_PENDING_FRAMES
+
+    def frame_due(self) -> bool:
+        """Whether to render a new map now: visible, not congested and paced."""
+        if not self.client_visible or self.congested():
+            return False
+        return time.monotonic() - self.last_frame_time >= self.frame_interval
+
+    def send_frame(self, frame: bytes) -> None:
+        """Write a binary frame and track when the client has taken it."""
+        started = time.monotonic()
+        future = self.write_message(frame, binary=True)
+        self.pending_frames += 1
+        self.last_frame_time = started
+        future.add_done_callback(lambda f: self._on_frame_written(f, started))
+
+    def _on_frame_written(self, future: Any, started: float) -> None:
+        self.pending_frames -= 1
+        if future.cancelled() or future.exception() is not None:
+            return
+        # Moving average of how long frames take to drain; a slow client
+        # gets fewer frames instead of a growing write buffer
+        elapsed = time.monotonic() - started
+        interval = 0.8 * self.frame_interval + 0.2 * elapsed
+        self.frame_interval = min(MAX_FRAME_INTERVAL, max(MIN_FRAME_INTERVAL, interval))
+
+    def _on_map_rendered(self, future: Any) -> None:
+        self.render_in_flight = False
+        try:
+            frame = future.result()
+            if self.tick_version is not None:
+                # The latest metrics go with the map (even when the delta
+                # encoder found nothing to send)
+                frame = encode_tick(
+                    self.total_steps, self.last_loss, frame, self.pending_weights
+                )
+                self.pending_weights = None
+            if frame is not None and self.ws_connection is not None:
+                self.send_frame(frame)
+                self.frame_counter += 1
+        except tornado.websocket.WebSocketClosedError:
+            return
+        except Exception as e:
+            logger.error(f"Map render error: {e}", exc_info=True)
+
+        if self.render_requested is not None and self.ws_connection is not None:
+            self.request_map_render(self.render_requested)
+
+    def request_seek(self, step: int, width: int, height: int) -> None:
+        """Render the snapshot closest to `step` in the executor and send it."""
+        if self.seek_in_flight:
+            self.seek_requested = (step, width, height)
+            return
+        self.seek_in_flight = True
+        self.seek_requested = None
+
+        future = tornado.ioloop.IOLoop.current().run_in_executor(
+            self.render_executor, self.history.render, step, width, height
+        )
+        tornado.ioloop.IOLoop.current().add_future(future, self._on_seek_rendered)
+
+    def _on_seek_rendered(self, future: Any) -> None:
+        self.seek_in_flight = False
+        try:
+            frame = future.result()
+            if frame is not None and self.ws_connection is not None:
+                self.send_frame(frame)
+        except tornado.websocket.WebSocketClosedError:
+            return
+        except Exception as e:
+            logger.error(f"History render error: {e}", exc_info=True)
+
+        if self.seek_requested is not None and self.ws_connection is not None:
+            self.request_seek(*self.seek_requested)
+
+    def report_training_status(self) -> None:
+        """
+        Tell the client when it is waiting for a training slot, when training
+        converged (and is throttled or paused) and when it runs normally again.
+        """
+        position = self.backend.queue_position(self.session) or 0
+        if position:
+            state = "queued"
+        elif not self.session.training_active:
+            state = "stopped"
+        elif self.session.converged:
+            # Plateau: "converged" keeps training at a low duty cycle, "paused" idles
+            paused = self.session.plateau_action() == PLATEAU_PAUSE
+            state = "paused" if paused else "converged"
+        else:
+            state = "running"
+
+        status = (state, position)
+        if status == self.training_status:
+            return
+        if self.training_status is None and state == "stopped":
+            # Nothing to report before training has ever started
+            self.training_status = status
+            return
+        self.training_status = status
+        self.write_message(encode_message({
+            "type": MSG_TYPE_TRAINING_STATUS,
+            "payload": {
+                "state": state,
+                "position": position
+            }
+        }))
+
+    def on_message(self, message: str | bytes) -> None:
         try:
-            # Handle binary messages? For now mostly JSON.
             if isinstance(message, str):
-                data = json.loads(message)
+                data = decode_message(message)
                 self.handle_message(data)
-        except json.JSONDecodeError:
-            logger.error("Invalid JSON received")
+            else:
+                self.handle_binary_message(message)
+        except ProtocolError as e:
+            # Malformed messages are rejected before any handler runs
+            logger.warning(f"Rejected message: {e}")
+            self.write_message(encode_message({
+                "type": MSG_TYPE_ERROR,
+                "message": str(e)
+            }))
         except Exception as e:
             logger.error(f"Error handling message: {e}", exc_info=True)
 
+    def handle_binary_message(self, message: bytes) -> None:
+        """Binary client messages: a weights frame replaces the model's parameters."""
+        if not message or message[0] != FRAME_TYPE_WEIGHTS:
+            logger.error(f"Unknown binary message type: {message[:1].hex()}")
+            return
+        try:
+            state, _ = decode_weights(message)
+        except (ValueError, struct.error) as e:
+            raise ProtocolError(f"Invalid weights frame: {e}")
+        with self.session.lock:
+            if not self.session.model:
+                self._init_default_model()
+            model = self.session.model
+            assert model is not None
+            # Parameters of other sizes would no longer match the architecture
+            # (or the optimizer state); the architecture changes through
+            # update_architecture only
+            dims, expected = state_dims(state), layer_dims(model)
+            if dims != expected:
+                raise ProtocolError(
+                    f"Weights frame has layer sizes {dims}, the model has {expected}"
+                )
+            model.load_state_dict_from_arrays(state)
+
     def handle_message(self, data: Dict[str, Any]) -> None:
         msg_type = data.get("type")
-        logger.info(f"Received message: {msg_type}")
+        # Acks, seeks and point edits arrive at frame rate / while scrubbing or drawing
+        if msg_type not in (
+            MSG_TYPE_FRAME_ACK, MSG_TYPE_SEEK, MSG_TYPE_VISIBILITY,
+            MSG_TYPE_EDIT_POINTS
+        ):
+            logger.info(f"Received message: {msg_type}")
 
         if msg_type == MSG_TYPE_START_TRAINING:
             self.handle_start_training()
@@ -164,6 +490,82 @@ class NeuralWebSocket(tornado.websocket.WebSocketHandler): # type: ignore
         elif msg_type == MSG_TYPE_UPDATE_DATA:
              # Implicit support for data updates
              self.handle_update_data(data)
+        elif msg_type == MSG_TYPE_EDIT_POINTS:
+            self.handle_edit_points(data)
+        elif msg_type == MSG_TYPE_FRAME_FORMAT:
+            self.handle_frame_format(data)
+        elif msg_type == MSG_TYPE_FRAME_ACK:
+            if self.frame_encoder is not None:
+                self.frame_encoder.ack(int(data.get("frame_id", 0)))
+        elif msg_type == MSG_TYPE_REQUEST_KEYFRAME:
+            if self.frame_encoder is not None:
+                self.frame_encoder.request_keyframe()
+        elif msg_type == MSG_TYPE_SEEK:
+            self.handle_seek(data)
+        elif msg_type == MSG_TYPE_VISIBILITY:
+            self.handle_visibility(data)
+
+    def handle_visibility(self, data: Dict[str, Any]) -> None:
+        """
+        Hidden pages get no map frames (training goes on); catch up when shown
+        again.
+        """
+        visible = bool(data.get("visible", True))
+        was_visible = self.client_visible
+        self.client_visible = visible
+        if visible and not was_visible:
+            model = self.session.model
+            if model is not None:
+                self.request_map_render(model)
+
+    def handle_seek(self, data: Dict[str, Any]) -> None:
+        """
+        Show a past training step; the map is re-rendered from its weight
+        snapshot.
+        """
+        context = self.render_context
+        width = min(MAX_SEEK_SIZE, max(1, int(data.get("width", context.width))))
+        height = min(MAX_SEEK_SIZE, max(1, int(data.get("height", context.height))))
+        self.request_seek(int(data.get("step", 0)), width, height)
+
+    def handle_frame_format(self, data: Dict[str, Any]) -> None:
+        """
+        Negotiate map frame encodings and the pixel format; without this,
+        raw 0x01 RGB frames are sent.
+        """
+        payload = data.get("payload", {})
+        requested = payload.get("encodings", [])
+        encodings = [name for name in ENCODINGS if name in requested]
+        pixel_format = payload.get("pixel_format", PIXEL_FORMAT_RGB)
+        if pixel_format not in PIXEL_FORMATS:
+            pixel_format = PIXEL_FORMAT_RGB
+
+        context = self.render_context
+        if pixel_format != context.pixel_format:
+            self.render_context = create_render_context(
+                context.width, context.height, self.adaptive_render, pixel_format
+            )
+        # Client-side colourized formats are only carried by keyframe/delta frames
+        if encodings or pixel_format != PIXEL_FORMAT_RGB:
+            self.frame_encoder = FrameEncoder(encodings, pixel_format)
+            accepted = self.frame_encoder.describe()
+        else:
+            self.frame_encoder = None
+            accepted = {"encodings": [], "pixel_format": PIXEL_FORMAT_RGB}
+
+        weights = payload.get("weights")
+        self.weights_dtype = weights if weights in WEIGHT_DTYPES else None
+        accepted["weights"] = self.weights_dtype
+        # Clients ask for the newest tick version they understand
+        tick = payload.get("tick")
+        supported = tick is not None and tick >= TICK_VERSION
+        self.tick_version = TICK_VERSION if supported else None
+        self.pending_weights = None
+        accepted["tick"] = self.tick_version
+        self.write_message(encode_message({
+            "type": MSG_TYPE_FRAME_FORMAT,
+            "payload": accepted
+        }))
 
     def handle_reset(self) -> None:
         was_active = self.session.training_active
@@ -175,7 +577,10 @@ class NeuralWebSocket(tornado.websocket.WebSocketHandler): # type: ignore
             self.handle_stop_training()
         
         self.total_steps = 0
+        self.last_loss = 0.0
+        self.pending_metrics = False
         self.session.reset_steps()
+        self.history.clear()
         
         logger.info("handle_reset: resetting steps and model")
         # Initialize default model
@@ -183,119 +588,187 @@ class NeuralWebSocket(tornado.websocket.WebSocketHandler): # type: ignore
         
         # Critical: Adapt the new model to existing data to prevent dimension mismatch
         with self.session.lock:
-            existing_data = self.session.data
-            if existing_data and self.session.model:
-                max_label = 0
-                for p in existing_data:
-                    lbl = p.get('label', 0)
-                    if lbl > max_label:
-                        max_label = lbl
-                required_dim = max(2, max_label + 1)
+            if len(self.session.dataset) and self.session.model:
+                required_dim = self.session.required_output_dim()
                 self.session.model.adapt_output_layer(required_dim)
         
         logger.info("handle_reset: reset complete (training stopped)")
 
     def handle_train_step(self, payload: TrainingPayload) -> None:
+        token = payload.get("version")
         config = payload.get("config")
         model_state = payload.get("model")
         data_points = payload.get("data")
 
-        if not config or not model_state or not data_points:
-             return
-
-        # Reconstruct Model logic similar to old implementation
-        # But here we update the session model
-        architecture = config.get("architecture", [10, 5])
-        activation = config.get("activation", "tanh")
-        dropout = config.get("dropout", 0.0)
-        
-        # We need to load state from payload into session model
-        # Create temp model to load state
-        # Detect old output dim
-        incoming_weights = cast(Dict[str, Any], model_state).get("weights", [])
-        old_output_dim = 2
-        if incoming_weights:
-            old_output_dim = len(incoming_weights[-1])
+        # A client that echoes the token of our previous reply continues from the
+        # live session model: no rebuild, no weight upload, optimizer state kept.
+        reuse = (token is not None and token == self._model_token() and
+                 self.session.model is not None)
+        if not reuse and (not config or not model_state or not data_points):
+            # Tell the client which token is live, so it can resync or resend everything
+            reason = "train_step needs config, model and data" if token is None else \
+                f"Stale or unknown version {token}; resend config, model and data"
+            self.write_message(encode_message({
+                "type": MSG_TYPE_ERROR,
+                "message": reason,
+                "version": self._model_token()
+            }))
+            return
+        config = config or {}
 
-        # Safely update session
         with self.session.lock:
-             # Create new model if needed or update existing
-             # Since payload has state, we should probably use it.
-             # But session model might be newer? 
-             # For legacy test, we assume payload is authoritative.
-             
-             model = NeuralNetwork(
-                hidden_layers=architecture, 
-                output_dim=old_output_dim,
-                activation=activation,
-                dropout=dropout
-             )
-             model.load_state_dict_from_list(cast(Dict[str, Any], model_state))
-             
-             # Adapt
-             max_label = 0
-             for p in data_points:
-                lbl = p.get('label', 0)
-                if lbl > max_label:
-                    max_label = lbl
-            
-             required_output_dim = max(2, max_label + 1)
-             model.adapt_output_layer(required_output_dim)
-             
-             self.session.set_model(model)
-             self.session.set_data(data_points)
+             if reuse:
+                 model = self.session.model
+                 assert model is not None
+                 structure_changed = False
+             else:
+                 model = self._build_model_from_payload(
+                     config, cast(Dict[str, Any], model_state)
+                 )
+                 structure_changed = True
+
+             if data_points:
+                 dataset = Dataset.from_points(data_points)
+                 self.session.set_data(dataset)
+                 # Adapt
+                 required_output_dim = dataset.required_output_dim()
+                 if model.output_dim != required_output_dim:
+                     model.adapt_output_layer(required_output_dim)
+                     structure_changed = True
+
+             if not reuse:
+                 self.session.set_model(model)
              self.session.update_config(config)
              
              # Run one step
              # We use the trainer on the main thread (blocking for a bit)
-             loss = self.trainer.train_step_stateful(model, data_points, config)
-             
-             updated_state = model.get_state_dict_as_list()
+             tensors = (self.session.data_x, self.session.data_y)
+             loss = self.trainer.train_step_stateful(
+                 model, tensors, self.session.config
+             )
+             self.train_step_count += 1
+
+             # Reused models only send weights back when asked to
+             return_model = payload.get("return_model", not reuse) or structure_changed
+             updated_state = model.get_state_dict_as_list() if return_model else None
 
         # Response
-        response = {
+        response: Dict[str, Any] = {
             "type": MSG_TYPE_STEP_RESULT,
-            "model": updated_state,
+            "version": self._model_token(),
             "metrics": {
                 "loss": loss,
                 "accuracy": 0.0
             }
         }
-        self.write_message(json.dumps(response))
+        if updated_state is not None:
+            response["model"] = updated_state
+        self.write_message(encode_message(response))
+
+    def _build_model_from_payload(
+        self, config: Dict[str, Any], model_state: Dict[str, Any]
+    ) -> Model:
+        """
+        Create a model from the architecture in config and load the client's
+        weights.
+        """
+        architecture = config.get("architecture", [10, 5])
+        activation = config.get("activation", "tanh")
+        dropout = config.get("dropout", 0.0)
+        
+        # Detect old output dim
+        incoming_weights = model_state.get("weights", [])
+        old_output_dim = 2
+        if incoming_weights:
+            old_output_dim = len(incoming_weights[-1])
+
+        model = self._create_model(
+            hidden_layers=architecture, 
+            output_dim=old_output_dim,
+            activation=activation,
+            dropout=dropout,
+            engine=config.get("engine")
+        )
+        model.load_state_dict_from_list(model_state)
+        return model
+
+    def _model_token(self) -> str:
+        """
+        Identify the live model state: session, model instance and train_step
+        count.
+        """
+        session = self.session
+        return f"{session.id}:{session.model_generation}:{self.train_step_count}"
 
     def handle_update_data(self, data: Dict[str, Any]) -> None:
         points = data.get("data", [])
         if points:
             # Atomic update of data and model adaptation to prevent race conditions
-            self._update_data_and_adapt_model(points)
-
-    def _update_data_and_adapt_model(self, data: List[DataPoint]) -> None:
-        # Determine required output dimension from data labels
-        max_label = 0
-        for p in data:
-            lbl = p.get('label', 0)
-            if lbl > max_label:
-                max_label = lbl
-        
-        required_output_dim = max(2, max_label + 1)
-        
+            self._replace_data(Dataset.from_points(points))
+
+    def handle_edit_points(self, data: Dict[str, Any]) -> None:
+        """
+        Apply point edits in place. Training keeps running unless the
+        number of classes changes, which needs a new output layer.
+        """
+        add = data.get("add", [])
+        remove = data.get("remove", [])
+        move = data.get("move", [])
+        restart = False
+        model = self.session.model
+        labels = [p.get("label", 0) for p in add]
+        labels += [p["label"] for p in move if p.get("label") is not None]
+        if self.session.training_active and (
+            model is None or any(label >= model.output_dim for label in labels)
+        ):
+            # Points of new classes must not reach the running loop before its
+            # model has outputs for them
+            self.handle_stop_training()
+            restart = True
+
+        error = None
+        try:
+            required_output_dim = self.session.edit_points(
+                add, remove, move, bool(data.get("clear", False))
+            )
+        except ValueError as e:
+            # Edits before the invalid one are kept; the model still has to fit them
+            error = e
+            required_output_dim = self.session.required_output_dim()
+        model = self.session.model
+        if model is None or model.output_dim != required_output_dim:
+            if self.session.training_active:
+                self.handle_stop_training()
+                restart = True
+            self._adapt_model(required_output_dim)
+        elif self.session.training_active:
+            self.backend.sync(self.session, self.trainer)
+        if restart:
+            self.handle_start_training()
+        if error is not None:
+            raise ProtocolError(str(error))
+
+    def _replace_data(self, dataset: Dataset) -> None:
         # Safely pause training if active
         was_active = self.session.training_active
         if was_active:
             self.handle_stop_training()
 
+        # Update data (and its cached tensors), then size the output layer
+        # for its labels
+        self.session.set_data(dataset)
+        self._adapt_model(self.session.required_output_dim())
+                 
+        if was_active:
+            self.handle_start_training()
+
+    def _adapt_model(self, output_dim: int) -> None:
         with self.session.lock:
-            # Update data while locked
-            self.session.data = data
-            
             if not self.session.model:
                 self._init_default_model()
             
             if self.session.model:
-                 self.session.model.adapt_output_layer(required_output_dim)
-                 
-        if was_active:
-            self.handle_start_training()
+                 self.session.model.adapt_output_layer(output_dim)
 
     def handle_start_training(self) -> None:
         if self.session.training_active:
@@ -309,27 +782,21 @@ class NeuralWebSocket(tornado.websocket.WebSocketHandler): # type: ignore
         self.session.stop_event.clear()
         self.session.training_active = True
         
-        # Spawn thread
-        t = threading.Thread(target=self.trainer.run_loop, args=(self.session,))
-        t.daemon = True
-        t.start()
-        self.session.training_thread = t
+        self.backend.start(self.session, self.trainer)
 
     def handle_stop_training(self) -> None:
         if not self.session.training_active:
             return
             
-        self.session.stop_event.set()
-        if self.session.training_thread:
-            self.session.training_thread.join(timeout=1.0)
-            
+        self.backend.stop(self.session, timeout=1.0)
         self.session.training_active = False
-        self.session.training_thread = None
 
     def handle_update_config(self, data: Dict[str, Any]) -> None:
         payload = data.get("payload", {})
         config = payload if payload else data.get("config", {})
         self.session.update_config(config)
+        if self.session.training_active:
+            self.backend.sync(self.session, self.trainer)
 
     def handle_update_architecture(self, data: Dict[str, Any]) -> None:
         """Handle structural changes to the neural network."""
@@ -337,6 +804,9 @@ class NeuralWebSocket(tornado.websocket.WebSocketHandler): # type: ignore
         hidden_layers = payload.get("hidden_layers")
         activation = payload.get("activation", "tanh")
         dropout = payload.get("dropout", 0.0)
+        engine = normalize_engine(
+            payload.get("engine", self.session.config.get("engine"))
+        )
 
         if hidden_layers is None:
             return
@@ -358,22 +828,15 @@ class NeuralWebSocket(tornado.websocket.WebSocketHandler): # type: ignore
             self.session.update_config({
                 "architecture": hidden_layers,
                 "activation": activation,
-                "dropout": dropout
+                "dropout": dropout,
+                "engine": engine
             })
             
             # Re-create model from scratch (T007)
             # We need output_dim from current data
-            existing_data = self.session.data
-            max_label = 0
-            if existing_data:
-                for p in existing_data:
-                    lbl = p.get('label', 0)
-                    if lbl > max_label:
-                        max_label = lbl
+            required_output_dim = self.session.required_output_dim()
             
-            required_output_dim = max(2, max_label + 1)
-            
-            new_model = NeuralNetwork(
+            new_model = self._create_model(
                 hidden_layers=hidden_layers,
                 output_dim=required_output_dim,
                 activation=activation,
@@ -382,9 +845,10 @@ class NeuralWebSocket(tornado.websocket.WebSocketHandler): # type: ignore
             self.session.set_model(new_model)
             self.total_steps = 0
             self.session.reset_steps()
+            self.history.clear()
 
         # Notify client that architecture is synced
-        self.write_message(json.dumps({
+        self.write_message(encode_message({
             "type": MSG_TYPE_ARCHITECTURE_SYNCED,
             "payload": {
                 "status": "success",
@@ -398,39 +862,53 @@ class NeuralWebSocket(tornado.websocket.WebSocketHandler): # type: ignore
         # So we leave it stopped.
 
     def handle_generate_data(self, payload: GenerateDataRequest) -> None:
+        """Generate a dataset in the executor; the loop only swaps it in."""
         dist_type = payload.get("distribution")
-        num_classes = payload.get("num_classes", 2)
-        
-        try:
-            data: List[DataPoint] = []
-            if dist_type == "circles":
-                data = generate_circles(n_classes=num_classes)
-            elif dist_type == "moons":
-                data = generate_moons(n_classes=num_classes)
-            elif dist_type == "blobs":
-                data = generate_blobs(n_classes=num_classes)
-            elif dist_type == "anisotropic":
-                data = generate_anisotropic(n_classes=num_classes)
-            elif dist_type == "varied_variance":
-                data = generate_varied_variance(n_classes=num_classes)
-            else:
-                self.write_message(json.dumps({
-                    "type": MSG_TYPE_ERROR,
-                    "message": f"Unknown distribution type: {dist_type}"
-                }))
-                return
-            
-            self._update_data_and_adapt_model(data)
-            
-            self.write_message(json.dumps({
-                "type": MSG_TYPE_DATA_GENERATED,
-                "data": data
+        generator = GENERATORS.get(dist_type) if isinstance(dist_type, str) else None
+        if generator is None:
+            self.write_message(encode_message({
+                "type": MSG_TYPE_ERROR,
+                "message": f"Unknown distribution type: {dist_type}"
             }))
+            return
+
+        n_samples = min(MAX_GENERATED_SAMPLES, max(1, payload.get("n_samples", 200)))
+        future = tornado.ioloop.IOLoop.current().run_in_executor(
+            None, self._generate_points, generator, n_samples,
+            payload.get("num_classes", 2), payload.get("seed")
+        )
+        tornado.ioloop.IOLoop.current().add_future(future, self._on_data_generated)
+
+    @staticmethod
+    def _generate_points(
+        generator: Callable[..., Columns],
+        n_samples: int,
+        num_classes: int,
+        seed: Optional[int]
+    ) -> tuple[Dataset, bytes]:
+        # Runs in the executor, including building the reply
+        xy, labels = generator(n_samples=n_samples, n_classes=num_classes, seed=seed)
+        dataset = Dataset.from_arrays(xy, labels)
+        # With their point ids, for later edit_points messages
+        message = encode_message({
+            "type": MSG_TYPE_DATA_GENERATED,
+            "data": dataset.to_points()
+        })
+        return dataset, message
+
+    def _on_data_generated(self, future: Any) -> None:
+        if self.ws_connection is None:
+            return
+        try:
+            dataset, message = future.result()
         except Exception as e:
-            self.write_message(json.dumps({
+            self.write_message(encode_message({
                 "type": MSG_TYPE_ERROR,
                 "message": f"Error generating data: {str(e)}"
             }))
+            return
+        self._replace_data(dataset)
+        self.write_message(message)
 
     def _init_default_model(self) -> None:
         config = self.session.config
@@ -438,7 +916,7 @@ class NeuralWebSocket(tornado.websocket.WebSocketHandler): # type: ignore
         activation = config.get("activation", "tanh")
         dropout = config.get("dropout", 0.0)
         
-        model = NeuralNetwork(
+        model = self._create_model(
             hidden_layers=hidden_layers, 
             output_dim=2, 
             activation=activation,
@@ -446,7 +924,235 @@ class NeuralWebSocket(tornado.websocket.WebSocketHandler): # type: ignore
         )
         self.session.set_model(model)
 
+    def _create_model(
+        self,
+        hidden_layers: List[int],
+        output_dim: int,
+        activation: str,
+        dropout: float,
+        engine: str | None = None
+    ) -> Model:
+        """Create a model for the session's engine, switching trainers if needed."""
+        engine = normalize_engine(engine or self.session.config.get("engine"))
+        if engine != self.engine:
+            # Optimizer state belongs to the trainer, so a new engine needs a new one
+            self.engine = engine
+            self.trainer = create_trainer(engine)
+        return create_model(engine, hidden_layers, output_dim, activation, dropout)
+
     def on_close(self) -> None:
         print("WebSocket closed")
+        self.sessions.unregister(self.session)
         self.handle_stop_training()
-        self.callback.stop()
\ No newline at end of file
+        self.callback.stop()
+
+class SessionMapHandler(tornado.web.RequestHandler): # type: ignore
+    """
+    GET /api/session/<id>/map: the decision map of a connected session.
+
+    Query arguments: `w`, `h` (size in pixels), `x0`, `x1`, `y0`, `y1` (the
+    viewport in input space, [-1, 1]^2 by default), `format` ("png" or
+    "raw", the binary 0x01 frame) and `v`, the model version as reported in
+    the X-Model-Version header. Versioned URLs never change and are cached
+    for good; a `v` that is no longer current gives 404. Unversioned URLs
+    always show the latest model and must be revalidated (strong ETag).
+    """
+    def initialize(
+        self,
+        sessions: SessionRegistry,
+        render_executor: Executor | None = None,
+        map_size: int | None = None,
+        adaptive_render: bool = False
+    ) -> None:
+        self.sessions = sessions
+        self.render_executor = render_executor or default_render_executor()
+        self.map_size = map_size or StatelessTrainer.GRID_WIDTH
+        self.adaptive_render = adaptive_render
+
+    async def get(self, session_id: str) -> None:
+        session = self.sessions.get(session_id)
+        model = session.model if session is not None else None
+        if session is None or model is None:
+            raise tornado.web.HTTPError(404, "Unknown session")
+
+        try:
+            width = int(self.get_query_argument("w", str(self.map_size)))
+            height = int(self.get_query_argument("h", str(width)))
+            x0, x1, y0, y1 = (
+                float(self.get_query_argument(name, str(default)))
+                for name, default in zip(("x0", "x1", "y0", "y1"), DEFAULT_BOUNDS)
+            )
+        except ValueError:
+            raise tornado.web.HTTPError(400, "Invalid map parameters")
+        bounds: Bounds = (x0, x1, y0, y1)
+        fmt = self.get_query_argument("format", "png")
+        if (
+            not (1 <= width <= MAX_SEEK_SIZE and 1 <= height <= MAX_SEEK_SIZE) or
+            not all(abs(v) < 1e6 for v in bounds) or not (x0 < x1 and y0 < y1) or
+            fmt not in ("png", "raw")
+        ):
+            raise tornado.web.HTTPError(400, "Invalid map parameters")
+
+        requested = self.get_query_argument("v", None)
+        viewport = ",".join(repr(v) for v in bounds)
+        tag = render_context_tag(self.adaptive_render, bounds=bounds)
+        key = map_frame_key(model, width, height, tag)
+
+        def set_version_headers(key: FrameKey) -> None:
+            # Model instances restart their version at 0, so the version
+            # includes the generation
+            version = f"{session.model_generation}.{key[0]}"
+            if requested is not None and requested != version:
+                raise tornado.web.HTTPError(
+                    404, "Model version no longer available"
+                )
+            etag = f'"{session.id}-{version}-{width}x{height}-{viewport}-{fmt}"'
+            self.set_header("Etag", etag)
+            self.set_header("X-Model-Version", version)
+
+        set_version_headers(key)
+        if requested is not None:
+            self.set_header("Cache-Control", "public, max-age=31536000, immutable")
+        else:
+            self.set_header("Cache-Control", "no-cache")
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+
+        # Cache hits allocate no render context
+        frame = MAP_CACHE.get(model, key)
+        if frame is None:
+            # Training keeps updating the live weights, so the map is rendered
+            # from a copy; the body then matches the version it is cached under
+            snapshot, key = self._snapshot(session, model, width, height, tag)
+            if key is None:
+                # Still changing after every attempt: never cache this body
+                self.set_header("Cache-Control", "no-store")
+                if requested is not None:
+                    raise tornado.web.HTTPError(
+                        404, "Model version no longer available"
+                    )
+                self.clear_header("Etag")
+            else:
+                set_version_headers(key)
+            frame = await tornado.ioloop.IOLoop.current().run_in_executor(
+                self.render_executor, self._render_snapshot, model, snapshot, key,
+                width, height, self.adaptive_render, bounds
+            )
+        if fmt == "raw":
+            self.set_header("Content-Type", "application/octet-stream")
+            self.write(frame)
+        else:
+            self.set_header("Content-Type", "image/png")
+            self.write(encode_png(memoryview(frame)[FRAME_HEADER_SIZE:], width, height))
+
+    @staticmethod
+    def _snapshot(
+        session: TrainingSession, model: Model, width: int, height: int,
+        tag: str, attempts: int = 3
+    ) -> tuple[Model, Optional[FrameKey]]:
+        """
+        Copy the parameters of `model` together with the cache key of the
+        version they belong to. The key is None when the version moved
+        during every attempt, i.e. the copy may mix two versions.
+        """
+        for _ in range(attempts):
+            with session.lock:
+                key = map_frame_key(model, width, height, tag)
+                snapshot = copy_model(model)
+                if model_version(model) == key[0]:
+                    return snapshot, key
+        return snapshot, None
+
+    @staticmethod
+    def _render_snapshot(
+        model: Model,
+        snapshot: Model,
+        key: Optional[FrameKey],
+        width: int,
+        height: int,
+        adaptive: bool,
+        bounds: Bounds
+    ) -> bytes:
+        # Runs in the render executor; consistent frames are cached for the live model
+        context = create_render_context(width, height, adaptive, bounds=bounds)
+        frame = bytes(context.render(snapshot))
+        if key is not None:
+            MAP_CACHE.put(model, key, frame)
+        return frame
+
+class SessionDataHandler(tornado.web.RequestHandler): # type: ignore
+    """
+    POST /api/session/<id>/data: import a 2-D labelled dataset into a
+    connected session, replacing its points.
+
+    The body is a CSV file (columns x, y, label; a header line is skipped)
+    or an [n, 3] .npy array, either as is or as the first file of a
+    multipart form. Query arguments: `format` ("csv" or "npy", detected by
+    default), `normalize` ("0" keeps the coordinates, otherwise they are
+    scaled to fill [-1, 1]^2) and `preview`, the number of points to send
+    back for display. The file is converted once to memory-mapped columns
+    (see logic/importer.py) that training samples from directly; at most
+    `max_data_bytes` of conversions are kept.
+    """
+    def initialize(
+        self,
+        sessions: SessionRegistry,
+        data_dir: Path | None = None,
+        max_data_bytes: int | None = None
+    ) -> None:
+        self.sessions = sessions
+        self.data_dir = data_dir or default_data_dir()
+        self.max_data_bytes = max_data_bytes or MAX_DATA_DIR_BYTES
+
+    async def post(self, session_id: str) -> None:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise tornado.web.HTTPError(404, "Unknown session")
+
+        uploads = [upload for files in self.request.files.values() for upload in files]
+        if uploads:
+            raw, filename = uploads[0]["body"], uploads[0]["filename"]
+        else:
+            raw, filename = self.request.body, None
+        fmt = self.get_query_argument("format", None) or detect_format(raw, filename)
+        normalize = self.get_query_argument("normalize", "1") != "0"
+        try:
+            preview = int(self.get_query_argument("preview", "2000"))
+        except ValueError:
+            raise tornado.web.HTTPError(400, "Invalid preview size")
+        if not raw or fmt not in IMPORT_FORMATS:
+            raise tornado.web.HTTPError(400, "Expected a CSV or npy file")
+
+        try:
+            # Parsing and conversion run off the IOLoop
+            dataset, reply = await tornado.ioloop.IOLoop.current().run_in_executor(
+                None, self._import, raw, fmt, normalize,
+                min(MAX_PREVIEW_POINTS, max(0, preview))
+            )
+        except ValueError as e:
+            # Tell the user what is wrong with the file
+            self.set_status(400)
+            self.set_header("Content-Type", "application/json")
+            self.write(encode_message({"error": str(e)}))
+            return
+        # The connection swaps the data in (and adapts the model) on its next
+        # update check
+        session.offer_import(dataset)
+        logger.info(f"Imported {len(dataset)} points into session {session_id}")
+        self.set_header("Content-Type", "application/json")
+        self.write(reply)
+
+    def _import(
+        self, raw: bytes, fmt: str, normalize: bool, preview: int
+    ) -> tuple[Dataset, bytes]:
+        # Runs in the executor
+        dataset = import_dataset(
+            raw, self.data_dir, fmt, normalize, self.max_data_bytes
+        )
+        reply = encode_message({
+            "points": len(dataset),
+            "classes": dataset.required_output_dim(),
+            "data": preview_points(dataset, preview)
+        })
+        return dataset, reply
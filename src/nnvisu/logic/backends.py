@@ -0,0 +1,310 @@
+import logging
+import queue
+import threading
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+import torch
+import torch.multiprocessing as mp
+
+from nnvisu.logic.render import bump_version
+
+if TYPE_CHECKING:
+    from nnvisu.logic.session import TrainingSession
+    from nnvisu.logic.trainer import StatefulTrainer
+
+logger = logging.getLogger(__name__)
+
+class TrainingBackend:
+    """
+    Decides where a session's training loop runs. The handler only talks to
+    this interface, so the execution strategy can be swapped per server.
+    """
+    name = "base"
+
+    def start(self, session: "TrainingSession", trainer: "StatefulTrainer") -> None:
+        """Start running the training loop for the session."""
+        raise NotImplementedError
+
+    def stop(self, session: "TrainingSession", timeout: float = 1.0) -> None:
+        """Stop the training loop of the session and wait for it to finish."""
+        raise NotImplementedError
+
+    def sync(self, session: "TrainingSession", trainer: "StatefulTrainer") -> None:
+        """Propagate a configuration change to a running loop."""
+
+    def poll(self, session: "TrainingSession") -> None:
+        """Move pending results into session.step_queue (called from the IOLoop)."""
+
+    def queue_position(self, session: "TrainingSession") -> Optional[int]:
+        """1-based position of a session waiting for admission, None if not queued."""
+        return None
+
+    def shutdown(self) -> None:
+        """Release all resources held by the backend."""
+
+class ThreadBackend(TrainingBackend):
+    """Runs each session's loop in a daemon thread of the server process."""
+    name = "thread"
+
+    def start(self, session: "TrainingSession", trainer: "StatefulTrainer") -> None:
+        t = threading.Thread(target=trainer.run_loop, args=(session,))
+        t.daemon = True
+        t.start()
+        session.training_thread = t
+
+    def stop(self, session: "TrainingSession", timeout: float = 1.0) -> None:
+        session.stop_event.set()
+        if session.training_thread:
+            session.training_thread.join(timeout=timeout)
+        session.training_thread = None
+
+class _SharedMetrics:
+    """
+    Stand-in for the step queue inside a worker process. Metrics are folded
+    into a small shared tensor [total_steps, last_loss, converged] instead of
+    being pickled through a pipe on every iteration.
+    """
+    def __init__(self, buffer: torch.Tensor) -> None:
+        self.buffer = buffer
+
+    def put(self, item: Dict[str, Any], block: bool = True) -> None:
+        # Single writer: only the worker process updates the buffer
+        self.buffer[1] = item["loss"]
+        self.buffer[2] = float(item.get("converged", False))
+        self.buffer[0] += item.get("steps", 1)
+
+def _apply_updates(updates: Any, job_id: int, session: "TrainingSession") -> None:
+    """
+    Worker-side thread: apply the config and data changes that
+    ProcessBackend.sync pushes to a running job, until the job ends.
+    """
+    while True:
+        update_job, config, data = updates.get()
+        if update_job != job_id:
+            # Left over from an earlier job of this worker
+            continue
+        if config is None:
+            return
+        with session.lock:
+            if data is not None:
+                session.data_x, session.data_y = data
+                session.data_version += 1
+            session.update_config(config)
+
+def _worker_main(jobs: Any, updates: Any, stop_event: Any, idle_event: Any) -> None:
+    """Entry point of a pooled training process."""
+    from nnvisu.logic.engines import create_trainer, engine_of
+    from nnvisu.logic.session import TrainingSession
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    # One process per session already provides the parallelism
+    torch.set_num_threads(1)
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        job_id, model, data_x, data_y, config, metrics = job
+        session = TrainingSession()
+        updater = threading.Thread(
+            target=_apply_updates, args=(updates, job_id, session)
+        )
+        updater.daemon = True
+        try:
+            session.model = model
+            session.data_x, session.data_y = data_x, data_y
+            session.data_version = 1
+            session.update_config(config)
+            session.step_queue = _SharedMetrics(metrics)  # type: ignore[assignment]
+            session.stop_event = stop_event
+            updater.start()
+            # One trainer per job: its optimizer state lives as long as the job
+            create_trainer(engine_of(model)).run_loop(session)
+        except Exception as e:
+            logger.error(f"Training worker failed: {e}", exc_info=True)
+        finally:
+            if updater.is_alive():
+                updates.put((job_id, None, None))
+                updater.join()
+            idle_event.set()
+
+class _Worker:
+    def __init__(self, ctx: Any) -> None:
+        self.jobs = ctx.Queue()
+        self.updates = ctx.Queue()
+        self.stop_event = ctx.Event()
+        self.idle_event = ctx.Event()
+        self.idle_event.set()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(self.jobs, self.updates, self.stop_event, self.idle_event),
+            daemon=True
+        )
+        self.process.start()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=1.0)
+
+class _Assignment:
+    def __init__(
+        self,
+        worker: _Worker,
+        metrics: torch.Tensor,
+        job_id: int,
+        data_version: int,
+        model_generation: int
+    ) -> None:
+        self.worker = worker
+        self.metrics = metrics
+        self.reported_steps = 0.0
+        self.job_id = job_id
+        # What the worker was last sent (see ProcessBackend.sync)
+        self.data_version = data_version
+        self.model_generation = model_generation
+
+class ProcessBackend(TrainingBackend):
+    """
+    Runs each session's loop in a pooled worker process, outside the server's GIL.
+
+    The model parameters are moved to shared memory before the job is handed
+    over, so the worker trains them in place and the IOLoop renders from the
+    very same storage without any pickling. Finished workers go back to an
+    idle pool to avoid paying the interpreter/torch start-up on every start.
+    Config and data changes are pushed to the running job (see sync), so the
+    worker keeps its optimizer state.
+    """
+    name = "process"
+
+    def __init__(self, max_idle: int = 4) -> None:
+        self.ctx = mp.get_context("spawn")
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        self.idle: List[_Worker] = []
+        self.assignments: Dict[str, _Assignment] = {}
+        self.next_job_id = 0
+
+    def _acquire_worker(self) -> _Worker:
+        with self.lock:
+            while self.idle:
+                worker = self.idle.pop()
+                if worker.process.is_alive():
+                    return worker
+        return _Worker(self.ctx)
+
+    def _release_worker(self, worker: _Worker) -> None:
+        with self.lock:
+            if worker.process.is_alive() and len(self.idle) < self.max_idle:
+                self.idle.append(worker)
+                return
+        worker.kill()
+
+    def start(self, session: "TrainingSession", trainer: "StatefulTrainer") -> None:
+        with session.lock:
+            model = session.model
+            if model is None:
+                return
+            model.share_memory()
+            # Copies: sending a tensor moves its storage to shared memory,
+            # which would detach the session's views from its dataset
+            data_x, data_y = session.data_x.clone(), session.data_y.clone()
+            data_version = session.data_version
+            model_generation = session.model_generation
+            config = dict(session.config)
+
+        metrics = torch.zeros(3, dtype=torch.float64)
+        metrics.share_memory_()  # type: ignore[no-untyped-call]
+        worker = self._acquire_worker()
+        worker.stop_event.clear()
+        worker.idle_event.clear()
+        self.next_job_id += 1
+        worker.jobs.put((self.next_job_id, model, data_x, data_y, config, metrics))
+        self.assignments[session.id] = _Assignment(
+            worker, metrics, self.next_job_id, data_version, model_generation
+        )
+
+    def stop(self, session: "TrainingSession", timeout: float = 1.0) -> None:
+        session.stop_event.set()
+        assignment = self.assignments.get(session.id)
+        if assignment is None:
+            return
+
+        worker = assignment.worker
+        worker.stop_event.set()
+        if worker.idle_event.wait(timeout=timeout):
+            self._release_worker(worker)
+        else:
+            logger.warning("Training worker did not stop in time, terminating it")
+            worker.kill()
+
+        # Flush whatever the worker reported before it stopped
+        self.poll(session)
+        self.assignments.pop(session.id, None)
+
+    def sync(self, session: "TrainingSession", trainer: "StatefulTrainer") -> None:
+        assignment = self.assignments.get(session.id)
+        if assignment is None:
+            return
+        if session.model_generation != assignment.model_generation:
+            # The worker trains the previous model instance; hand over the new one
+            self.stop(session)
+            session.stop_event.clear()
+            self.start(session, trainer)
+            return
+
+        # The worker holds private copies of the config and data; send it the
+        # current ones (data only if it changed) without interrupting the job
+        with session.lock:
+            config = dict(session.config)
+            data = None
+            if session.data_version != assignment.data_version:
+                data = (session.data_x.clone(), session.data_y.clone())
+                assignment.data_version = session.data_version
+        assignment.worker.updates.put((assignment.job_id, config, data))
+
+    def poll(self, session: "TrainingSession") -> None:
+        assignment = self.assignments.get(session.id)
+        if assignment is None:
+            return
+        total_steps, loss, converged = assignment.metrics.tolist()
+        new_steps = total_steps - assignment.reported_steps
+        if new_steps <= 0:
+            return
+        assignment.reported_steps = total_steps
+        session.converged = bool(converged)
+        if session.model is not None:
+            # The worker trains the shared parameters in place; its version
+            # counter is private, so mirror the progress here for the render cache
+            bump_version(session.model, int(new_steps))
+        try:
+            session.step_queue.put({
+                "loss": loss, "steps": int(new_steps), "converged": bool(converged)
+            }, block=False)
+        except queue.Full:
+            pass
+
+    def shutdown(self) -> None:
+        with self.lock:
+            workers = self.idle
+            self.idle = []
+        for worker in workers:
+            worker.jobs.put(None)
+            worker.process.join(timeout=1.0)
+            worker.kill()
+
+def create_backend(name: str, **options: Any) -> TrainingBackend:
+    """Instantiate a training backend by its name."""
+    from nnvisu.logic.scheduler import TrainingScheduler
+
+    backends: Dict[str, type[TrainingBackend]] = {
+        ThreadBackend.name: ThreadBackend,
+        ProcessBackend.name: ProcessBackend,
+        TrainingScheduler.name: TrainingScheduler,
+    }
+    if name not in backends:
+        raise ValueError(f"Unknown training backend: {name}")
+    return backends[name](**options)
@@ -0,0 +1,155 @@
+import queue
+import time
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import torch
+from torch import nn
+from torch.func import functional_call, vmap
+from torch.nn import functional as F  # noqa: N812
+
+from nnvisu.logic.model import NeuralNetwork
+from nnvisu.logic.render import bump_version
+
+if TYPE_CHECKING:
+    from nnvisu.logic.engines import Model
+    from nnvisu.logic.session import TrainingSession
+    from nnvisu.logic.trainer import StatefulTrainer
+
+Signature = Tuple[Tuple[str, int, int], ...]
+
+def model_signature(model: Optional["Model"]) -> Optional[Signature]:
+    """
+    Describe the topology of a model. Models with equal signatures can be
+    stacked and trained together; None means the model must train alone.
+    """
+    if not isinstance(model, NeuralNetwork):
+        return None
+    signature = []
+    for layer in model.net:
+        if isinstance(layer, nn.Linear):
+            signature.append(("linear", layer.in_features, layer.out_features))
+        elif isinstance(layer, nn.Dropout):
+            # Dropout masks would have to be drawn per session, keep it simple
+            return None
+        else:
+            signature.append((type(layer).__name__, 0, 0))
+    return tuple(signature)
+
+class BatchedTrainer:
+    """
+    Trains several sessions with the same topology in one vmapped
+    forward/backward pass. The parameters of all models are stacked along a
+    new leading dimension, the per-session mini-batches are padded to a
+    common length and masked out of the loss. Gradients are then handed back
+    to each session's live parameters, and every session's own optimizer
+    (with its own state and hyperparameters) performs the update.
+    """
+    def step(
+        self,
+        models: List[NeuralNetwork],
+        batches: List[Tuple[torch.Tensor, torch.Tensor]],
+        optimizers: List[torch.optim.Optimizer]
+    ) -> List[float]:
+        num_models = len(models)
+        max_len = max(X.shape[0] for X, _ in batches)
+
+        # Pad mini-batches to a common length
+        xs = torch.zeros((num_models, max_len, 2), dtype=torch.float32)
+        ys = torch.zeros((num_models, max_len), dtype=torch.long)
+        mask = torch.zeros((num_models, max_len), dtype=torch.float32)
+        for i, (X, y) in enumerate(batches):  # noqa: N806
+            n = X.shape[0]
+            xs[i, :n] = X
+            ys[i, :n] = y
+            mask[i, :n] = 1.0
+
+        # Stack the live parameters into leaf tensors of shape [num_models, ...]
+        names = [name for name, _ in models[0].named_parameters()]
+        live = [dict(model.named_parameters()) for model in models]
+        stacked: Dict[str, torch.Tensor] = {
+            name: torch.stack(
+                [params[name].detach() for params in live]
+            ).requires_grad_()
+            for name in names
+        }
+
+        base = models[0]
+        for model in models:
+            model.train()
+
+        def forward(params: Dict[str, torch.Tensor], x: torch.Tensor) -> torch.Tensor:
+            logits: torch.Tensor = functional_call(base, params, (x,))
+            return logits
+
+        logits = vmap(forward)(stacked, xs)  # [num_models, max_len, num_classes]
+        losses = F.cross_entropy(
+            logits.reshape(num_models * max_len, -1), ys.reshape(-1), reduction="none"
+        ).reshape(num_models, max_len)
+        # Mean loss per session; summing them keeps each session's gradient exact
+        per_model = (losses * mask).sum(dim=1) / mask.sum(dim=1)
+        per_model.sum().backward()  # type: ignore[no-untyped-call]
+
+        for i, (params, optimizer) in enumerate(zip(live, optimizers)):
+            for name in names:
+                grad = stacked[name].grad
+                assert grad is not None
+                params[name].grad = grad[i]
+            optimizer.step()
+            bump_version(models[i])
+
+        return [float(v) for v in per_model.detach().tolist()]
+
+    def run_iteration(
+        self, entries: List[Tuple["TrainingSession", "StatefulTrainer"]]
+    ) -> List[int]:
+        """
+        Perform one batched step for every session in `entries` that still
+        matches the topology of the first one. Returns the steps run per entry.
+        """
+        steps = [0] * len(entries)
+        members: List[int] = []
+        models: List[NeuralNetwork] = []
+        batches: List[Tuple[torch.Tensor, torch.Tensor]] = []
+        optimizers: List[torch.optim.Optimizer] = []
+        signature: Optional[Signature] = None
+
+        for i, (session, trainer) in enumerate(entries):
+            if session.stop_event.is_set():
+                continue
+            with session.lock:
+                model = session.model
+                data_x, data_y = session.data_x, session.data_y
+                config = session.config
+            # Only torch models can be stacked (see model_signature)
+            if not isinstance(model, NeuralNetwork) or data_x.shape[0] == 0:
+                continue
+            model_sig = model_signature(model)
+            if model_sig is None or (signature is not None and model_sig != signature):
+                continue
+            signature = model_sig
+
+            members.append(i)
+            models.append(model)
+            batch_size = config.get("batchSize", 0)
+            batches.append(trainer._sample_batch(data_x, data_y, batch_size))
+            optimizers.append(trainer._get_optimizer(model, config))
+
+        if not members:
+            return steps
+
+        losses = self.step(models, batches, optimizers)
+        now = time.time()
+        for i, loss in zip(members, losses):
+            steps[i] = 1
+            session = entries[i][0]
+            converged = session.record_loss(loss)
+            try:
+                session.step_queue.put({
+                    "loss": loss,
+                    "steps": 1,
+                    "converged": converged,
+                    "timestamp": now
+                }, block=False)
+            except queue.Full:
+                pass
+        return steps
@@ -0,0 +1,253 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+
+from nnvisu.protocol import DataPoint
+
+# Point ids index a row table (4 bytes per id), so they are kept below this
+MAX_POINT_ID = 1 << 22
+
+class Dataset:
+    """
+    Training points with stable ids, stored column-wise: float32 x/y pairs
+    and int64 labels (the dtype CrossEntropyLoss takes, so that the training
+    tensors are views instead of copies), 16 bytes per point plus 8 for the
+    id and its row. Single points are added, removed and moved in O(1)
+    (removal swaps the last point into the gap). Class counts are kept up
+    to date with every edit, so the number of classes the model needs is
+    known without scanning the points.
+
+    The training tensors are views of the columns (see tensors). Rows a
+    view covers are never written again: an edit that would change them
+    first copies the columns, so a training iteration keeps the data it
+    started with.
+
+    Not thread-safe; TrainingSession guards it with its lock.
+    """
+    def __init__(self, capacity: int = 256) -> None:
+        capacity = max(1, capacity)
+        self.count = 0
+        self.xy = np.empty((capacity, 2), dtype=np.float32)
+        self.labels = np.empty(capacity, dtype=np.int64)
+        self.ids = np.empty(capacity, dtype=np.int32)
+        # Point id -> row, -1 for unused ids
+        self.rows = np.full(capacity, -1, dtype=np.int32)
+        # Label -> number of points
+        self.class_counts: Dict[int, int] = {}
+        self.max_label = -1
+        self.next_id = 0
+        # Rows [0, published) may be referenced by tensors handed out
+        self.published = 0
+
+    @classmethod
+    def from_arrays(cls, xy: np.ndarray, labels: np.ndarray) -> "Dataset":
+        """A dataset holding columnar points (ids 0..n-1), filled in bulk."""
+        n = len(labels)
+        columns = cls(capacity=max(256, n))
+        columns.xy[:n] = xy
+        columns.labels[:n] = labels
+        return cls._with_columns(columns.xy, columns.labels, n)
+
+    @classmethod
+    def memory_mapped(cls, directory: Union[str, Path]) -> "Dataset":
+        """
+        The dataset stored as xy.npy (float32 [n, 2]) and labels.npy (int64
+        [n]) in `directory`, memory-mapped: training tensors index straight
+        into the mapping and only the pages they touch are read. Edits never
+        reach the files: the first edit of a row that was handed out, or the
+        first point added past the end, moves the columns into memory.
+        """
+        directory = Path(directory)
+        xy = np.load(directory / "xy.npy", mmap_mode="c")
+        labels = np.load(directory / "labels.npy", mmap_mode="c")
+        if (
+            xy.dtype != np.float32 or labels.dtype != np.int64 or
+            xy.shape != (len(labels), 2)
+        ):
+            raise ValueError(f"Not a dataset: {directory}")
+        return cls._with_columns(xy, labels, len(labels))
+
+    @classmethod
+    def _with_columns(cls, xy: np.ndarray, labels: np.ndarray, n: int) -> "Dataset":
+        # Adopts the columns (their first n rows are the points, ids 0..n-1)
+        dataset = cls(capacity=1)
+        dataset.xy = xy
+        dataset.labels = labels
+        dataset.count = n
+        dataset.ids = np.arange(max(1, len(labels)), dtype=np.int32)
+        dataset.rows = np.arange(max(1, n), dtype=np.int32)
+        dataset.rows[n:] = -1
+        counts = np.bincount(labels[:n])
+        dataset.class_counts = {
+            label: int(counts[label]) for label in np.flatnonzero(counts).tolist()
+        }
+        dataset.max_label = max(dataset.class_counts, default=-1)
+        dataset.next_id = n
+        return dataset
+
+    @classmethod
+    def from_points(cls, points: Sequence[DataPoint]) -> "Dataset":
+        """
+        A dataset from points in wire format; points without an "id" get fresh
+        ones.
+        """
+        dataset = cls(capacity=max(256, len(points)))
+        dataset.replace(points)
+        return dataset
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, point_id: int) -> bool:
+        return self._row(point_id) is not None
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.xy[:self.count, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.xy[:self.count, 1]
+
+    @property
+    def label(self) -> np.ndarray:
+        return self.labels[:self.count]
+
+    def _row(self, point_id: int) -> Optional[int]:
+        if 0 <= point_id < self.rows.size:
+            row = int(self.rows[point_id])
+            if row >= 0:
+                return row
+        return None
+
+    def _reallocate(self, capacity: int) -> None:
+        for name in ("xy", "labels", "ids"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        # Views handed out keep the old columns
+        self.published = 0
+
+    def _grow(self) -> None:
+        self._reallocate(max(256, 2 * self.xy.shape[0]))
+
+    def _before_write(self, row: int) -> None:
+        # Copy-on-write for rows covered by tensors handed out
+        if row < self.published:
+            self._reallocate(max(256, self.xy.shape[0]))
+
+    def _grow_rows(self, point_id: int) -> None:
+        size = min(MAX_POINT_ID, max(2 * self.rows.size, point_id + 1))
+        rows = np.full(size, -1, dtype=np.int32)
+        rows[:self.rows.size] = self.rows
+        self.rows = rows
+
+    def _count_label(self, label: int, delta: int) -> None:
+        count = self.class_counts.get(label, 0) + delta
+        if count:
+            self.class_counts[label] = count
+        else:
+            del self.class_counts[label]
+        if delta > 0 and label > self.max_label:
+            self.max_label = label
+        elif count == 0 and label == self.max_label:
+            # Only the set of labels is scanned, never the points
+            self.max_label = max(self.class_counts, default=-1)
+
+    def add(
+        self, x: float, y: float, label: int, point_id: Optional[int] = None
+    ) -> int:
+        """Add a point (or replace the one with the same id); returns its id."""
+        if point_id is None:
+            point_id = self.next_id
+        point_id = int(point_id)
+        if not 0 <= point_id < MAX_POINT_ID:
+            raise ValueError(f"Point id out of range: {point_id}")
+        if point_id in self:
+            self.remove(point_id)
+        self.next_id = max(self.next_id, point_id + 1)
+
+        if self.count == self.xy.shape[0]:
+            self._grow()
+        if point_id >= self.rows.size:
+            self._grow_rows(point_id)
+        row = self.count
+        self._before_write(row)
+        self.xy[row] = (x, y)
+        self.labels[row] = label
+        self.ids[row] = point_id
+        self.rows[point_id] = row
+        self.count += 1
+        self._count_label(int(label), 1)
+        return point_id
+
+    def remove(self, point_id: int) -> bool:
+        """Remove a point; returns False for unknown ids."""
+        row = self._row(point_id)
+        if row is None:
+            return False
+        self.rows[point_id] = -1
+        self._count_label(int(self.labels[row]), -1)
+        last = self.count - 1
+        if row != last:
+            self._before_write(row)
+            self.xy[row] = self.xy[last]
+            self.labels[row] = self.labels[last]
+            self.ids[row] = self.ids[last]
+            self.rows[self.ids[row]] = row
+        self.count = last
+        return True
+
+    def move(
+        self, point_id: int, x: float, y: float, label: Optional[int] = None
+    ) -> bool:
+        """Move a point and optionally relabel it; returns False for unknown ids."""
+        row = self._row(point_id)
+        if row is None:
+            return False
+        self._before_write(row)
+        self.xy[row] = (x, y)
+        if label is not None and label != self.labels[row]:
+            self._count_label(int(self.labels[row]), -1)
+            self.labels[row] = label
+            self._count_label(int(label), 1)
+        return True
+
+    def replace(self, points: Iterable[DataPoint]) -> None:
+        """Replace all points; points without an "id" get fresh ones."""
+        self.count = 0
+        self.rows.fill(-1)
+        self.class_counts.clear()
+        self.max_label = -1
+        for p in points:
+            self.add(p['x'], p['y'], p.get('label', 0), p.get('id'))
+
+    def required_output_dim(self) -> int:
+        """Number of output classes needed for the labels present (at least 2)."""
+        return max(2, self.max_label + 1)
+
+    def tensors(self) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Coordinates and labels as training tensors. These are views that
+        later edits never change (the columns are copied before a covered
+        row is written), so each call after an edit returns new tensors.
+        """
+        n = self.count
+        self.published = max(self.published, n)
+        return torch.from_numpy(self.xy[:n]), torch.from_numpy(self.labels[:n])
+
+    def to_points(self, rows: Optional[np.ndarray] = None) -> List[DataPoint]:
+        """The points (or those in `rows`) in wire format (with their ids)."""
+        if rows is None:
+            rows = np.arange(self.count)
+        return [
+            {"id": i, "x": x, "y": y, "label": label}
+            for i, (x, y), label in zip(
+                self.ids[rows].tolist(),
+                self.xy[rows].tolist(),
+                self.labels[rows].tolist()
+            )
+        ]
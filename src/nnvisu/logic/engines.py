@@ -0,0 +1,65 @@
+from typing import Any, Dict, Protocol
+
+import torch
+
+from nnvisu.logic.model import NeuralNetwork
+from nnvisu.logic.numpy_engine import NumpyNetwork, NumpyTrainer
+from nnvisu.logic.trainer import StatefulTrainer
+
+# Compute engines a session can train with
+ENGINE_TORCH = "torch"
+ENGINE_NUMPY = "numpy"
+ENGINES = (ENGINE_TORCH, ENGINE_NUMPY)
+
+class Model(Protocol):
+    """The model API shared by every engine (NeuralNetwork, NumpyNetwork)."""
+    activation: str
+    training: bool
+    # Parameter version, bumped on every update (see render.bump_version)
+    version: int
+
+    @property
+    def output_dim(self) -> int: ...
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor: ...
+
+    def train(self, mode: bool = True) -> "Model": ...
+
+    def eval(self) -> "Model": ...
+
+    def get_state_dict_as_list(self) -> Dict[str, Any]: ...
+
+    def get_state_dict_as_arrays(self) -> Dict[str, Any]: ...
+
+    def load_state_dict_from_arrays(self, state: Dict[str, Any]) -> None: ...
+
+    def load_state_dict_from_list(self, state: Dict[str, Any]) -> None: ...
+
+    def adapt_output_layer(self, new_output_dim: int) -> None: ...
+
+    def share_memory(self) -> "Model": ...
+
+def normalize_engine(engine: str | None) -> str:
+    """Map unknown or missing engine names to the default (torch)."""
+    return engine if engine in ENGINES else ENGINE_TORCH
+
+def create_model(
+    engine: str | None,
+    hidden_layers: list[int] | None = None,
+    output_dim: int = 2,
+    activation: str = 'tanh',
+    dropout: float = 0.0
+) -> Model:
+    """Create a model for the given engine."""
+    if normalize_engine(engine) == ENGINE_NUMPY:
+        return NumpyNetwork(hidden_layers, output_dim, activation, dropout)
+    return NeuralNetwork(hidden_layers, output_dim, activation, dropout)
+
+def create_trainer(engine: str | None) -> StatefulTrainer:
+    """Create the stateful trainer matching the given engine."""
+    if normalize_engine(engine) == ENGINE_NUMPY:
+        return NumpyTrainer()
+    return StatefulTrainer()
+
+def engine_of(model: Model) -> str:
+    return ENGINE_NUMPY if isinstance(model, NumpyNetwork) else ENGINE_TORCH
@@ -0,0 +1,210 @@
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from nnvisu.logic.render import PIXEL_FORMAT_RGB, PIXEL_FORMATS
+
+# Binary map frame types (the first byte of every binary message).
+# 0x01 is the raw RGB frame: type, width u16, height u16, RGB bytes.
+FRAME_TYPE_KEYFRAME = 0x02
+FRAME_TYPE_DELTA = 0x03
+
+# Bit 0 of the flags byte: the body after the header is zlib-compressed
+FLAG_ZLIB = 0x01
+# Bits 1-2 of the flags byte: pixel format (see render.PIXEL_FORMATS)
+PIXEL_FORMAT_CODES = {"rgb": 0, "index": 1, "top2": 2}
+PIXEL_FORMAT_SHIFT = 1
+
+# Keyframe header: type, flags, frame_id u32, width u16, height u16; body = pixels
+KEYFRAME_HEADER = struct.Struct("<BBIHH")
+# Delta header: type, flags, frame_id u32, base_id u32, width u16, height u16,
+# tile_size u8, tile_count u32; body = tile_count u32 tile indices (row-major
+# over the tile grid) followed by the tiles' pixels, tile_size x tile_size
+# each (tiles on the right/bottom edge are padded)
+DELTA_HEADER = struct.Struct("<BBIIHHBI")
+
+ENCODING_DELTA = "delta"
+ENCODING_ZLIB = "zlib"
+ENCODINGS = (ENCODING_DELTA, ENCODING_ZLIB)
+
+class FrameEncoder:
+    """
+    Encodes one session's map frames for a client that negotiated the
+    keyframe/delta format.
+
+    Deltas are computed against the client's last acknowledged frame, so a
+    client on a slow link that falls behind simply gets larger deltas. Only
+    tiles that changed are sent. A keyframe goes out when there is no usable
+    base, every `keyframe_interval` frames for resync, when most tiles
+    changed anyway, or on request. The client keeps the last `max_unacked`
+    frames so that it still has the base of every delta it receives.
+    """
+    def __init__(
+        self,
+        encodings: List[str],
+        pixel_format: str = PIXEL_FORMAT_RGB,
+        tile_size: int = 16,
+        keyframe_interval: int = 60,
+        max_unacked: int = 8,
+        compression_level: int = 1,
+        max_delta_ratio: float = 0.6
+    ) -> None:
+        self.delta = ENCODING_DELTA in encodings
+        self.compress = ENCODING_ZLIB in encodings
+        self.pixel_format = pixel_format
+        self.channels = PIXEL_FORMATS[pixel_format]
+        self.tile_size = tile_size
+        self.keyframe_interval = keyframe_interval
+        self.max_unacked = max_unacked
+        self.compression_level = compression_level
+        self.max_delta_ratio = max_delta_ratio
+
+        self.lock = threading.Lock()
+        self.next_id = 1
+        self.frames_since_keyframe = 0
+        self.force_keyframe = True
+        # Padded [rows, cols, channels] pixels of frames the client has not
+        # acknowledged yet
+        self.unacked: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self.base_id: Optional[int] = None
+        self.base: Optional[np.ndarray] = None
+
+    def describe(self) -> Dict[str, Any]:
+        """Negotiated parameters, sent back to the client."""
+        options = ((ENCODING_DELTA, self.delta), (ENCODING_ZLIB, self.compress))
+        encodings = [name for name, enabled in options if enabled]
+        return {
+            "encodings": encodings,
+            "pixel_format": self.pixel_format,
+            "tile_size": self.tile_size,
+            "keyframe_interval": self.keyframe_interval,
+            "max_unacked": self.max_unacked
+        }
+
+    def ack(self, frame_id: int) -> None:
+        """The client has applied frame `frame_id`; it becomes the delta base."""
+        with self.lock:
+            frame = self.unacked.get(frame_id)
+            if frame is None:
+                return
+            self.base_id = frame_id
+            self.base = frame
+            for old_id in list(self.unacked):
+                if old_id > frame_id:
+                    break
+                del self.unacked[old_id]
+
+    def request_keyframe(self) -> None:
+        with self.lock:
+            self.force_keyframe = True
+
+    def encode(self, data: Any, width: int, height: int) -> Optional[bytes]:
+        """
+        Encode a frame (any buffer of width * height pixels in the encoder's
+        pixel format). Returns None when nothing changed since the base frame.
+        """
+        ts = self.tile_size
+        ch = self.channels
+        rows = -(-height // ts) * ts
+        cols = -(-width // ts) * ts
+        pixels = np.zeros((rows, cols, ch), dtype=np.uint8)
+        source = np.frombuffer(data, dtype=np.uint8)
+        pixels[:height, :width] = source.reshape(height, width, ch)
+
+        with self.lock:
+            base = self.base
+            keyframe = (
+                not self.delta or self.force_keyframe or base is None or
+                base.shape != pixels.shape or
+                self.frames_since_keyframe >= self.keyframe_interval or
+                # The client only keeps max_unacked frames, the base may be gone
+                len(self.unacked) >= self.max_unacked
+            )
+
+            if not keyframe:
+                assert base is not None and self.base_id is not None
+                grid = (rows // ts, ts, cols // ts, ts, ch)
+                tiles = pixels.reshape(grid).swapaxes(1, 2)
+                base_tiles = base.reshape(grid).swapaxes(1, 2)
+                changed = np.flatnonzero((tiles != base_tiles).any(axis=(2, 3, 4)))
+                if changed.size == 0:
+                    return None
+                if changed.size > self.max_delta_ratio * (rows // ts) * (cols // ts):
+                    keyframe = True
+
+            frame_id = self.next_id
+            self.next_id += 1
+            if self.delta:
+                self.unacked[frame_id] = pixels
+                while len(self.unacked) > self.max_unacked:
+                    self.unacked.popitem(last=False)
+
+            if keyframe:
+                self.force_keyframe = False
+                self.frames_since_keyframe = 0
+                body = np.ascontiguousarray(pixels[:height, :width]).tobytes()
+                header = KEYFRAME_HEADER.pack(
+                    FRAME_TYPE_KEYFRAME, self._flags(), frame_id, width, height
+                )
+            else:
+                self.frames_since_keyframe += 1
+                flat_tiles = tiles.reshape(-1, ts, ts, ch)
+                body = changed.astype("<u4").tobytes() + flat_tiles[changed].tobytes()
+                header = DELTA_HEADER.pack(
+                    FRAME_TYPE_DELTA, self._flags(), frame_id, self.base_id,
+                    width, height, ts, changed.size
+                )
+
+        if self.compress:
+            body = zlib.compress(body, self.compression_level)
+        return header + body
+
+    def _flags(self) -> int:
+        flags = PIXEL_FORMAT_CODES[self.pixel_format] << PIXEL_FORMAT_SHIFT
+        return (flags | FLAG_ZLIB) if self.compress else flags
+
+# Tick frame: everything one training update sends, in one message instead
+# of a step_result plus separate map and weights frames. Header: type,
+# version, reserved u16, step u32, loss f32, map length u32, weights length
+# u32; then the map frame (0x01/0x02/0x03) and the weights frame (0x05) as
+# they would be sent on their own. Either may be empty (length 0). Only sent
+# to clients that negotiated it (frame_format "tick"); the version changes
+# whenever the layout does.
+FRAME_TYPE_TICK = 0x06
+TICK_VERSION = 1
+TICK_HEADER = struct.Struct("<BBHIfII")
+
+def encode_tick(
+    step: int,
+    loss: float,
+    map_frame: Optional[bytes] = None,
+    weights_frame: Optional[bytes] = None
+) -> bytes:
+    """Bundle the metrics of a training update with its map and weights frames."""
+    map_frame = map_frame or b""
+    weights_frame = weights_frame or b""
+    header = TICK_HEADER.pack(
+        FRAME_TYPE_TICK, TICK_VERSION, 0, step, loss, len(map_frame), len(weights_frame)
+    )
+    return b"".join((header, map_frame, weights_frame))
+
+def decode_tick(frame: Any) -> Tuple[int, float, Optional[bytes], Optional[bytes]]:
+    """
+    Split a tick frame into step, loss, map frame and weights frame (None if
+    absent).
+    """
+    header = TICK_HEADER.unpack_from(frame)
+    kind, version, _, step, loss, map_length, weights_length = header
+    if kind != FRAME_TYPE_TICK or version != TICK_VERSION:
+        raise ValueError(f"Not a version {TICK_VERSION} tick frame")
+    data = bytes(frame)
+    start = TICK_HEADER.size
+    if len(data) != start + map_length + weights_length:
+        raise ValueError("Truncated tick frame")
+    map_frame = data[start:start + map_length]
+    weights_frame = data[start + map_length:]
+    return step, loss, map_frame or None, weights_frame or None
@@ -1,117 +1,129 @@
 import numpy as np
-from typing import List, Dict, Any
+from typing import Callable, Dict, Optional, Tuple
 
-def generate_circles(n_samples: int = 200, n_classes: int = 2, noise: float = 0.05) -> List[Dict[str, Any]]:
+# Generated datasets are columnar: float32 coordinates [n, 2] and int64 labels [n]
+Columns = Tuple[np.ndarray, np.ndarray]
+
+def _class_labels(n_samples: int, n_classes: int) -> np.ndarray:
+    """Labels in equal blocks per class; the last class takes the remainder."""
+    counts = np.full(n_classes, n_samples // n_classes)
+    counts[-1] = n_samples - counts[:-1].sum()
+    return np.repeat(np.arange(n_classes, dtype=np.int64), counts)
+
+def _sample_in_bounds(
+    rng: np.random.Generator,
+    labels: np.ndarray,
+    draw: Callable[[np.random.Generator, np.ndarray], np.ndarray]
+) -> Columns:
+    """
+    Draw a point for every label with `draw(rng, labels) -> [m, 2]`, all at
+    once, and redraw just the points that fell outside [-1, 1] until none
+    are left (each round only handles the rejected ones).
+    """
+    xy = np.empty((labels.size, 2), dtype=np.float32)
+    pending = np.arange(labels.size)
+    while pending.size:
+        candidates = draw(rng, labels[pending])
+        inside = (np.abs(candidates) <= 1).all(axis=1)
+        xy[pending[inside]] = candidates[inside]
+        pending = pending[~inside]
+    return xy, labels
+
+def generate_circles(
+    n_samples: int = 200, n_classes: int = 2, noise: float = 0.05,
+    seed: Optional[int] = None
+) -> Columns:
     """Generate multiple concentric circles within [-1, 1] bounds."""
-    points = []
-    points_per_class = n_samples // n_classes
-    
-    for i in range(n_classes):
-        count = points_per_class if i < n_classes - 1 else n_samples - (points_per_class * (n_classes - 1))
-        # Radius factor from 1.0 down to 0.2
-        factor = 1.0 - (i * 0.8 / max(1, n_classes - 1)) if n_classes > 1 else 1.0
-        
-        j = 0
-        while j < count:
-            linspace = np.random.uniform(0, 2 * np.pi)
-            x = np.cos(linspace) * factor + np.random.normal(scale=noise)
-            y = np.sin(linspace) * factor + np.random.normal(scale=noise)
-            
-            if -1 <= x <= 1 and -1 <= y <= 1:
-                points.append({"x": float(x), "y": float(y), "label": i})
-                j += 1
-            
-    return points
-
-def generate_moons(n_samples: int = 200, n_classes: int = 2, noise: float = 0.05) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    # Radius factor from 1.0 down to 0.2
+    factors = 1.0 - np.arange(n_classes) * 0.8 / max(1, n_classes - 1)
+
+    def draw(rng: np.random.Generator, labels: np.ndarray) -> np.ndarray:
+        angle = rng.uniform(0, 2 * np.pi, labels.size)
+        circle = np.stack([np.cos(angle), np.sin(angle)], axis=1)
+        circle *= factors[labels, None]
+        return circle + rng.normal(scale=noise, size=(labels.size, 2))
+
+    return _sample_in_bounds(rng, _class_labels(n_samples, n_classes), draw)
+
+def generate_moons(
+    n_samples: int = 200, n_classes: int = 2, noise: float = 0.05,
+    seed: Optional[int] = None
+) -> Columns:
     """Generate multiple interleaving half moons within [-1, 1] bounds."""
-    points = []
-    points_per_class = n_samples // n_classes
-    
-    for i in range(n_classes):
-        count = points_per_class if i < n_classes - 1 else n_samples - (points_per_class * (n_classes - 1))
-        
-        j = 0
-        while j < count:
-            linspace = np.random.uniform(0, np.pi)
-            # Base moon shape
-            px = np.cos(linspace)
-            py = np.sin(linspace)
-            
-            # Shift and flip based on index
-            if i % 2 == 1:
-                px = 1 - px
-                py = 1 - py - 0.5
-                
-            # Vertical shift for more than 2 moons
-            if n_classes > 2:
-                vertical_offset = (i // 2) * 0.5
-                py += vertical_offset
-                
-            # Scaling and noise
-            x = (px - 0.5) * 0.8 + np.random.normal(scale=noise)
-            y = (py - 0.25) * 0.8 + np.random.normal(scale=noise)
-            
-            if -1 <= x <= 1 and -1 <= y <= 1:
-                points.append({"x": float(x), "y": float(y), "label": i})
-                j += 1
-            
-    return points
-
-def generate_blobs(n_samples: int = 200, n_classes: int = 3, cluster_std: float = 0.1) -> List[Dict[str, Any]]:
-    """Generate isotropic Gaussian blobs within [-1, 1] bounds."""
+    rng = np.random.default_rng(seed)
+
+    def draw(rng: np.random.Generator, labels: np.ndarray) -> np.ndarray:
+        angle = rng.uniform(0, np.pi, labels.size)
+        # Base moon shape, every second one shifted and flipped
+        px = np.cos(angle)
+        py = np.sin(angle)
+        odd = labels % 2 == 1
+        px[odd] = 1 - px[odd]
+        py[odd] = 0.5 - py[odd]
+        # Vertical shift for more than 2 moons
+        if n_classes > 2:
+            py += (labels // 2) * 0.5
+        # Scaling and noise
+        moons = np.stack([(px - 0.5) * 0.8, (py - 0.25) * 0.8], axis=1)
+        return moons + rng.normal(scale=noise, size=(labels.size, 2))
+
+    return _sample_in_bounds(rng, _class_labels(n_samples, n_classes), draw)
+
+def _ring_centers(n_classes: int, radius: float) -> np.ndarray:
     angles = np.linspace(0, 2 * np.pi, n_classes, endpoint=False)
-    centers = np.stack([0.6 * np.cos(angles), 0.6 * np.sin(angles)], axis=1)
-    
-    points = []
-    for i in range(n_samples):
-        label = int(np.random.randint(0, n_classes))
-        while True:
-            x = centers[label, 0] + np.random.normal(scale=cluster_std)
-            y = centers[label, 1] + np.random.normal(scale=cluster_std)
-            if -1 <= x <= 1 and -1 <= y <= 1:
-                points.append({"x": float(x), "y": float(y), "label": label})
-                break
-    
-    return points
-
-def generate_anisotropic(n_samples: int = 200, n_classes: int = 3) -> List[Dict[str, Any]]:
+    return np.stack([radius * np.cos(angles), radius * np.sin(angles)], axis=1)
+
+def generate_blobs(
+    n_samples: int = 200, n_classes: int = 3, cluster_std: float = 0.1,
+    seed: Optional[int] = None
+) -> Columns:
+    """Generate isotropic Gaussian blobs within [-1, 1] bounds."""
+    rng = np.random.default_rng(seed)
+    centers = _ring_centers(n_classes, 0.6)
+
+    def draw(rng: np.random.Generator, labels: np.ndarray) -> np.ndarray:
+        return centers[labels] + rng.normal(scale=cluster_std, size=(labels.size, 2))
+
+    labels = rng.integers(0, n_classes, n_samples, dtype=np.int64)
+    return _sample_in_bounds(rng, labels, draw)
+
+def generate_anisotropic(
+    n_samples: int = 200, n_classes: int = 3, seed: Optional[int] = None
+) -> Columns:
     """Generate anisotropic clusters within [-1, 1] bounds."""
-    angles = np.linspace(0, 2 * np.pi, n_classes, endpoint=False)
-    centers = np.stack([0.5 * np.cos(angles), 0.5 * np.sin(angles)], axis=1)
+    rng = np.random.default_rng(seed)
+    centers = _ring_centers(n_classes, 0.5)
     transformation = np.array([[0.6, -0.6], [-0.4, 0.8]])
-    
-    points = []
-    for i in range(n_samples):
-        label = int(np.random.randint(0, n_classes))
-        while True:
-            raw_point = np.random.normal(scale=0.1, size=2)
-            # Center + Transformed noise
-            X = centers[label] + raw_point @ transformation
-            x, y = X[0], X[1]
-            if -1 <= x <= 1 and -1 <= y <= 1:
-                points.append({"x": float(x), "y": float(y), "label": label})
-                break
-    
-    return points
-
-def generate_varied_variance(n_samples: int = 200, n_classes: int = 3) -> List[Dict[str, Any]]:
+
+    def draw(rng: np.random.Generator, labels: np.ndarray) -> np.ndarray:
+        # Center + Transformed noise
+        noise = rng.normal(scale=0.1, size=(labels.size, 2))
+        return centers[labels] + noise @ transformation
+
+    labels = rng.integers(0, n_classes, n_samples, dtype=np.int64)
+    return _sample_in_bounds(rng, labels, draw)
+
+def generate_varied_variance(
+    n_samples: int = 200, n_classes: int = 3, seed: Optional[int] = None
+) -> Columns:
     """Generate blobs with varied variances within [-1, 1] bounds."""
-    angles = np.linspace(0, 2 * np.pi, n_classes, endpoint=False)
-    centers = np.stack([0.6 * np.cos(angles), 0.6 * np.sin(angles)], axis=1)
+    rng = np.random.default_rng(seed)
+    centers = _ring_centers(n_classes, 0.6)
     # Dynamic variance progression: starts at 0.05, increases by 0.1 per class
-    cluster_stds = [0.05 + i * 0.1 for i in range(n_classes)]
-    
-    points = []
-    points_per_class = n_samples // n_classes
-    for i in range(n_classes):
-        count = points_per_class if i < n_classes - 1 else n_samples - (points_per_class * (n_classes - 1))
-        j = 0
-        while j < count:
-            x = centers[i, 0] + np.random.normal(scale=cluster_stds[i])
-            y = centers[i, 1] + np.random.normal(scale=cluster_stds[i])
-            if -1 <= x <= 1 and -1 <= y <= 1:
-                points.append({"x": float(x), "y": float(y), "label": i})
-                j += 1
-            
-    return points
+    cluster_stds = 0.05 + np.arange(n_classes) * 0.1
+
+    def draw(rng: np.random.Generator, labels: np.ndarray) -> np.ndarray:
+        noise = rng.normal(size=(labels.size, 2)) * cluster_stds[labels, None]
+        return centers[labels] + noise
+
+    return _sample_in_bounds(rng, _class_labels(n_samples, n_classes), draw)
+
+# Generators by distribution name (generate_data requests)
+GENERATORS: Dict[str, Callable[..., Columns]] = {
+    "circles": generate_circles,
+    "moons": generate_moons,
+    "blobs": generate_blobs,
+    "anisotropic": generate_anisotropic,
+    "varied_variance": generate_varied_variance,
+}
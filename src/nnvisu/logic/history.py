@@ -0,0 +1,190 @@
+import struct
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+
+from nnvisu.logic.engines import Model, create_model, engine_of
+from nnvisu.logic.model import NeuralNetwork
+from nnvisu.logic.numpy_engine import NumpyNetwork
+from nnvisu.logic.render import RenderContext
+
+# Binary message with a historical map: type, step u32, loss f32, width u16,
+# height u16, followed by RGB pixels. Sent in reply to a seek request.
+FRAME_TYPE_HISTORY = 0x04
+HISTORY_HEADER = struct.Struct("<BIfHH")
+
+def flatten_parameters(model: Model) -> np.ndarray:
+    """
+    All parameters of `model` as one float16 vector. Both engines use the
+    same layout: each layer's weight matrix (out x in) followed by its bias.
+    """
+    if isinstance(model, NeuralNetwork):
+        with torch.no_grad():
+            flat = torch.nn.utils.parameters_to_vector(model.parameters())
+        return flat.numpy().astype(np.float16)
+    assert isinstance(model, NumpyNetwork)
+    return model.flat.astype(np.float16)
+
+def layer_dims(model: Model) -> List[int]:
+    """Input, hidden and output sizes of `model`."""
+    if isinstance(model, NeuralNetwork):
+        linear = [layer for layer in model.net if isinstance(layer, torch.nn.Linear)]
+        return [linear[0].in_features] + [layer.out_features for layer in linear]
+    assert isinstance(model, NumpyNetwork)
+    return list(model.dims)
+
+def copy_model(model: Model) -> Model:
+    """
+    An independent float32 copy of `model` (without dropout, in eval mode),
+    e.g. to render one consistent state while training goes on.
+    """
+    dims = layer_dims(model)
+    activation = getattr(model, "activation", "tanh")
+    copy = create_model(engine_of(model), dims[1:-1], dims[-1], activation, 0.0)
+    copy.load_state_dict_from_arrays(model.get_state_dict_as_arrays())
+    copy.eval()
+    return copy
+
+class WeightSnapshot:
+    """The parameters of a model at one training step, stored as float16."""
+    def __init__(self, step: int, loss: float, model: Model, activation: str) -> None:
+        self.step = step
+        self.loss = loss
+        self.engine = engine_of(model)
+        self.dims = layer_dims(model)
+        self.activation = activation
+        self.params = flatten_parameters(model)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.params.nbytes)
+
+    def to_model(self) -> Model:
+        """Rebuild the model (without dropout, it is only used for rendering)."""
+        model = create_model(
+            self.engine, self.dims[1:-1], self.dims[-1], self.activation, 0.0
+        )
+        params = self.params.astype(np.float32)
+        if isinstance(model, NeuralNetwork):
+            torch.nn.utils.vector_to_parameters(
+                torch.from_numpy(params), model.parameters()
+            )
+        else:
+            assert isinstance(model, NumpyNetwork)
+            model.flat[...] = params
+        model.eval()
+        return model
+
+class WeightHistory:
+    """
+    Per-session training history as a ring of float16 weight snapshots.
+
+    Every recorded step is kept until the ring is full (`capacity`
+    snapshots or `max_bytes` of parameters); then the snapshot whose removal
+    leaves the smallest gap relative to its age goes. Gaps therefore grow
+    with age: recent steps stay dense and old ones geometrically spaced,
+    while the first snapshot is always kept. Maps of any snapshot are
+    rendered on demand at any resolution, with a small LRU of rendered
+    frames for scrubbing back and forth.
+    """
+    def __init__(
+        self,
+        capacity: int = 256,
+        max_bytes: int = 16 * 1024 * 1024,
+        max_frames: int = 16
+    ) -> None:
+        self.capacity = max(3, capacity)
+        self.max_bytes = max_bytes
+        self.max_frames = max(1, max_frames)
+        self.lock = threading.Lock()
+        self.snapshots: List[WeightSnapshot] = []
+        self.nbytes = 0
+        self.frames: "OrderedDict[Tuple[int, int, int], bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.snapshots)
+
+    def steps(self) -> List[int]:
+        with self.lock:
+            return [snapshot.step for snapshot in self.snapshots]
+
+    def record(
+        self, model: Model, step: int, loss: float, activation: str = 'tanh'
+    ) -> bool:
+        """
+        Snapshot `model` at `step`; returns False if that step is already
+        recorded.
+        """
+        with self.lock:
+            if self.snapshots and step <= self.snapshots[-1].step:
+                return False
+        snapshot = WeightSnapshot(step, loss, model, activation)
+        with self.lock:
+            self.snapshots.append(snapshot)
+            self.nbytes += snapshot.nbytes
+            while len(self.snapshots) > 2 and (
+                len(self.snapshots) > self.capacity or self.nbytes > self.max_bytes
+            ):
+                self._evict()
+        return True
+
+    def _evict(self) -> None:
+        # Caller holds self.lock
+        steps = np.array(
+            [snapshot.step for snapshot in self.snapshots], dtype=np.float64
+        )
+        gaps = steps[2:] - steps[:-2]
+        ages = steps[-1] - steps[:-2] + 1
+        index = int(np.argmin(gaps / ages)) + 1
+        removed = self.snapshots.pop(index)
+        self.nbytes -= removed.nbytes
+        for key in [key for key in self.frames if key[0] == removed.step]:
+            del self.frames[key]
+
+    def nearest(self, step: int) -> Optional[WeightSnapshot]:
+        """The recorded snapshot closest to `step`."""
+        with self.lock:
+            if not self.snapshots:
+                return None
+            return min(self.snapshots, key=lambda snapshot: abs(snapshot.step - step))
+
+    def render(self, step: int, width: int, height: int) -> Optional[bytes]:
+        """
+        History frame (see HISTORY_HEADER) of the snapshot closest to `step`,
+        None if nothing has been recorded. Safe to call from worker threads.
+        """
+        snapshot = self.nearest(step)
+        if snapshot is None:
+            return None
+        key = (snapshot.step, width, height)
+        with self.lock:
+            frame = self.frames.get(key)
+            if frame is not None:
+                self.frames.move_to_end(key)
+                return frame
+
+        context = RenderContext(width, height)
+        context.render(snapshot.to_model())
+        header = HISTORY_HEADER.pack(
+            FRAME_TYPE_HISTORY, snapshot.step, snapshot.loss, width, height
+        )
+        frame = header + bytes(context.rgb())
+        with self.lock:
+            if snapshot not in self.snapshots:
+                # Evicted or cleared while rendering
+                return frame
+            self.frames[key] = frame
+            while len(self.frames) > self.max_frames:
+                self.frames.popitem(last=False)
+        return frame
+
+    def clear(self) -> None:
+        with self.lock:
+            self.snapshots = []
+            self.nbytes = 0
+            self.frames.clear()
+
@@ -0,0 +1,182 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from nnvisu.logic.dataset import Dataset
+from nnvisu.protocol import MAX_CLASSES, DataPoint
+
+IMPORT_FORMAT_CSV = "csv"
+IMPORT_FORMAT_NPY = "npy"
+IMPORT_FORMATS = (IMPORT_FORMAT_CSV, IMPORT_FORMAT_NPY)
+NPY_MAGIC = b"\x93NUMPY"
+
+# Limits of imported datasets (point ids must stay below dataset.MAX_POINT_ID)
+MAX_IMPORT_POINTS = 2_000_000
+MAX_IMPORT_CLASSES = MAX_CLASSES
+# Default total size of the conversions kept in the data directory
+MAX_DATA_DIR_BYTES = 2 << 30
+# Directory names of finished conversions (content hashes)
+_CONVERSION_NAME = re.compile(r"[0-9a-f]{32}")
+
+logger = logging.getLogger(__name__)
+
+def default_data_dir() -> Path:
+    return Path(tempfile.gettempdir()) / "nnvisu-datasets"
+
+def detect_format(raw: bytes, filename: Optional[str] = None) -> str:
+    """npy files by their magic bytes (or extension), anything else is read as CSV."""
+    if raw.startswith(NPY_MAGIC) or (filename or "").lower().endswith(".npy"):
+        return IMPORT_FORMAT_NPY
+    return IMPORT_FORMAT_CSV
+
+def parse_points(raw: bytes, fmt: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Coordinates and labels of a 2-D labelled dataset: the first three
+    columns of a CSV file (comma-separated, an optional header line is
+    skipped) or of an [n, 3] npy array are x, y and the label.
+    Raises ValueError for anything else.
+    """
+    if fmt == IMPORT_FORMAT_NPY:
+        array = np.load(io.BytesIO(raw), allow_pickle=False)
+    elif fmt == IMPORT_FORMAT_CSV:
+        first_line = raw.lstrip().split(b"\n", 1)[0]
+        try:
+            [float(value) for value in first_line.split(b",")[:3]]
+            header = 0
+        except ValueError:
+            header = 1
+        try:
+            array = np.loadtxt(
+                io.BytesIO(raw), delimiter=",", skiprows=header, usecols=(0, 1, 2),
+                ndmin=2, dtype=np.float64
+            )
+        except IndexError:
+            # Older numpy versions report missing columns this way
+            raise ValueError("Expected numeric columns x, y, label")
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    if array.ndim != 2 or array.shape[1] < 3 or array.dtype.kind not in "iuf":
+        raise ValueError("Expected numeric columns x, y, label")
+    n = array.shape[0]
+    if not 1 <= n <= MAX_IMPORT_POINTS:
+        raise ValueError(f"Expected 1 to {MAX_IMPORT_POINTS} points, got {n}")
+    xy = np.asarray(array[:, :2], dtype=np.float64)
+    labels = array[:, 2]
+    if not np.isfinite(xy).all():
+        raise ValueError("Coordinates must be finite")
+    integral = np.all(labels == np.round(labels))
+    if not (integral and labels.min() >= 0 and labels.max() < MAX_IMPORT_CLASSES):
+        raise ValueError(f"Labels must be integers from 0 to {MAX_IMPORT_CLASSES - 1}")
+    return xy, labels.astype(np.int64)
+
+def fit_to_bounds(xy: np.ndarray) -> np.ndarray:
+    """Center the points and scale them uniformly to fill [-1, 1]^2 (the canvas)."""
+    low = xy.min(axis=0)
+    high = xy.max(axis=0)
+    scale = float((high - low).max()) / 2
+    return (xy - (low + high) / 2) / (scale if scale > 0 else 1.0)
+
+def preview_points(dataset: Dataset, limit: int) -> List[DataPoint]:
+    """A random sample of at most `limit` points (with ids) for display."""
+    rows = None
+    if len(dataset) > limit:
+        rng = np.random.default_rng()
+        rows = np.sort(rng.choice(len(dataset), limit, replace=False))
+    return dataset.to_points(rows)
+
+def _convert(raw: bytes, fmt: str, normalize: bool, directory: Path) -> None:
+    xy, labels = parse_points(raw, fmt)
+    if normalize:
+        xy = fit_to_bounds(xy)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    # Written next to the target and renamed, so a complete conversion
+    # is all another import of the same file can see
+    partial = Path(tempfile.mkdtemp(dir=directory.parent))
+    np.save(partial / "xy.npy", xy.astype(np.float32))
+    np.save(partial / "labels.npy", labels)
+    try:
+        os.rename(partial, directory)
+    except OSError:
+        # Converted concurrently; use that one
+        shutil.rmtree(partial, ignore_errors=True)
+
+def _conversion_size(directory: Path) -> int:
+    try:
+        return sum(path.stat().st_size for path in directory.iterdir())
+    except OSError:
+        # Evicted concurrently
+        return 0
+
+def evict_conversions(
+    data_dir: Path, max_bytes: int, keep: Optional[Path] = None
+) -> None:
+    """
+    Delete the least recently imported conversions in `data_dir` until the
+    rest fit into `max_bytes`; `keep` is never deleted. Sessions training
+    on a deleted conversion are not affected (their mapping stays valid),
+    importing that file again converts it again.
+    """
+    conversions = []
+    for directory in Path(data_dir).iterdir():
+        if not _CONVERSION_NAME.fullmatch(directory.name) or directory == keep:
+            continue
+        try:
+            mtime = directory.stat().st_mtime
+            conversions.append((mtime, _conversion_size(directory), directory))
+        except OSError:
+            continue
+    total = sum(size for _, size, _ in conversions)
+    if keep is not None:
+        total += _conversion_size(keep)
+
+    for _, size, directory in sorted(conversions):
+        if total <= max_bytes:
+            break
+        try:
+            shutil.rmtree(directory)
+            total -= size
+            logger.info(f"Evicted imported dataset {directory.name}")
+        except FileNotFoundError:
+            # Evicted by a concurrent import
+            total -= size
+        except OSError as e:
+            # Still mapped on platforms that do not allow deleting it
+            logger.warning(f"Could not evict {directory}: {e}")
+
+def import_dataset(
+    raw: bytes,
+    data_dir: Path,
+    fmt: Optional[str] = None,
+    normalize: bool = True,
+    max_bytes: int = MAX_DATA_DIR_BYTES
+) -> Dataset:
+    """
+    Convert an uploaded dataset to columnar npy files in `data_dir` and
+    open them memory-mapped (see Dataset.memory_mapped). Conversions are
+    keyed by content, so importing the same file again reuses them; the
+    least recently imported ones are evicted beyond `max_bytes` in total.
+    """
+    fmt = fmt or detect_format(raw)
+    digest = hashlib.sha256(raw)
+    digest.update(f":{fmt}:{int(normalize)}".encode())
+    directory = Path(data_dir) / digest.hexdigest()[:32]
+
+    try:
+        # Mark as recently used, so it is evicted last
+        os.utime(directory)
+        dataset = Dataset.memory_mapped(directory)
+    except FileNotFoundError:
+        # Not converted yet (or evicted meanwhile)
+        _convert(raw, fmt, normalize, directory)
+        dataset = Dataset.memory_mapped(directory)
+    evict_conversions(directory.parent, max_bytes, keep=directory)
+    return dataset
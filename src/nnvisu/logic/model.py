@@ -1,3 +1,4 @@
+import numpy as np
 import torch
 from torch import nn
 from typing import Dict, Any
@@ -24,6 +25,7 @@ class NeuralNetwork(nn.Module): # type: ignore
             'leaky_relu': lambda: nn.LeakyReLU(0.01),
             'gelu': nn.GELU
         }.get(activation.lower(), nn.Tanh)
+        self.activation = activation.lower() if act_fn is not nn.Tanh else 'tanh'
 
         for h in hidden_layers:
             layers.append(nn.Linear(input_dim, h))
@@ -35,9 +37,19 @@ class NeuralNetwork(nn.Module): # type: ignore
         layers.append(nn.Linear(input_dim, output_dim)) # Output classes (logits)
         self.net = nn.Sequential(*layers)
         self.to(torch.device("cpu"))
+        # Parameter version, bumped on every update (see render.bump_version)
+        self.version = 0
+        # Bumped when parameter tensors are replaced (adapt_output_layer), so
+        # stateful trainers know their optimizer no longer matches
+        self.structure_version = 0
 
     def forward(self, x: torch.Tensor) -> torch.Tensor:
         return self.net(x)
+
+    @property
+    def output_dim(self) -> int:
+        """Number of output classes."""
+        return int(self.net[-1].out_features)
     
     def get_state_dict_as_list(self) -> Dict[str, Any]:
         """Export weights and biases as simple lists."""
@@ -50,6 +62,28 @@ class NeuralNetwork(nn.Module): # type: ignore
                 biases.append(layer.bias.data.tolist())
         return {"weights": weights, "biases": biases}
 
+    def get_state_dict_as_arrays(self) -> Dict[str, Any]:
+        """Export weights and biases as float32 arrays for the binary weights frame."""
+        linear = [layer for layer in self.net if isinstance(layer, nn.Linear)]
+        return {
+            "weights": [layer.weight.detach().numpy().copy() for layer in linear],
+            "biases": [layer.bias.detach().numpy().copy() for layer in linear]
+        }
+
+    def load_state_dict_from_arrays(self, state: Dict[str, Any]) -> None:
+        """
+        Load weights and biases from arrays of the parameters' shapes without
+        going through Python lists. The values are copied into the existing
+        parameters, so shared-memory storage (ProcessBackend) stays shared.
+        """
+        linear = [layer for layer in self.net if isinstance(layer, nn.Linear)]
+        with torch.no_grad():
+            for key, attr in (("weights", "weight"), ("biases", "bias")):
+                for layer, values in zip(linear, state.get(key, [])):
+                    array = np.ascontiguousarray(values, dtype=np.float32)
+                    getattr(layer, attr).copy_(torch.from_numpy(array))
+        self.version += 1
+
     def load_state_dict_from_list(self, state: Dict[str, Any]) -> None:
         """Load weights and biases from simple lists."""
         weight_list = state.get("weights", [])
@@ -64,6 +98,7 @@ class NeuralNetwork(nn.Module): # type: ignore
                 if linear_idx < len(bias_list):
                     layer.bias.data = torch.tensor(bias_list[linear_idx], device=device)
                 linear_idx += 1
+        self.version += 1
 
     def adapt_output_layer(self, new_output_dim: int) -> None:
         """Adapt the final layer to a new number of output classes."""
@@ -88,4 +123,6 @@ class NeuralNetwork(nn.Module): # type: ignore
             # If adding classes, new ones are already randomized by nn.Linear init
             
         self.net[last_layer_idx] = new_layer
+        self.version += 1
+        self.structure_version += 1
 
@@ -0,0 +1,431 @@
+import math
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING, cast
+
+import numpy as np
+import torch
+
+from nnvisu.logic.render import bump_version
+from nnvisu.logic.trainer import StatefulTrainer, TrainingData, _as_tensors
+
+if TYPE_CHECKING:
+    from nnvisu.logic.engines import Model
+
+ACTIVATIONS = ('tanh', 'relu', 'leaky_relu', 'gelu')
+LEAKY_SLOPE = 0.01
+
+_INV_SQRT2 = 1.0 / math.sqrt(2.0)
+_INV_SQRT2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+def _erf(x: np.ndarray) -> np.ndarray:
+    """Vectorized erf (Abramowitz & Stegun 7.1.26, absolute error < 1.5e-7)."""
+    a = np.abs(x)
+    t = 1.0 / (1.0 + 0.3275911 * a)
+    poly = ((((1.061405429 * t - 1.453152027) * t + 1.421413741) * t - 0.284496736) * t
+            + 0.254829592) * t
+    return cast(np.ndarray, np.sign(x) * (1.0 - poly * np.exp(-a * a)))
+
+def _activate(name: str, z: np.ndarray) -> np.ndarray:
+    if name == 'relu':
+        return cast(np.ndarray, np.maximum(z, 0.0))
+    if name == 'leaky_relu':
+        return np.where(z > 0, z, z * LEAKY_SLOPE)
+    if name == 'gelu':
+        return cast(np.ndarray, 0.5 * z * (1.0 + _erf(z * _INV_SQRT2)))
+    return cast(np.ndarray, np.tanh(z))
+
+def _activation_grad(name: str, z: np.ndarray, a: np.ndarray) -> np.ndarray:
+    """Derivative of the activation given its input z and output a."""
+    if name == 'relu':
+        return (z > 0).astype(z.dtype)
+    if name == 'leaky_relu':
+        return np.where(z > 0, 1.0, LEAKY_SLOPE).astype(z.dtype)
+    if name == 'gelu':
+        cdf = 0.5 * (1.0 + _erf(z * _INV_SQRT2))
+        return cast(np.ndarray, cdf + z * np.exp(-0.5 * z * z) * _INV_SQRT2PI)
+    return cast(np.ndarray, 1.0 - a * a)
+
+class NumpyNetwork:
+    """
+    Multi-layer perceptron with the NeuralNetwork API, implemented in NumPy.
+
+    All parameters live in one flat float32 buffer (`flat`), with per-layer
+    weight/bias views on top of it; gradients use a second buffer with the
+    same layout (`grad`). This keeps forward/backward free of autograd
+    dispatch and lets the optimizers update every parameter in one
+    vectorized operation.
+    """
+    def __init__(
+        self,
+        hidden_layers: list[int] | None = None,
+        output_dim: int = 2,
+        activation: str = 'tanh',
+        dropout: float = 0.0
+    ):
+        if hidden_layers is None:
+            hidden_layers = [10, 5]
+        activation = activation.lower()
+        self.activation = activation if activation in ACTIVATIONS else 'tanh'
+        self.dropout = dropout
+        self.training = True
+        self._shared: Optional[torch.Tensor] = None
+        # Parameter version, bumped on every update (see render.bump_version)
+        self.version = 0
+
+        self._layout([2] + list(hidden_layers) + [output_dim])
+        for i in range(len(self.weights)):
+            self._init_layer(i)
+
+    def _layout(self, dims: List[int], flat: Optional[np.ndarray] = None) -> None:
+        self.dims = dims
+        total = sum(dims[i + 1] * dims[i] + dims[i + 1] for i in range(len(dims) - 1))
+        self.flat = flat if flat is not None else np.zeros(total, dtype=np.float32)
+        self.grad = np.zeros(total, dtype=np.float32)
+        self.weights, self.biases = self._views(self.flat)
+        self.grad_weights, self.grad_biases = self._views(self.grad)
+
+    def _views(self, buffer: np.ndarray) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        weights = []
+        biases = []
+        offset = 0
+        for fan_in, fan_out in zip(self.dims[:-1], self.dims[1:]):
+            weight = buffer[offset:offset + fan_out * fan_in]
+            weights.append(weight.reshape(fan_out, fan_in))
+            offset += fan_out * fan_in
+            biases.append(buffer[offset:offset + fan_out])
+            offset += fan_out
+        return weights, biases
+
+    def _init_layer(self, i: int, rows: slice = slice(None)) -> None:
+        # Same distribution as torch.nn.Linear's default initialization
+        bound = 1.0 / math.sqrt(self.dims[i])
+        weight = self.weights[i][rows]
+        bias = self.biases[i][rows]
+        weight[...] = np.random.uniform(-bound, bound, size=weight.shape)
+        bias[...] = np.random.uniform(-bound, bound, size=bias.shape)
+
+    @property
+    def output_dim(self) -> int:
+        """Number of output classes."""
+        return self.dims[-1]
+
+    def train(self, mode: bool = True) -> "NumpyNetwork":
+        self.training = mode
+        return self
+
+    def eval(self) -> "NumpyNetwork":
+        return self.train(False)
+
+    def forward(self, X: np.ndarray) -> np.ndarray:  # noqa: N803
+        """Return the logits for a [N, 2] float32 array."""
+        h = X
+        last = len(self.weights) - 1
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            z: np.ndarray = h @ weight.T
+            z += bias
+            if i == last:
+                return z
+            h = _activate(self.activation, z)
+            if self.training and self.dropout > 0:
+                h = h * self._dropout_mask(h.shape)
+        return h
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        return torch.from_numpy(self.forward(x.numpy()))
+
+    def _dropout_mask(self, shape: Tuple[int, ...]) -> np.ndarray:
+        keep = np.random.random_sample(shape) >= self.dropout
+        return keep.astype(np.float32) / (1.0 - self.dropout)
+
+    def loss_and_grad(self, X: np.ndarray, y: np.ndarray) -> float:  # noqa: N803
+        """
+        Forward pass with mean cross-entropy loss, followed by a hand-written
+        backward pass that writes all gradients into `self.grad`.
+        """
+        n = X.shape[0]
+        last = len(self.weights) - 1
+        inputs = [X]       # input of every linear layer
+        pre: List[np.ndarray] = []    # pre-activations of hidden layers
+        acts: List[np.ndarray] = []   # activations before dropout
+        masks: List[Optional[np.ndarray]] = []
+
+        h = X
+        z = X
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            z = h @ weight.T
+            z += bias
+            if i == last:
+                break
+            a = _activate(self.activation, z)
+            mask = None
+            if self.training and self.dropout > 0:
+                mask = self._dropout_mask(a.shape)
+                h = a * mask
+            else:
+                h = a
+            pre.append(z)
+            acts.append(a)
+            masks.append(mask)
+            inputs.append(h)
+
+        # Softmax cross-entropy on the logits
+        rows = np.arange(n)
+        shifted = z - z.max(axis=1, keepdims=True)
+        exp = np.exp(shifted)
+        sums = exp.sum(axis=1)
+        loss = float(np.mean(np.log(sums) - shifted[rows, y]))
+
+        delta = exp / sums[:, None]
+        delta[rows, y] -= 1.0
+        delta /= n
+
+        for i in range(last, -1, -1):
+            np.matmul(delta.T, inputs[i], out=self.grad_weights[i])
+            np.sum(delta, axis=0, out=self.grad_biases[i])
+            if i == 0:
+                break
+            dh = delta @ self.weights[i]
+            mask = masks[i - 1]
+            if mask is not None:
+                dh *= mask
+            delta = dh * _activation_grad(self.activation, pre[i - 1], acts[i - 1])
+
+        return loss
+
+    def get_state_dict_as_list(self) -> Dict[str, Any]:
+        """Export weights and biases as simple lists."""
+        return {
+            "weights": [w.tolist() for w in self.weights],
+            "biases": [b.tolist() for b in self.biases]
+        }
+
+    def get_state_dict_as_arrays(self) -> Dict[str, Any]:
+        """Export weights and biases as float32 arrays for the binary weights frame."""
+        return {
+            "weights": [w.copy() for w in self.weights],
+            "biases": [b.copy() for b in self.biases]
+        }
+
+    def load_state_dict_from_arrays(self, state: Dict[str, Any]) -> None:
+        """Load weights and biases from arrays; the list loader uses np.asarray."""
+        self.load_state_dict_from_list(state)
+
+    def load_state_dict_from_list(self, state: Dict[str, Any]) -> None:
+        """Load weights and biases from simple lists."""
+        weights = [w.copy() for w in self.weights]
+        biases = [b.copy() for b in self.biases]
+        for i, w in enumerate(state.get("weights", [])[:len(weights)]):
+            weights[i] = np.asarray(w, dtype=np.float32)
+        for i, b in enumerate(state.get("biases", [])[:len(biases)]):
+            biases[i] = np.asarray(b, dtype=np.float32)
+
+        dims = [weights[0].shape[1]] + [w.shape[0] for w in weights]
+        if dims != self.dims:
+            self._layout(dims)
+        for i in range(len(weights)):
+            self.weights[i][...] = weights[i]
+            self.biases[i][...] = biases[i]
+        bump_version(self)
+
+    def adapt_output_layer(self, new_output_dim: int) -> None:
+        """Adapt the final layer to a new number of output classes."""
+        old_output_dim = self.dims[-1]
+        if old_output_dim == new_output_dim:
+            return
+
+        old_weight = self.weights[-1].copy()
+        old_bias = self.biases[-1].copy()
+        old_flat = self.flat
+        self._layout(self.dims[:-1] + [new_output_dim])
+        # Hidden layers keep their values; the output layer is copied row-wise
+        head = old_flat.shape[0] - old_weight.size - old_bias.size
+        self.flat[:head] = old_flat[:head]
+
+        min_out = min(old_output_dim, new_output_dim)
+        self.weights[-1][:min_out] = old_weight[:min_out]
+        self.biases[-1][:min_out] = old_bias[:min_out]
+        if new_output_dim > old_output_dim:
+            self._init_layer(len(self.weights) - 1, slice(old_output_dim, None))
+        # The new buffer is private again
+        self._shared = None
+        bump_version(self)
+
+    def share_memory(self) -> "NumpyNetwork":
+        """Move the parameter buffer to shared memory (for the process backend)."""
+        if self._shared is None:
+            shared = torch.empty(self.flat.shape[0], dtype=torch.float32)
+            shared.share_memory_()  # type: ignore[no-untyped-call]
+            shared_flat = shared.numpy()
+            shared_flat[...] = self.flat
+            self._shared = shared
+            self._layout(self.dims, shared_flat)
+        return self
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        for key in ("flat", "grad", "weights", "biases", "grad_weights", "grad_biases"):
+            state.pop(key)
+        # Shared parameters travel as the torch tensor (by handle, not by value)
+        state["_params"] = self._shared if self._shared is not None else self.flat
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        params = state.pop("_params")
+        self.__dict__.update(state)
+        flat = params.numpy() if isinstance(params, torch.Tensor) else params
+        self._layout(self.dims, flat)
+
+class NumpyOptimizer:
+    """
+    Adam / SGD / RMSprop over the flat parameter buffer, matching the update
+    rules (and defaults) of the corresponding torch.optim classes. Every step
+    is a handful of in-place vectorized operations on preallocated buffers.
+    """
+    BETAS = (0.9, 0.999)
+    RMSPROP_ALPHA = 0.99
+    EPS = 1e-8
+
+    def __init__(
+        self, name: str, learning_rate: float, weight_decay: float, size: int
+    ) -> None:
+        self.name = name if name in ('sgd', 'adam', 'rmsprop') else 'adam'
+        self.lr = learning_rate
+        self.weight_decay = weight_decay
+        self.steps = 0
+        self.avg = np.zeros(size, dtype=np.float32)      # Adam m
+        self.avg_sq = np.zeros(size, dtype=np.float32)   # Adam v / RMSprop mean square
+        self.grad_buf = np.zeros(size, dtype=np.float32)
+        self.tmp = np.zeros(size, dtype=np.float32)
+
+    def step(self, params: np.ndarray, grad: np.ndarray) -> None:
+        if self.weight_decay:
+            np.multiply(params, self.weight_decay, out=self.grad_buf)
+            self.grad_buf += grad
+            grad = self.grad_buf
+        tmp = self.tmp
+
+        if self.name == 'sgd':
+            np.multiply(grad, self.lr, out=tmp)
+            params -= tmp
+            return
+
+        if self.name == 'rmsprop':
+            alpha = self.RMSPROP_ALPHA
+            self.avg_sq *= alpha
+            np.multiply(grad, grad, out=tmp)
+            tmp *= 1.0 - alpha
+            self.avg_sq += tmp
+            np.sqrt(self.avg_sq, out=tmp)
+            tmp += self.EPS
+            np.divide(grad, tmp, out=tmp)
+            tmp *= self.lr
+            params -= tmp
+            return
+
+        beta1, beta2 = self.BETAS
+        self.steps += 1
+        self.avg *= beta1
+        np.multiply(grad, 1.0 - beta1, out=tmp)
+        self.avg += tmp
+        self.avg_sq *= beta2
+        np.multiply(grad, grad, out=tmp)
+        tmp *= 1.0 - beta2
+        self.avg_sq += tmp
+
+        bias_correction1 = 1.0 - beta1 ** self.steps
+        bias_correction2 = 1.0 - beta2 ** self.steps
+        np.sqrt(self.avg_sq, out=tmp)
+        tmp /= math.sqrt(bias_correction2)
+        tmp += self.EPS
+        np.divide(self.avg, tmp, out=tmp)
+        tmp *= self.lr / bias_correction1
+        params -= tmp
+
+class NumpyTrainer(StatefulTrainer):
+    """StatefulTrainer that drives NumpyNetwork models with NumpyOptimizer."""
+    def __init__(self) -> None:
+        super().__init__()
+        self.np_optimizer: Optional[NumpyOptimizer] = None
+        self.current_params_id: int | None = None
+
+    def _get_optimizer(  # type: ignore[override]
+        self, model: NumpyNetwork, config: Dict[str, Any]
+    ) -> NumpyOptimizer:
+        learning_rate = config.get("learningRate", 0.001)
+        optimizer_name = config.get("optimizer", "adam").lower()
+        regularization = config.get("regularization", 0.0)
+        # The buffer is replaced when the output layer is adapted
+        params_id = id(model.flat)
+
+        if (self.np_optimizer is None or
+            params_id != self.current_params_id or
+            optimizer_name != self.current_opt_name or
+            learning_rate != self.current_lr or
+            regularization != self.current_reg):
+
+            self.np_optimizer = NumpyOptimizer(
+                optimizer_name, learning_rate, regularization, model.flat.shape[0]
+            )
+            self.current_params_id = params_id
+            self.current_opt_name = optimizer_name
+            self.current_lr = learning_rate
+            self.current_reg = regularization
+
+        return self.np_optimizer
+
+    def train_step(
+        self, model: "Model", data: TrainingData, config: Dict[str, Any]
+    ) -> float:
+        """Single step with a fresh optimizer (stateless)."""
+        self.np_optimizer = None
+        return self.train_step_stateful(model, data, config)
+
+    def train_step_stateful(
+        self, model: "Model", data: TrainingData, config: Dict[str, Any]
+    ) -> float:
+        assert isinstance(model, NumpyNetwork)
+        X, y = _as_tensors(data)  # noqa: N806
+        if X.shape[0] == 0:
+            return 0.0
+        X, y = self._sample_batch(X, y, config.get("batchSize", 0))  # noqa: N806
+
+        optimizer = self._get_optimizer(model, config)
+        model.train()
+        loss = model.loss_and_grad(X.numpy(), y.numpy())
+        optimizer.step(model.flat, model.grad)
+        bump_version(model)
+        return loss
+
+    def train_steps_fused(
+        self,
+        model: "Model",
+        data_x: torch.Tensor,
+        data_y: torch.Tensor,
+        data_version: int,
+        config: Dict[str, Any],
+        num_steps: int
+    ) -> float:
+        assert isinstance(model, NumpyNetwork)
+        n = data_x.shape[0]
+        if n == 0 or num_steps <= 0:
+            return 0.0
+
+        batch_size = config.get("batchSize", 0)
+        if batch_size <= 0 or batch_size >= n:
+            batch_size = n
+
+        optimizer = self._get_optimizer(model, config)
+        model.train()
+        xs, ys = data_x.numpy(), data_y.numpy()
+
+        total_loss = 0.0
+        for _ in range(num_steps):
+            if batch_size == n:
+                X, y = xs, ys  # noqa: N806
+            else:
+                indices = self.sampler.next_batch(n, batch_size, data_version).numpy()
+                X, y = xs[indices], ys[indices]  # noqa: N806
+            total_loss += model.loss_and_grad(X, y)
+            optimizer.step(model.flat, model.grad)
+        bump_version(model, num_steps)
+
+        return total_loss / num_steps
@@ -0,0 +1,467 @@
+import os
+import struct
+import threading
+import weakref
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+# Class colors matching frontend (RGB)
+CLASS_COLORS = [
+    [52, 152, 219],  # #3498db Blue
+    [230, 126, 34], # #e67e22 Orange
+    [231, 76, 60],  # #e74c3c Red
+    [155, 89, 182], # #9b59b6 Purple
+    [46, 204, 113], # #2ecc71 Green
+    [241, 196, 15], # #f1c40f Yellow
+    [121, 85, 72],  # #795548 Brown
+    [52, 73, 94]    # #34495e Navy
+]
+
+# (version, width, height, num_classes, renderer tag)
+FrameKey = Tuple[int, int, int, int, str]
+
+# Binary WebSocket message type of a decision map frame
+FRAME_TYPE_MAP = 0x01
+# Type byte + width and height as u16 little-endian
+FRAME_HEADER_SIZE = 5
+
+# Pixel formats of a map and their bytes per pixel:
+# - rgb: class colors blended by probability (rendered on the server)
+# - index: argmax class, confidence quantized to 0..255
+# - top2: the two most likely classes and the share of the first one in
+#   their mixture, quantized to 0..255
+PIXEL_FORMAT_RGB = "rgb"
+PIXEL_FORMAT_INDEX = "index"
+PIXEL_FORMAT_TOP2 = "top2"
+PIXEL_FORMATS = {PIXEL_FORMAT_RGB: 3, PIXEL_FORMAT_INDEX: 2, PIXEL_FORMAT_TOP2: 3}
+
+# Region of the input space shown by a map: (x0, x1, y0, y1)
+Bounds = Tuple[float, float, float, float]
+DEFAULT_BOUNDS: Bounds = (-1.0, 1.0, -1.0, 1.0)
+
+@lru_cache(maxsize=16)
+def grid_tensor(
+    width: int, height: int, bounds: Bounds = DEFAULT_BOUNDS
+) -> torch.Tensor:
+    """
+    Sample points of a width x height map over `bounds` ([-1, 1]^2 by
+    default), row-major from the top-left corner. Cached per resolution and
+    bounds; callers must not modify it.
+    """
+    x0, x1, y0, y1 = bounds
+    x = np.linspace(x0, x1, width)
+    y = np.linspace(y1, y0, height) # Top-down for image
+    xv, yv = np.meshgrid(x, y)
+    grid_points = np.stack([xv.flatten(), yv.flatten()], axis=1)
+    return torch.tensor(grid_points, dtype=torch.float32, device=torch.device("cpu"))
+
+@lru_cache(maxsize=64)
+def class_palette(num_classes: int) -> np.ndarray:
+    """
+    Color matrix [num_classes, 3]; classes beyond CLASS_COLORS get stable
+    random colors.
+    """
+    colors = np.array(CLASS_COLORS, dtype=np.int64)
+    if num_classes > len(colors):
+        rng = np.random.default_rng(num_classes)
+        extra = rng.integers(0, 255, size=(num_classes - len(colors), 3))
+        colors = np.vstack([colors, extra])
+    else:
+        colors = colors[:num_classes]
+    colors.setflags(write=False)
+    return colors
+
+@lru_cache(maxsize=64)
+def palette_tensor(num_classes: int) -> torch.Tensor:
+    """class_palette as a float32 tensor for the blending matmul."""
+    return torch.from_numpy(class_palette(num_classes).astype(np.float32))
+
+def model_version(model: Any) -> int:
+    """Parameter version of a model (bumped by the trainers on every update)."""
+    return int(getattr(model, "version", 0))
+
+def bump_version(model: Any, steps: int = 1) -> None:
+    """Mark the parameters of `model` as changed."""
+    model.version = model_version(model) + steps
+
+class MapRenderCache:
+    """
+    Rendered decision maps keyed by model and (version, width, height,
+    num_classes). A frame is only recomputed after the weights changed;
+    repeated requests for the same state (several viewers, a session that
+    is not training) are served from memory. Entries are dropped together
+    with their model.
+    """
+    def __init__(self, max_frames_per_model: int = 4) -> None:
+        self.max_frames_per_model = max(1, max_frames_per_model)
+        self.lock = threading.Lock()
+        self.frames: "weakref.WeakKeyDictionary[Any, OrderedDict[FrameKey, bytes]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model: Any, key: FrameKey) -> Optional[bytes]:
+        with self.lock:
+            frames = self.frames.get(model)
+            frame = frames.get(key) if frames is not None else None
+            if frames is None or frame is None:
+                self.misses += 1
+                return None
+            frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, model: Any, key: FrameKey, frame: bytes) -> None:
+        with self.lock:
+            frames = self.frames.setdefault(model, OrderedDict())
+            frames[key] = frame
+            frames.move_to_end(key)
+            while len(frames) > self.max_frames_per_model:
+                frames.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.frames = weakref.WeakKeyDictionary()
+            self.hits = 0
+            self.misses = 0
+
+# Shared by all trainers so that every viewer of a model hits the same entries
+MAP_CACHE = MapRenderCache()
+
+def _probabilities(model: Any, points: torch.Tensor) -> torch.Tensor:
+    """Softmax of the model's logits at `points` (call under torch.no_grad)."""
+    # The logits are a fresh tensor, so softmax runs in place on them
+    probs: torch.Tensor = model(points)
+    probs -= probs.amax(dim=1, keepdim=True)
+    probs.exp_()
+    probs /= probs.sum(dim=1, keepdim=True)
+    return probs
+
+def encode_map_header(width: int, height: int) -> bytes:
+    """Header of a binary map message: type byte, width and height (u16 LE)."""
+    return (bytes([FRAME_TYPE_MAP]) + width.to_bytes(2, 'little') +
+            height.to_bytes(2, 'little'))
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    crc = struct.pack(">I", zlib.crc32(kind + data))
+    return struct.pack(">I", len(data)) + kind + data + crc
+
+def encode_png(rgb: Any, width: int, height: int, level: int = 6) -> bytes:
+    """Encode width * height RGB pixels as an 8-bit truecolor PNG."""
+    rows = np.frombuffer(rgb, dtype=np.uint8).reshape(height, width * 3)
+    # Every scanline starts with its filter type (0: none)
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), rows])
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n" +
+        _png_chunk(b"IHDR", header) +
+        _png_chunk(b"IDAT", zlib.compress(raw.tobytes(), level)) +
+        _png_chunk(b"IEND", b"")
+    )
+
+def render_tag(
+    kind: str, pixel_format: str = PIXEL_FORMAT_RGB, bounds: Bounds = DEFAULT_BOUNDS
+) -> str:
+    """Render cache entries differ per renderer, pixel format and viewport."""
+    tag = f"{kind}:{pixel_format}"
+    if bounds != DEFAULT_BOUNDS:
+        tag += ":" + ",".join(repr(float(v)) for v in bounds)
+    return tag
+
+class RenderContext:
+    """
+    Preallocated buffers for rendering frames of one size: the grid tensor,
+    the float32 blend matrix and a single frame buffer that already holds the
+    header, with the pixels written in place behind it. A context must not be
+    used by two renders at once (the handler keeps one per session, which
+    has at most one render in flight).
+
+    `pixel_format` selects what a pixel holds (see PIXEL_FORMATS): blended
+    RGB, or class indices with a quantized confidence/mixing weight for the
+    client to colourize. Only RGB frames are sent with their header as is;
+    the other formats always go through frames.FrameEncoder.
+    """
+    kind = "dense"
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        pixel_format: str = PIXEL_FORMAT_RGB,
+        bounds: Bounds = DEFAULT_BOUNDS
+    ) -> None:
+        if pixel_format not in PIXEL_FORMATS:
+            raise ValueError(f"Unknown pixel format: {pixel_format}")
+        self.width = width
+        self.height = height
+        self.pixel_format = pixel_format
+        self.channels = PIXEL_FORMATS[pixel_format]
+        self.bounds = bounds
+        self.tag = render_tag(self.kind, pixel_format, bounds)
+        num_pixels = width * height
+        self.grid = grid_tensor(width, height, bounds)
+        self.frame = bytearray(FRAME_HEADER_SIZE + num_pixels * self.channels)
+        self.frame[:FRAME_HEADER_SIZE] = encode_map_header(width, height)
+        self.view = memoryview(self.frame)
+        self.pixels = torch.frombuffer(
+            self.frame, dtype=torch.uint8, offset=FRAME_HEADER_SIZE
+        ).view(num_pixels, self.channels)
+
+        if pixel_format == PIXEL_FORMAT_RGB:
+            self.blend = torch.empty((num_pixels, 3), dtype=torch.float32)
+        else:
+            k = 1 if pixel_format == PIXEL_FORMAT_INDEX else 2
+            self.top_values = torch.empty((num_pixels, k), dtype=torch.float32)
+            self.top_indices = torch.empty((num_pixels, k), dtype=torch.long)
+            self.weight = torch.empty((num_pixels,), dtype=torch.float32)
+
+    def render(self, model: Any) -> memoryview:
+        """Render `model` into the frame buffer and return a view of the whole frame."""
+        with torch.no_grad():
+            self._write_pixels(_probabilities(model, self.grid))
+        return self.view
+
+    def _write_pixels(self, probs: torch.Tensor) -> None:
+        if self.pixel_format == PIXEL_FORMAT_RGB:
+            # Weighted average of the class colors, truncated to uint8 in place
+            torch.mm(probs, palette_tensor(probs.shape[1]), out=self.blend)
+            self.pixels.copy_(self.blend)
+            return
+
+        k = self.top_values.shape[1]
+        torch.topk(probs, k, dim=1, out=(self.top_values, self.top_indices))
+        self.pixels[:, :k].copy_(self.top_indices)
+        if self.pixel_format == PIXEL_FORMAT_INDEX:
+            # Confidence of the winning class
+            torch.mul(self.top_values[:, 0], 255.0, out=self.weight)
+        else:
+            # Share of the first class in the top-2 mixture
+            torch.add(self.top_values[:, 0], self.top_values[:, 1], out=self.weight)
+            torch.div(self.top_values[:, 0], self.weight, out=self.weight)
+            self.weight.mul_(255.0)
+        self.weight.round_()
+        self.pixels[:, k].copy_(self.weight)
+
+    def data(self) -> memoryview:
+        """View of the pixel part of the frame buffer."""
+        return self.view[FRAME_HEADER_SIZE:]
+
+    def rgb(self) -> memoryview:
+        """View of the RGB part of the frame buffer (RGB contexts)."""
+        return self.data()
+
+class AdaptiveRenderContext(RenderContext):
+    """
+    Quadtree renderer for large maps. The model is evaluated on a coarse
+    lattice of pixels `coarse_step` apart. Every cell whose corners disagree
+    on the argmax class, or whose corner probabilities differ by more than
+    `threshold`, is split into four and the new corners are evaluated; all
+    other cells are filled by bilinear interpolation of their corners. The
+    refinement runs level by level with one batched forward pass per level,
+    so the cost grows with the length of the decision boundaries rather
+    than with the number of pixels.
+
+    Features smaller than a coarse cell whose corners all agree can be
+    missed; `coarse_step` bounds the size of such features.
+    """
+    kind = "adaptive"
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        coarse_step: int = 8,
+        threshold: float = 0.1,
+        pixel_format: str = PIXEL_FORMAT_RGB,
+        bounds: Bounds = DEFAULT_BOUNDS
+    ) -> None:
+        super().__init__(width, height, pixel_format, bounds)
+        self.coarse_step = max(1, coarse_step)
+        self.threshold = threshold
+        self.known = np.zeros((height, width), dtype=bool)
+        self.probs = np.zeros((0, 0, 0), dtype=np.float32)
+        # Number of model evaluations in the last render
+        self.evaluated = 0
+
+    def render(self, model: Any) -> memoryview:
+        width, height = self.width, self.height
+        num_classes = int(model.output_dim)
+        if self.probs.shape != (height, width, num_classes):
+            self.probs = np.zeros((height, width, num_classes), dtype=np.float32)
+        self.known[...] = False
+        self.evaluated = 0
+
+        # Coarse lattice; the last row/column is always included
+        xs = np.unique(np.r_[np.arange(0, width, self.coarse_step), width - 1])
+        ys = np.unique(np.r_[np.arange(0, height, self.coarse_step), height - 1])
+        if xs.size < 2 or ys.size < 2:
+            # A single row or column has no cells to refine
+            return super().render(model)
+        with torch.no_grad():
+            gy, gx = np.meshgrid(ys, xs, indexing="ij")
+            self._evaluate(model, gy.ravel(), gx.ravel())
+
+            # Cells as arrays of their corner coordinates
+            cy0, cx0 = np.meshgrid(ys[:-1], xs[:-1], indexing="ij")
+            cy1, cx1 = np.meshgrid(ys[1:], xs[1:], indexing="ij")
+            cells = [a.ravel() for a in (cy0, cy1, cx0, cx1)]
+            while cells[0].size:
+                cells = self._refine_level(model, *cells)
+
+            probs = torch.from_numpy(self.probs.reshape(height * width, num_classes))
+            self._write_pixels(probs)
+        return self.view
+
+    def _evaluate(self, model: Any, ys: np.ndarray, xs: np.ndarray) -> None:
+        """Evaluate the model at the given pixels (skipping known ones)."""
+        flat = np.unique(ys * self.width + xs)
+        flat = flat[~self.known.ravel()[flat]]
+        if flat.size == 0:
+            return
+        probs = _probabilities(model, self.grid[torch.from_numpy(flat)])
+        ys, xs = np.divmod(flat, self.width)
+        self.probs[ys, xs] = probs.numpy()
+        self.known[ys, xs] = True
+        self.evaluated += flat.size
+
+    def _refine_level(
+        self, model: Any, y0: np.ndarray, y1: np.ndarray, x0: np.ndarray, x1: np.ndarray
+    ) -> List[np.ndarray]:
+        probs = self.probs
+        corners = np.stack([
+            probs[y0, x0], probs[y0, x1], probs[y1, x0], probs[y1, x1]
+        ], axis=1)  # [cells, 4, classes]
+        labels = corners.argmax(axis=2)
+        disagree = (labels != labels[:, :1]).any(axis=1)
+        spread = corners.max(axis=1) - corners.min(axis=1)
+        spread = spread.max(axis=1) > self.threshold
+        # Cells without interior pixels need neither refinement nor filling
+        leaf = (x1 - x0 <= 1) & (y1 - y0 <= 1)
+        refine = (disagree | spread) & ~leaf
+
+        fill = ~refine & ~leaf
+        self._fill(corners[fill], y0[fill], y1[fill], x0[fill], x1[fill])
+
+        y0, y1, x0, x1 = y0[refine], y1[refine], x0[refine], x1[refine]
+        # Split along an axis only where the cell is wider than one pixel
+        ym = np.where(y1 - y0 > 1, (y0 + y1) // 2, y1)
+        xm = np.where(x1 - x0 > 1, (x0 + x1) // 2, x1)
+        self._evaluate(
+            model,
+            np.concatenate([y0, y1, ym, ym, ym]),
+            np.concatenate([xm, xm, x0, x1, xm])
+        )
+
+        children = [
+            (y0, ym, x0, xm),
+            (y0, ym, xm, x1),
+            (ym, y1, x0, xm),
+            (ym, y1, xm, x1),
+        ]
+        # Drop the empty halves of cells that were not split along an axis
+        parts: List[List[np.ndarray]] = [[], [], [], []]
+        for cy0, cy1, cx0, cx1 in children:
+            keep = (cy1 > cy0) & (cx1 > cx0)
+            for part, values in zip(parts, (cy0, cy1, cx0, cx1)):
+                part.append(values[keep])
+        return [np.concatenate(part) for part in parts]
+
+    def _fill(
+        self,
+        corners: np.ndarray,
+        y0: np.ndarray,
+        y1: np.ndarray,
+        x0: np.ndarray,
+        x1: np.ndarray
+    ) -> None:
+        """Bilinearly interpolate cells from their corners, grouped by cell size."""
+        heights = y1 - y0
+        widths = x1 - x0
+        for ch, cw in set(zip(heights.tolist(), widths.tolist())):
+            group = (heights == ch) & (widths == cw)
+            ty = (np.arange(ch + 1, dtype=np.float32) / ch)[None, :, None, None]
+            tx = (np.arange(cw + 1, dtype=np.float32) / cw)[None, None, :, None]
+            c = corners[group][:, :, None, None, :]  # [n, 4, 1, 1, classes]
+            values = (
+                c[:, 0] * (1 - ty) * (1 - tx) + c[:, 1] * (1 - ty) * tx +
+                c[:, 2] * ty * (1 - tx) + c[:, 3] * ty * tx
+            )
+            rows = y0[group][:, None, None] + np.arange(ch + 1)[None, :, None]
+            cols = x0[group][:, None, None] + np.arange(cw + 1)[None, None, :]
+            self.probs[rows, cols] = values
+
+def create_render_context(
+    width: int,
+    height: int,
+    adaptive: bool = False,
+    pixel_format: str = PIXEL_FORMAT_RGB,
+    bounds: Bounds = DEFAULT_BOUNDS
+) -> RenderContext:
+    """Dense context for small maps, quadtree context when `adaptive` is set."""
+    if adaptive:
+        return AdaptiveRenderContext(
+            width, height, pixel_format=pixel_format, bounds=bounds
+        )
+    return RenderContext(width, height, pixel_format, bounds)
+
+def render_context_tag(
+    adaptive: bool = False,
+    pixel_format: str = PIXEL_FORMAT_RGB,
+    bounds: Bounds = DEFAULT_BOUNDS
+) -> str:
+    """Tag of the context create_render_context would build, without building it."""
+    kind = AdaptiveRenderContext.kind if adaptive else RenderContext.kind
+    return render_tag(kind, pixel_format, bounds)
+
+def map_frame_key(model: Any, width: int, height: int, tag: str) -> FrameKey:
+    """
+    MAP_CACHE key of the current state of `model`. Read the version before
+    rendering: if training updates the weights meanwhile, the next request
+    sees a newer version and re-renders.
+    """
+    return (model_version(model), width, height, model.output_dim, tag)
+
+def render_map_frame(model: Any, context: RenderContext, key: FrameKey) -> bytes:
+    """
+    Render a frame into the context's buffers and snapshot it once for the
+    cache and the caller.
+    """
+    frame = bytes(context.render(model))
+    MAP_CACHE.put(model, key, frame)
+    return frame
+
+def cached_map_frame(model: Any, context: RenderContext) -> bytes:
+    """
+    The map frame (header + pixels) of `model` as rendered by `context`,
+    from MAP_CACHE when the parameters have not changed since the last
+    render. Callers that build a context per request should look the frame
+    up first (map_frame_key), so that hits allocate nothing.
+    """
+    key = map_frame_key(model, context.width, context.height, context.tag)
+    cached = MAP_CACHE.get(model, key)
+    if cached is not None:
+        return cached
+    return render_map_frame(model, context, key)
+
+def create_render_executor(workers: int | None = None) -> ThreadPoolExecutor:
+    """
+    Bounded thread pool for decision map renders, so that the forward passes
+    over the grid never run on the IOLoop. torch and NumPy release the GIL
+    for the heavy parts, so the renders of different sessions overlap.
+    """
+    workers = workers or min(4, os.cpu_count() or 1)
+    return ThreadPoolExecutor(
+        max_workers=max(1, workers), thread_name_prefix="nnvisu-render"
+    )
+
+@lru_cache(maxsize=1)
+def default_render_executor() -> ThreadPoolExecutor:
+    """Process-wide render pool for handlers created without an explicit one."""
+    return create_render_executor()
@@ -0,0 +1,286 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, TYPE_CHECKING
+
+from nnvisu.logic.backends import TrainingBackend
+from nnvisu.logic.batched import BatchedTrainer, model_signature
+from nnvisu.logic.trainer import DEFAULT_IDLE_INTERVAL, PLATEAU_PAUSE, PLATEAU_THROTTLE
+
+if TYPE_CHECKING:
+    from nnvisu.logic.session import TrainingSession
+    from nnvisu.logic.trainer import StatefulTrainer
+
+logger = logging.getLogger(__name__)
+
+class _Job:
+    """Scheduling state of one training session."""
+    def __init__(self, session: "TrainingSession", trainer: "StatefulTrainer") -> None:
+        self.session = session
+        self.trainer = trainer
+        self.admitted = False
+        self.stopped = False
+        # Earliest time the job may run again (used to back off sessions without data)
+        self.not_before = 0.0
+        # Set whenever no worker is inside a slice of this job
+        self.idle = threading.Event()
+        self.idle.set()
+
+class TrainingScheduler(TrainingBackend):
+    """
+    Server-wide fair-share scheduler for training loops.
+
+    A fixed pool of worker threads runs admitted sessions round-robin, each
+    for a time slice of `slice_seconds`. At most `max_active` sessions are
+    admitted at once; further sessions wait in FIFO order and can query their
+    position through `queue_position`. Converged sessions (throttled or
+    paused) give their slot to the next waiting session and queue up again
+    when they wake.
+
+    With `batch_sessions` enabled, a worker that picks up a session also takes
+    up to `max_group - 1` other runnable sessions with the same model topology
+    and trains them together with BatchedTrainer.
+    """
+    name = "scheduler"
+
+    # Back-off for sessions whose slice did no work (e.g. no data yet)
+    IDLE_BACKOFF = 0.1
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_active: int = 8,
+        slice_seconds: float = 0.02,
+        batch_sessions: bool = False,
+        max_group: int = 32
+    ) -> None:
+        self.num_workers = max(1, workers or os.cpu_count() or 2)
+        self.max_active = max(1, max_active)
+        self.slice_seconds = slice_seconds
+        self.batch_sessions = batch_sessions
+        self.max_group = max(1, max_group)
+        self.batched = BatchedTrainer()
+
+        self.cond = threading.Condition()
+        self.jobs: Dict[str, _Job] = {}
+        self.run_queue: Deque[_Job] = deque()
+        self.waiting: Deque[_Job] = deque()
+        # Converged jobs without an admission slot, waiting to wake
+        self.parked: List[_Job] = []
+        self.admitted_count = 0
+        self.closed = False
+        self.threads: List[threading.Thread] = []
+
+        self.step_counter = 0
+        self.last_log_time = time.time()
+
+    def _ensure_workers(self) -> None:
+        if self.threads:
+            return
+        for i in range(self.num_workers):
+            t = threading.Thread(target=self._worker, name=f"nnvisu-trainer-{i}")
+            t.daemon = True
+            t.start()
+            self.threads.append(t)
+
+    def _admit_waiting(self) -> None:
+        # Caller holds self.cond
+        while self.waiting and self.admitted_count < self.max_active:
+            job = self.waiting.popleft()
+            job.admitted = True
+            self.admitted_count += 1
+            self.run_queue.append(job)
+            self.cond.notify()
+
+    def _park(self, job: _Job) -> None:
+        # Caller holds self.cond
+        job.admitted = False
+        self.admitted_count -= 1
+        self.parked.append(job)
+        self._admit_waiting()
+
+    def _wake_parked(self, now: float) -> Optional[float]:
+        """Queue parked jobs that are due again; returns when to check the rest."""
+        # Caller holds self.cond
+        next_check: Optional[float] = None
+        for job in list(self.parked):
+            action = job.session.plateau_action()
+            if action is None:
+                # Woken by a change to data, config or model
+                job.not_before = 0.0
+            elif action != PLATEAU_THROTTLE or job.not_before > now:
+                # Paused sessions are polled, throttled ones wait for their turn
+                if action == PLATEAU_THROTTLE:
+                    check = job.not_before
+                else:
+                    check = now + self.IDLE_BACKOFF
+                next_check = check if next_check is None else min(next_check, check)
+                continue
+            self.parked.remove(job)
+            self.waiting.append(job)
+        self._admit_waiting()
+        return next_check
+
+    def start(self, session: "TrainingSession", trainer: "StatefulTrainer") -> None:
+        with self.cond:
+            if session.id in self.jobs:
+                return
+            self._ensure_workers()
+            job = _Job(session, trainer)
+            self.jobs[session.id] = job
+            self.waiting.append(job)
+            self._admit_waiting()
+            if not job.admitted:
+                position = len(self.waiting)
+                logger.info(f"[Scheduler] Session queued at position {position}")
+
+    def stop(self, session: "TrainingSession", timeout: float = 1.0) -> None:
+        session.stop_event.set()
+        with self.cond:
+            job = self.jobs.pop(session.id, None)
+            if job is None:
+                return
+            job.stopped = True
+            if job in self.run_queue:
+                self.run_queue.remove(job)
+            if job in self.waiting:
+                self.waiting.remove(job)
+            if job in self.parked:
+                self.parked.remove(job)
+            if job.admitted:
+                job.admitted = False
+                self.admitted_count -= 1
+                self._admit_waiting()
+        # Wait for a slice that might be in progress
+        job.idle.wait(timeout=timeout)
+
+    def queue_position(self, session: "TrainingSession") -> Optional[int]:
+        with self.cond:
+            job = self.jobs.get(session.id)
+            if job is None or job not in self.waiting:
+                return None
+            return self.waiting.index(job) + 1
+
+    def shutdown(self) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def _next_job(self) -> Optional[_Job]:
+        # Caller holds self.cond
+        while not self.closed:
+            now = time.monotonic()
+            next_check = self._wake_parked(now)
+            for job in self.run_queue:
+                if job.not_before <= now:
+                    self.run_queue.remove(job)
+                    return job
+            deadlines = [job.not_before for job in self.run_queue]
+            if next_check is not None:
+                deadlines.append(next_check)
+            self.cond.wait(min(deadlines) - now if deadlines else None)
+        return None
+
+    def _take_compatible(self, job: _Job) -> List[_Job]:
+        """Remove runnable jobs with the same topology as `job` from the run queue."""
+        # Caller holds self.cond
+        signature = model_signature(job.session.model)
+        if signature is None:
+            return []
+        now = time.monotonic()
+        group: List[_Job] = []
+        for other in list(self.run_queue):
+            if len(group) + 1 >= self.max_group:
+                break
+            if (other.not_before <= now and not other.session.converged and
+                    model_signature(other.session.model) == signature):
+                self.run_queue.remove(other)
+                group.append(other)
+        return group
+
+    def _run_group_slice(self, group: List[_Job]) -> List[int]:
+        steps = [0] * len(group)
+        entries = [(job.session, job.trainer) for job in group]
+        deadline = time.monotonic() + self.slice_seconds
+        while time.monotonic() < deadline:
+            try:
+                done = self.batched.run_iteration(entries)
+            except Exception as e:
+                logger.error(f"Error in batched training slice: {e}", exc_info=True)
+                break
+            if not any(done):
+                break
+            steps = [total + d for total, d in zip(steps, done)]
+        return steps
+
+    def _run_slice(self, job: _Job) -> int:
+        session = job.session
+        if session.plateau_action() == PLATEAU_PAUSE:
+            # Paused until data/config change; the job is parked after the slice
+            return 0
+        steps = 0
+        deadline = time.monotonic() + self.slice_seconds
+        while time.monotonic() < deadline and not session.stop_event.is_set():
+            try:
+                done = job.trainer.run_iteration(session)
+            except Exception as e:
+                logger.error(f"Error in training slice: {e}", exc_info=True)
+                done = 0
+            if done == 0:
+                break
+            steps += done
+            if session.converged:
+                break
+        return steps
+
+    def _worker(self) -> None:
+        while True:
+            with self.cond:
+                job = self._next_job()
+                if job is None:
+                    return
+                group = [job]
+                if self.batch_sessions:
+                    group.extend(self._take_compatible(job))
+                for member in group:
+                    member.idle.clear()
+
+            if len(group) > 1:
+                steps = self._run_group_slice(group)
+            else:
+                steps = [self._run_slice(job)]
+
+            with self.cond:
+                for member, member_steps in zip(group, steps):
+                    member.idle.set()
+                    if member.stopped:
+                        continue
+                    action = member.session.plateau_action()
+                    if action == PLATEAU_THROTTLE:
+                        # Converged: one iteration per idle interval
+                        interval = member.session.config.get(
+                            "idleInterval", DEFAULT_IDLE_INTERVAL
+                        )
+                        member.not_before = time.monotonic() + interval
+                    elif member_steps == 0:
+                        member.not_before = time.monotonic() + self.IDLE_BACKOFF
+                    if action is not None:
+                        # Converged sessions must not hold a slot others wait for
+                        self._park(member)
+                    else:
+                        # Back of the line: round-robin time slices
+                        self.run_queue.append(member)
+                        self.cond.notify()
+
+                self.step_counter += sum(steps)
+                now = time.time()
+                if now - self.last_log_time >= 5.0:
+                    tps = self.step_counter / (now - self.last_log_time)
+                    logger.info(
+                        f"[Scheduler] Steps per second: {tps:.2f} "
+                        f"(active: {self.admitted_count}, queued: {len(self.waiting)})"
+                    )
+                    self.step_counter = 0
+                    self.last_log_time = now
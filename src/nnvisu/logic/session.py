@@ -1,12 +1,19 @@
 import threading
+import time
 import uuid
 import queue
 import copy
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence, TYPE_CHECKING
 
-from nnvisu.logic.model import NeuralNetwork
+import torch
+
+from nnvisu.logic.dataset import Dataset
+from nnvisu.logic.trainer import PLATEAU_CONTINUE, PLATEAU_THROTTLE, PlateauDetector
 from nnvisu.protocol import DataPoint
 
+if TYPE_CHECKING:
+    from nnvisu.logic.engines import Model
+
 class TrainingSession:
     """
     Manages the state of a single training session, including the model, data,
@@ -14,8 +21,21 @@ class TrainingSession:
     """
     def __init__(self) -> None:
         self.id: str = str(uuid.uuid4())
-        self.model: Optional[NeuralNetwork] = None
-        self.data: List[DataPoint] = []
+        self.model: Optional["Model"] = None
+        # Training points with stable ids, edited in place (see edit_points)
+        self.dataset = Dataset()
+        # Dataset imported over HTTP, swapped in by the connection's handler
+        # on its next update check (see take_import)
+        self.pending_import: Optional[Dataset] = None
+        # Training tensors: views of the dataset's columns that edits never
+        # write into (see Dataset.tensors), so an iteration in progress keeps
+        # the data it started with. data_version is bumped on every change
+        # so consumers can tell whether cached views of the data are stale.
+        self.data_x: torch.Tensor = torch.empty((0, 2), dtype=torch.float32)
+        self.data_y: torch.Tensor = torch.empty((0,), dtype=torch.long)
+        self.data_version: int = 0
+        # Bumped whenever the model instance is replaced (see set_model)
+        self.model_generation: int = 0
         self.config: Dict[str, Any] = {}
         
         # Thread safety
@@ -33,28 +53,139 @@ class TrainingSession:
         self.stop_event = threading.Event()
         self.training_thread: Optional[threading.Thread] = None
 
+        # Convergence: set once the loss plateaus, cleared by any change to
+        # data, config or model, which also sets wake_event for idle loops
+        self.plateau = PlateauDetector()
+        self.converged = False
+        self.wake_event = threading.Event()
+
     def update_config(self, new_config: Dict[str, Any]) -> None:
         """Thread-safe configuration update."""
         with self.lock:
             self.config.update(new_config)
+            self._wake()
+
+    def set_data(self, dataset: Dataset) -> None:
+        """Thread-safe data update (replaces all points)."""
+        with self.lock:
+            self.dataset = dataset
+            self._data_changed()
+
+    def offer_import(self, dataset: Dataset) -> None:
+        """Hand an imported dataset to the connection (a newer one replaces it)."""
+        with self.lock:
+            self.pending_import = dataset
+
+    def take_import(self) -> Optional[Dataset]:
+        with self.lock:
+            dataset, self.pending_import = self.pending_import, None
+            return dataset
 
-    def set_data(self, data: List[DataPoint]) -> None:
-        """Thread-safe data update."""
+    def edit_points(
+        self,
+        add: Sequence[DataPoint] = (),
+        remove: Sequence[int] = (),
+        move: Sequence[Dict[str, Any]] = (),
+        clear: bool = False
+    ) -> int:
+        """
+        Apply incremental point edits (by point id) and return the number of
+        output classes the data now needs. `clear` removes all points first.
+        Unknown ids are ignored; ids out of range raise ValueError (edits
+        before it are kept).
+        """
         with self.lock:
-            self.data = data
+            try:
+                if clear:
+                    # A new dataset also releases imported (memory-mapped) columns
+                    self.dataset = Dataset()
+                for point_id in remove:
+                    self.dataset.remove(point_id)
+                for p in add:
+                    self.dataset.add(p['x'], p['y'], p.get('label', 0), p.get('id'))
+                for p in move:
+                    self.dataset.move(p['id'], p['x'], p['y'], p.get('label'))
+            finally:
+                self._data_changed()
+            return self.dataset.required_output_dim()
+
+    def required_output_dim(self) -> int:
+        with self.lock:
+            return self.dataset.required_output_dim()
+
+    def _data_changed(self) -> None:
+        # Caller holds self.lock. New views: edits went to copies of the columns
+        # or to rows past the end of the previous views.
+        self.data_x, self.data_y = self.dataset.tensors()
+        self.data_version += 1
+        self._wake()
 
-    def set_model(self, model: NeuralNetwork) -> None:
+    def get_tensors(self) -> tuple[torch.Tensor, torch.Tensor, int]:
+        """Return the cached training tensors together with their version."""
+        with self.lock:
+            return self.data_x, self.data_y, self.data_version
+
+    def set_model(self, model: "Model") -> None:
         """Thread-safe model update."""
         with self.lock:
             self.model = model
+            self.model_generation += 1
+            self._wake()
+
+    def _wake(self) -> None:
+        # Caller holds self.lock
+        self.plateau = PlateauDetector(
+            window=int(self.config.get("plateauWindow", 100)),
+            tolerance=float(self.config.get("plateauTolerance", 1e-3))
+        )
+        self.converged = False
+        self.wake_event.set()
+
+    def record_loss(self, loss: float) -> bool:
+        """Feed a training loss to the plateau detector; returns whether converged."""
+        with self.lock:
+            if self.converged or self.config.get("onPlateau") == PLATEAU_CONTINUE:
+                return self.converged
+            if self.plateau.update(loss):
+                self.converged = True
+                # Only changes made from now on should wake the idle loop
+                self.wake_event.clear()
+            return self.converged
+
+    def plateau_action(self) -> Optional[str]:
+        """
+        How a converged session should idle ("throttle" or "pause"), None if
+        not converged.
+        """
+        with self.lock:
+            if not self.converged:
+                return None
+            return self.config.get("onPlateau", PLATEAU_THROTTLE)
 
-    def get_snapshot(self) -> tuple[Optional[NeuralNetwork], List[DataPoint], Dict[str, Any]]:
+    def wait_for_wake(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until data/config/model change, the session is stopped, or
+        `timeout` seconds pass. Returns True if woken by a change.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.stop_event.is_set():
+            remaining = 0.1
+            if deadline is not None:
+                remaining = min(remaining, deadline - time.monotonic())
+            if remaining <= 0:
+                return False
+            if self.wake_event.wait(remaining):
+                self.wake_event.clear()
+                return True
+        return False
+
+    def get_snapshot(self) -> tuple[Optional["Model"], Dataset, Dict[str, Any]]:
         """
         Get a snapshot of the current state (model, data, config) for training.
         Note: We return references. The visualization thread should be careful.
         """
         with self.lock:
-            return self.model, self.data, self.config.copy()
+            return self.model, self.dataset, self.config.copy()
 
     def reset_steps(self) -> None:
         """Clear the step queue and reset any internal counters."""
@@ -62,3 +193,24 @@ class TrainingSession:
             self.step_queue.queue.clear()
         with self.map_queue.mutex:
             self.map_queue.queue.clear()
+
+class SessionRegistry:
+    """
+    Live sessions by id, shared by the WebSocket handlers (which register
+    their session while connected) and the HTTP map endpoint.
+    """
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.sessions: Dict[str, TrainingSession] = {}
+
+    def register(self, session: TrainingSession) -> None:
+        with self.lock:
+            self.sessions[session.id] = session
+
+    def unregister(self, session: TrainingSession) -> None:
+        with self.lock:
+            self.sessions.pop(session.id, None)
+
+    def get(self, session_id: str) -> Optional[TrainingSession]:
+        with self.lock:
+            return self.sessions.get(session_id)
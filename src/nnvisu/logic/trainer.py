@@ -2,45 +2,73 @@ import base64
 import time
 import logging
 import queue
-from typing import List, TYPE_CHECKING
+from collections import deque
+from typing import Any, Deque, Dict, Union, TYPE_CHECKING
 
 import numpy as np
 import torch
 from torch import nn, optim
 
+from nnvisu.logic.dataset import Dataset
 from nnvisu.logic.model import NeuralNetwork
-from nnvisu.protocol import DataPoint
+from nnvisu.logic.render import (
+    CLASS_COLORS, FRAME_HEADER_SIZE, MAP_CACHE, RenderContext, bump_version,
+    cached_map_frame, map_frame_key, render_context_tag, render_map_frame
+)
 
 if TYPE_CHECKING:
+    from nnvisu.logic.engines import Model
     from nnvisu.logic.session import TrainingSession
 
 logger = logging.getLogger(__name__)
 
+# What a session does once its loss has plateaued (config key "onPlateau")
+PLATEAU_THROTTLE = "throttle"
+PLATEAU_PAUSE = "pause"
+PLATEAU_CONTINUE = "continue"
+# Seconds between iterations of a throttled session (config key "idleInterval")
+DEFAULT_IDLE_INTERVAL = 1.0
+
+# Training data is either a Dataset or the (X, y) tensor views cached by
+# TrainingSession.
+TensorData = tuple[torch.Tensor, torch.Tensor]
+TrainingData = Union[Dataset, TensorData]
+
+def _as_tensors(data: TrainingData) -> TensorData:
+    if isinstance(data, tuple):
+        return data
+    return data.tensors()
+
 class StatelessTrainer:
     GRID_WIDTH = 100
     GRID_HEIGHT = 100
 
     # Class colors matching frontend (RGB)
-    CLASS_COLORS = [
-        [52, 152, 219],  # #3498db Blue
-        [230, 126, 34], # #e67e22 Orange
-        [231, 76, 60],  # #e74c3c Red
-        [155, 89, 182], # #9b59b6 Purple
-        [46, 204, 113], # #2ecc71 Green
-        [241, 196, 15], # #f1c40f Yellow
-        [121, 85, 72],  # #795548 Brown
-        [52, 73, 94]    # #34495e Navy
-    ]
+    CLASS_COLORS = CLASS_COLORS
 
     def __init__(self) -> None:
         self.criterion = nn.CrossEntropyLoss()
 
-    def train_step(self, model: NeuralNetwork, data: List[DataPoint], config: dict) -> float:
+    def _sample_batch(
+        self, X: torch.Tensor, y: torch.Tensor, batch_size: int  # noqa: N803
+    ) -> TensorData:
+        """Index a random mini-batch directly out of the cached tensors."""
+        n = X.shape[0]
+        if batch_size > 0 and batch_size < n:
+            indices = torch.from_numpy(np.random.choice(n, batch_size, replace=False))
+            return X[indices], y[indices]
+        return X, y
+
+    def train_step(
+        self, model: "Model", data: TrainingData, config: Dict[str, Any]
+    ) -> float:
         """
         Perform a single training step.
         Note: Optimizer state is not preserved between steps in this stateless design.
         """
-        if not data:
+        assert isinstance(model, NeuralNetwork)
+        X, y = _as_tensors(data)  # noqa: N806
+        if X.shape[0] == 0:
             return 0.0
 
         # Hyperparameters from config
@@ -50,16 +78,7 @@ class StatelessTrainer:
         batch_size = config.get("batchSize", 0)
 
         # Batch sampling
-        if batch_size > 0 and batch_size < len(data):
-            indices = np.random.choice(len(data), batch_size, replace=False)
-            batch = [data[i] for i in indices]
-        else:
-            batch = data
-
-        # Prepare batch tensors
-        device = torch.device("cpu")
-        X = torch.tensor([[p['x'], p['y']] for p in batch], dtype=torch.float32, device=device)  # noqa: N806
-        y = torch.tensor([p['label'] for p in batch], dtype=torch.long, device=device)
+        X, y = self._sample_batch(X, y, batch_size)  # noqa: N806
 
         # Re-initialize optimizer (stateless)
         opt_class = {
@@ -76,54 +95,104 @@ class StatelessTrainer:
         loss = self.criterion(outputs, y)
         loss.backward()
         optimizer.step()
+        bump_version(model)
 
         return float(loss.item())
         
-    def generate_map(self, model: NeuralNetwork, width: int | None = None, height: int | None = None) -> str:
+    def generate_map(
+        self, model: "Model", width: int | None = None, height: int | None = None
+    ) -> str:
         """Generate classification map as base64 string (RGB bytes)."""
         w = width or self.GRID_WIDTH
         h = height or self.GRID_HEIGHT
         rgb_bytes = self.generate_binary_map(model, w, h)
         return base64.b64encode(rgb_bytes).decode('utf-8')
 
-    def generate_binary_map(self, model: NeuralNetwork, width: int | None = None, height: int | None = None) -> bytes:
+    def generate_binary_map(
+        self, model: "Model", width: int | None = None, height: int | None = None
+    ) -> bytes:
         """Generate classification map as raw RGB bytes."""
+        frame = self.generate_map_frame(model, width, height)
+        return frame[FRAME_HEADER_SIZE:]
+
+    def generate_map_frame(
+        self,
+        model: "Model",
+        width: int | None = None,
+        height: int | None = None,
+        context: RenderContext | None = None
+    ) -> bytes:
+        """
+        Generate the binary map message (header + pixels). Frames are cached
+        by the model's parameter version (see render.cached_map_frame); on a
+        miss the map is rendered into `context`, whose buffers are reused
+        between calls.
+        """
         w = width or self.GRID_WIDTH
         h = height or self.GRID_HEIGHT
-        
-        # Create grid
-        # x: -1 to 1, y: -1 to 1
-        x = np.linspace(-1, 1, w)
-        y = np.linspace(1, -1, h) # Top-down for image
-        xv, yv = np.meshgrid(x, y)
-
-        # Flatten and convert to tensor
-        device = torch.device("cpu")
-        grid_points = np.stack([xv.flatten(), yv.flatten()], axis=1)
-        X_grid = torch.tensor(grid_points, dtype=torch.float32, device=device)  # noqa: N806
-
-        # Predict probabilities
-        with torch.no_grad():
-            outputs = model(X_grid)
-            # Apply softmax to get posterior probabilities
-            probs = torch.softmax(outputs, dim=1) # [N, num_classes]
-
-        num_classes = probs.shape[1]
-        
-        # Prepare color matrix [num_classes, 3]
-        colors = np.array(self.CLASS_COLORS)
-        if num_classes > len(colors):
-            extra = np.random.randint(0, 255, size=(num_classes - len(colors), 3))
-            colors = np.vstack([colors, extra])
-        else:
-            colors = colors[:num_classes]
+        if context is not None and (context.width, context.height) == (w, h):
+            return cached_map_frame(model, context)
 
-        # Calculate weighted average of colors
-        blended_colors = probs.numpy() @ colors
-        
-        # Convert to bytes
-        rgb_bytes = blended_colors.astype(np.uint8)
-        return rgb_bytes.tobytes()
+        # Look the frame up before allocating a context for it
+        key = map_frame_key(model, w, h, render_context_tag())
+        cached = MAP_CACHE.get(model, key)
+        if cached is not None:
+            return cached
+        return render_map_frame(model, RenderContext(w, h), key)
+
+class EpochSampler:
+    """
+    Hands out mini-batch indices by slicing a shuffled permutation of the data.
+    A new permutation is drawn once per epoch (or when the data changes), so
+    each batch costs O(batch_size) instead of an O(n) draw per step.
+    """
+    def __init__(self) -> None:
+        self.permutation = torch.empty((0,), dtype=torch.long)
+        self.position = 0
+        self.data_version = -1
+
+    def next_batch(self, n: int, batch_size: int, data_version: int) -> torch.Tensor:
+        if (data_version != self.data_version or
+                self.permutation.shape[0] != n or
+                self.position + batch_size > n):
+            # New epoch; the incomplete tail of the previous one is dropped
+            self.permutation = torch.randperm(n)
+            self.position = 0
+            self.data_version = data_version
+
+        start = self.position
+        self.position += batch_size
+        return self.permutation[start:self.position]
+
+class PlateauDetector:
+    """
+    Detects when the training loss stops improving. The last `window` losses
+    are kept; once the window is full, the mean of its newer half is compared
+    with the mean of its older half. Training counts as converged when the
+    improvement is below `tolerance` relative to the loss, or below
+    ABS_TOLERANCE when the loss is already close to zero.
+    """
+    ABS_TOLERANCE = 1e-4
+
+    def __init__(self, window: int = 100, tolerance: float = 1e-3) -> None:
+        self.window = max(2, window)
+        self.tolerance = tolerance
+        self.losses: Deque[float] = deque(maxlen=self.window)
+
+    def reset(self) -> None:
+        self.losses.clear()
+
+    def update(self, loss: float) -> bool:
+        """Record a loss and return whether the window shows a plateau."""
+        self.losses.append(loss)
+        if len(self.losses) < self.window:
+            return False
+        values = list(self.losses)
+        half = self.window // 2
+        older = sum(values[:half]) / half
+        newer = sum(values[half:]) / (self.window - half)
+        improvement = older - newer
+        return improvement <= max(self.tolerance * abs(older), self.ABS_TOLERANCE)
 
 class StatefulTrainer(StatelessTrainer):
     """
@@ -132,16 +201,20 @@ class StatefulTrainer(StatelessTrainer):
     def __init__(self) -> None:
         super().__init__()
         self.optimizer: optim.Optimizer | None = None
-        self.current_model_id: int | None = None
+        self.current_model_id: tuple[int, int] | None = None
         self.current_opt_name: str = ""
         self.current_lr: float = 0.0
         self.current_reg: float = 0.0
+        self.sampler = EpochSampler()
 
-    def _get_optimizer(self, model: NeuralNetwork, config: dict) -> optim.Optimizer:
+    def _get_optimizer(
+        self, model: NeuralNetwork, config: Dict[str, Any]
+    ) -> optim.Optimizer:
         learning_rate = config.get("learningRate", 0.001)
         optimizer_name = config.get("optimizer", "adam").lower()
         regularization = config.get("regularization", 0.0)
-        model_id = id(model)
+        # The output layer is replaced when it is adapted in place
+        model_id = (id(model), model.structure_version)
 
         # Check if we need to re-initialize (including if the model instance changed)
         if (self.optimizer is None or 
@@ -164,22 +237,18 @@ class StatefulTrainer(StatelessTrainer):
             
         return self.optimizer
 
-    def train_step_stateful(self, model: NeuralNetwork, data: List[DataPoint], config: dict) -> float:
-        if not data:
+    def train_step_stateful(
+        self, model: "Model", data: TrainingData, config: Dict[str, Any]
+    ) -> float:
+        assert isinstance(model, NeuralNetwork)
+        X, y = _as_tensors(data)  # noqa: N806
+        if X.shape[0] == 0:
             return 0.0
 
         batch_size = config.get("batchSize", 0)
 
         # Batch sampling
-        if batch_size > 0 and batch_size < len(data):
-            indices = np.random.choice(len(data), batch_size, replace=False)
-            batch = [data[i] for i in indices]
-        else:
-            batch = data
-
-        device = torch.device("cpu")
-        X = torch.tensor([[p['x'], p['y']] for p in batch], dtype=torch.float32, device=device)  # noqa: N806
-        y = torch.tensor([p['label'] for p in batch], dtype=torch.long, device=device)
+        X, y = self._sample_batch(X, y, batch_size)  # noqa: N806
 
         optimizer = self._get_optimizer(model, config)
 
@@ -189,46 +258,113 @@ class StatefulTrainer(StatelessTrainer):
         loss = self.criterion(outputs, y)
         loss.backward()
         optimizer.step()
+        bump_version(model)
 
         return float(loss.item())
 
+    def train_steps_fused(
+        self,
+        model: "Model",
+        data_x: torch.Tensor,
+        data_y: torch.Tensor,
+        data_version: int,
+        config: Dict[str, Any],
+        num_steps: int
+    ) -> float:
+        """
+        Run several optimizer steps back to back and return their mean loss.
+        Mini-batches are drawn without replacement from the epoch permutation,
+        and the per-step Python overhead (optimizer lookup, loss conversion)
+        is paid once for the whole group.
+        """
+        assert isinstance(model, NeuralNetwork)
+        n = data_x.shape[0]
+        if n == 0 or num_steps <= 0:
+            return 0.0
+
+        batch_size = config.get("batchSize", 0)
+        if batch_size <= 0 or batch_size >= n:
+            batch_size = n
+
+        optimizer = self._get_optimizer(model, config)
+        model.train()
+
+        total_loss = torch.zeros(())
+        for _ in range(num_steps):
+            if batch_size == n:
+                X, y = data_x, data_y  # noqa: N806
+            else:
+                indices = self.sampler.next_batch(n, batch_size, data_version)
+                X, y = data_x[indices], data_y[indices]  # noqa: N806
+            optimizer.zero_grad(set_to_none=True)
+            loss = self.criterion(model(X), y)
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.detach()
+        bump_version(model, num_steps)
+
+        return float(total_loss.item()) / num_steps
+
+    def run_iteration(self, session: "TrainingSession") -> int:
+        """
+        Perform one loop iteration: a single step, or `stepsPerIteration` fused
+        steps, followed by one aggregated metric. Returns the number of steps run.
+        """
+        # Quickly grab state references under lock
+        with session.lock:
+            model = session.model
+            data_x, data_y = session.data_x, session.data_y
+            data_version = session.data_version
+            # We grab a reference to the dict, it is only read here.
+            config = session.config
+
+        if not model or data_x.shape[0] == 0:
+            return 0
+
+        # Note: We are operating on model parameters without holding the session lock
+        # during the entire computation. This allows the visualization thread (main
+        # thread) to acquire the lock even while we are training.
+        # Tearing is acceptable for visualization.
+        num_steps = max(1, int(config.get("stepsPerIteration", 1)))
+        if num_steps == 1:
+            loss = self.train_step_stateful(model, (data_x, data_y), config)
+        else:
+            loss = self.train_steps_fused(
+                model, data_x, data_y, data_version, config, num_steps
+            )
+
+        converged = session.record_loss(loss)
+
+        # Push result to queue if not full
+        try:
+            session.step_queue.put({
+                "loss": loss,
+                "steps": num_steps,
+                "converged": converged,
+                "timestamp": time.time()
+            }, block=False)
+        except queue.Full:
+            pass
+
+        return num_steps
+
     def run_loop(self, session: "TrainingSession") -> None:
         """
         The main loop to be run in a thread.
         """
         step_counter = 0
+        steps_since_yield = 0
         last_log_time = time.time()
 
         while not session.stop_event.is_set():
-            # 1. Quickly grab state references under lock
-            with session.lock:
-                model, data = session.model, session.data
-                # Copy config once per loop iteration or less? 
-                # For now, we grab a reference to the dict.
-                config = session.config 
-            
-            if model and data:
-                try:
-                    # 2. Perform training step
-                    # Note: We are operating on model parameters without holding the session lock 
-                    # during the entire computation. This allows the visualization thread (main thread) 
-                    # to acquire the lock even while we are training. 
-                    # Tearing is acceptable for visualization.
-                    loss = self.train_step_stateful(model, data, config)
-                    step_counter += 1
-                    
-                    # 3. Push result to queue if not full
-                    try:
-                        session.step_queue.put({
-                            "loss": loss,
-                            "timestamp": time.time()
-                        }, block=False)
-                    except queue.Full:
-                        pass
-                            
-                except Exception as e:
-                    logger.error(f"Error in training loop: {e}", exc_info=True)
-            
+            steps = 0
+            try:
+                steps = self.run_iteration(session)
+            except Exception as e:
+                logger.error(f"Error in training loop: {e}", exc_info=True)
+            step_counter += steps
+            steps_since_yield += steps
+
             # Periodic logging
             now = time.time()
             if now - last_log_time >= 5.0:
@@ -238,11 +374,21 @@ class StatefulTrainer(StatelessTrainer):
                 step_counter = 0
                 last_log_time = now
 
+            # Converged sessions either idle until something changes or keep
+            # training at a low duty cycle (see TrainingSession.plateau_action)
+            action = session.plateau_action()
+            if action == PLATEAU_PAUSE:
+                session.wait_for_wake()
+            elif action == PLATEAU_THROTTLE:
+                session.wait_for_wake(
+                    session.config.get("idleInterval", DEFAULT_IDLE_INTERVAL)
+                )
             # Cooperative multitasking:
             # We only sleep if there's no data to process.
             # When training is active, we rely on thread time-slicing.
-            if not data:
+            elif steps == 0:
                 time.sleep(0.1)
-            elif step_counter % 100 == 0:
+            elif steps_since_yield >= 100:
                 # Yield every 100 steps to be a good citizen
-                time.sleep(0.001)
\ No newline at end of file
+                steps_since_yield = 0
+                time.sleep(0.001)
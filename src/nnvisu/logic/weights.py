@@ -0,0 +1,96 @@
+import struct
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Binary message with the model parameters (both directions): type, dtype
+# code, layer count u16, step u32, then the layer sizes as u16 (input size
+# first, layers + 1 values), zero-padded to a multiple of 4 bytes. With
+# int8 quantization one f32 scale per tensor follows (weight and bias of
+# each layer). Then, per layer, the weight matrix (out x in, row-major) and
+# the bias vector, all little-endian.
+FRAME_TYPE_WEIGHTS = 0x05
+WEIGHTS_HEADER = struct.Struct("<BBHI")
+
+WEIGHT_DTYPE_F32 = "f32"
+WEIGHT_DTYPE_F16 = "f16"
+WEIGHT_DTYPE_INT8 = "int8"
+WEIGHT_DTYPES: Dict[str, Tuple[int, np.dtype[Any]]] = {
+    WEIGHT_DTYPE_F32: (0, np.dtype("<f4")),
+    WEIGHT_DTYPE_F16: (1, np.dtype("<f2")),
+    WEIGHT_DTYPE_INT8: (2, np.dtype("i1")),
+}
+
+def _quantize(tensor: np.ndarray) -> Tuple[float, np.ndarray]:
+    # Symmetric per-tensor quantization to -127..127
+    peak = float(np.abs(tensor).max()) if tensor.size else 0.0
+    scale = peak / 127.0 if peak > 0 else 1.0
+    return scale, np.round(tensor / scale).astype(np.int8)
+
+def state_dims(state: Dict[str, Any]) -> List[int]:
+    """Input, hidden and output sizes of a state dict of arrays, like layer_dims."""
+    weights = state["weights"]
+    return [int(np.shape(weights[0])[1])] + [int(np.shape(w)[0]) for w in weights]
+
+def encode_weights(
+    state: Dict[str, Any], dtype: str = WEIGHT_DTYPE_F32, step: int = 0
+) -> bytes:
+    """
+    Encode a state dict of arrays (see get_state_dict_as_arrays) as a weights
+    frame.
+    """
+    code, np_dtype = WEIGHT_DTYPES[dtype]
+    weights = [np.asarray(w, dtype=np.float32) for w in state["weights"]]
+    biases = [np.asarray(b, dtype=np.float32) for b in state["biases"]]
+    dims = state_dims(state)
+
+    parts = [WEIGHTS_HEADER.pack(FRAME_TYPE_WEIGHTS, code, len(weights), step)]
+    sizes = np.asarray(dims, dtype="<u2").tobytes()
+    parts.append(sizes + bytes(-len(sizes) % 4))
+
+    tensors = [t for pair in zip(weights, biases) for t in pair]
+    if dtype == WEIGHT_DTYPE_INT8:
+        quantized = [_quantize(t) for t in tensors]
+        scales = np.asarray([scale for scale, _ in quantized], dtype="<f4")
+        parts.append(scales.tobytes())
+        parts.extend(q.tobytes() for _, q in quantized)
+    else:
+        parts.extend(t.astype(np_dtype).tobytes() for t in tensors)
+    return b"".join(parts)
+
+def decode_weights(frame: Any) -> Tuple[Dict[str, List[np.ndarray]], int]:
+    """Decode a weights frame into a state dict of float32 arrays and the step."""
+    kind, code, layers, step = WEIGHTS_HEADER.unpack_from(frame)
+    if kind != FRAME_TYPE_WEIGHTS:
+        raise ValueError(f"Not a weights frame: {kind:#x}")
+    names = {value[0]: name for name, value in WEIGHT_DTYPES.items()}
+    if code not in names or layers == 0:
+        raise ValueError("Invalid weights frame")
+    dtype = names[code]
+    np_dtype = WEIGHT_DTYPES[dtype][1]
+
+    offset = WEIGHTS_HEADER.size
+    dims = np.frombuffer(frame, dtype="<u2", count=layers + 1, offset=offset)
+    dims = dims.astype(int)
+    offset += 2 * (layers + 1)
+    offset += -offset % 4
+    scales = np.ones(2 * layers, dtype=np.float32)
+    if dtype == WEIGHT_DTYPE_INT8:
+        scales = np.frombuffer(frame, dtype="<f4", count=2 * layers, offset=offset)
+        offset += 4 * 2 * layers
+
+    state: Dict[str, List[np.ndarray]] = {"weights": [], "biases": []}
+    for i in range(layers):
+        fan_in, fan_out = int(dims[i]), int(dims[i + 1])
+        for key, shape, scale in (
+            ("weights", (fan_out, fan_in), scales[2 * i]),
+            ("biases", (fan_out,), scales[2 * i + 1])
+        ):
+            count = int(np.prod(shape))
+            values = np.frombuffer(frame, dtype=np_dtype, count=count, offset=offset)
+            offset += count * np_dtype.itemsize
+            tensor = values.astype(np.float32).reshape(shape)
+            if dtype == WEIGHT_DTYPE_INT8:
+                tensor *= scale
+            state[key].append(tensor)
+    return state, int(step)
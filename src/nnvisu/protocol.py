@@ -1,4 +1,18 @@
-from typing import TypedDict, List, Any
+import json
+import types
+from functools import lru_cache
+from typing import (
+    Annotated, Any, Callable, Dict, List, Mapping, NamedTuple, NotRequired, Optional,
+    Required, TypedDict, Union, get_args, get_origin, get_type_hints, is_typeddict
+)
+
+import numpy as np
+
+try:
+    # Optional fast encoder (pip install nnvisu[fast]); json is the fallback
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
 
 # Message Types
 MSG_TYPE_CONFIG = "config"
@@ -14,6 +28,30 @@ MSG_TYPE_STEP_RESULT = "step_result"
 MSG_TYPE_UPDATE_ARCHITECTURE = "update_architecture"
 MSG_TYPE_ARCHITECTURE_SYNCED = "architecture_synced"
 MSG_TYPE_ERROR = "error"
+MSG_TYPE_TRAINING_STATUS = "training_status"
+# Map frame negotiation (client -> server with the supported encodings,
+# server -> client with the accepted ones) and frame acknowledgements
+MSG_TYPE_FRAME_FORMAT = "frame_format"
+MSG_TYPE_FRAME_ACK = "frame_ack"
+MSG_TYPE_REQUEST_KEYFRAME = "request_keyframe"
+# Client -> server: render the recorded training step closest to `step`
+# (answered with a binary history frame, see logic/history.py)
+MSG_TYPE_SEEK = "seek"
+# Client -> server: whether the page is visible; hidden clients get no map frames
+MSG_TYPE_VISIBILITY = "visibility"
+# Client -> server: add/remove/move individual points by id (see logic/dataset.py)
+MSG_TYPE_EDIT_POINTS = "edit_points"
+
+class Range(NamedTuple):
+    """Inclusive bounds of an int field, as Annotated metadata (see _validator)."""
+    low: int
+    high: int
+
+# Classes a session may have, as for imported files (see logic/importer.py).
+# Every class costs an output unit and a probability per rendered pixel.
+MAX_CLASSES = 64
+ClassLabel = Annotated[int, Range(0, MAX_CLASSES - 1)]
+ClassCount = Annotated[int, Range(1, MAX_CLASSES)]
 
 class LayerWeights(TypedDict):
     weights: List[List[float]]
@@ -24,20 +62,26 @@ class ModelDict(TypedDict):
     biases: List[List[float]]
 
 class TrainingConfig(TypedDict):
-    learningRate: float
-    architecture: List[int]
-    activation: str
+    learningRate: NotRequired[float]
+    architecture: NotRequired[List[int]]
+    activation: NotRequired[str]
 
 class DataPoint(TypedDict):
     x: float
     y: float
-    label: int
+    label: ClassLabel
+    # Stable point id (see logic/dataset.py), used by edit_points
+    id: NotRequired[int]
 
 class TrainingPayload(TypedDict):
     type: str
-    config: TrainingConfig
-    model: ModelDict
-    data: List[DataPoint]
+    config: NotRequired[TrainingConfig]
+    model: NotRequired[ModelDict]
+    data: NotRequired[List[DataPoint]]
+    # Token of the previous step_result; when it matches the server's live
+    # model, config/model/data may be omitted and the model is reused.
+    version: NotRequired[str]
+    return_model: NotRequired[bool]
 
 class TrainingResultMetrics(TypedDict):
     loss: float
@@ -45,13 +89,18 @@ class TrainingResultMetrics(TypedDict):
 
 class TrainingResult(TypedDict):
     type: str
-    model: ModelDict
+    version: str
+    model: NotRequired[ModelDict]
     metrics: TrainingResultMetrics
 
 class GenerateDataRequest(TypedDict):
     type: str
     distribution: str
-    num_classes: int
+    num_classes: NotRequired[ClassCount]
+    # Defaults to 200; capped at MAX_GENERATED_SAMPLES
+    n_samples: NotRequired[int]
+    # Random seed, for reproducible datasets
+    seed: NotRequired[int]
 
 class DataGeneratedResponse(TypedDict):
     type: str
@@ -59,8 +108,9 @@ class DataGeneratedResponse(TypedDict):
 
 class ArchitectureUpdatePayload(TypedDict):
     hidden_layers: List[int]
-    activation: str
-    dropout: float
+    activation: NotRequired[str]
+    dropout: NotRequired[float]
+    engine: NotRequired[str]
 
 class ArchitectureUpdateRequest(TypedDict):
     type: str
@@ -74,6 +124,256 @@ class ArchitectureSyncedResponse(TypedDict):
     type: str
     payload: ArchitectureSyncedPayload
 
+class TrainingStatusPayload(TypedDict):
+    state: str
+    position: int
+
+class TrainingStatusResponse(TypedDict):
+    type: str
+    payload: TrainingStatusPayload
+
 class ErrorResponse(TypedDict):
     type: str
     message: str
+    # Current model token, when a train_step's version is stale or unknown
+    version: NotRequired[str]
+
+class FrameFormatPayload(TypedDict):
+    encodings: NotRequired[List[str]]
+    pixel_format: NotRequired[str]
+    tile_size: NotRequired[int]
+    keyframe_interval: NotRequired[int]
+    max_unacked: NotRequired[int]
+    # Binary weights frames ("f32", "f16" or "int8") instead of JSON weights
+    weights: NotRequired[str | None]
+    # Tick frames (see logic/frames.py): the newest version the client
+    # understands; the server answers with the version it will send
+    tick: NotRequired[int | None]
+
+class FrameFormatMessage(TypedDict):
+    type: str
+    payload: FrameFormatPayload
+
+class FrameAckMessage(TypedDict):
+    type: str
+    frame_id: int
+
+class VisibilityMessage(TypedDict):
+    type: str
+    visible: bool
+
+class SeekMessage(TypedDict):
+    type: str
+    step: int
+    width: NotRequired[int]
+    height: NotRequired[int]
+
+class PointMove(TypedDict):
+    id: int
+    x: float
+    y: float
+    label: NotRequired[ClassLabel]
+
+class EditPointsMessage(TypedDict):
+    type: str
+    # Remove every point first, including those the client never received
+    # (an imported dataset only sends a preview)
+    clear: NotRequired[bool]
+    add: NotRequired[List[DataPoint]]
+    # Point ids
+    remove: NotRequired[List[int]]
+    move: NotRequired[List[PointMove]]
+
+class Message(TypedDict):
+    """
+    Messages that carry nothing but their type (start/stop/reset, keyframe
+    requests).
+    """
+    type: str
+
+class UpdateConfigMessage(TypedDict):
+    type: str
+    # Config keys as in the client's config (learningRate, batchSize, ...)
+    payload: NotRequired[Dict[str, Any]]
+    config: NotRequired[Dict[str, Any]]
+
+class UpdateDataMessage(TypedDict):
+    type: str
+    data: List[DataPoint]
+
+class StepResultMessage(TypedDict):
+    """step_result of both the training loop and train_step (see TrainingResult)."""
+    type: str
+    version: NotRequired[str]
+    model: NotRequired[Optional[ModelDict]]
+    metrics: Dict[str, Any]
+
+class ConfigMessage(TypedDict):
+    type: str
+    payload: Dict[str, Any]
+
+# Message schemas by type, client -> server ...
+MESSAGE_SCHEMAS: Dict[str, Any] = {
+    MSG_TYPE_START_TRAINING: Message,
+    MSG_TYPE_STOP_TRAINING: Message,
+    MSG_TYPE_RESET: Message,
+    MSG_TYPE_UPDATE_CONFIG: UpdateConfigMessage,
+    MSG_TYPE_UPDATE_DATA: UpdateDataMessage,
+    MSG_TYPE_GENERATE_DATA: GenerateDataRequest,
+    MSG_TYPE_TRAIN_STEP: TrainingPayload,
+    MSG_TYPE_UPDATE_ARCHITECTURE: ArchitectureUpdateRequest,
+    MSG_TYPE_FRAME_FORMAT: FrameFormatMessage,
+    MSG_TYPE_FRAME_ACK: FrameAckMessage,
+    MSG_TYPE_REQUEST_KEYFRAME: Message,
+    MSG_TYPE_SEEK: SeekMessage,
+    MSG_TYPE_VISIBILITY: VisibilityMessage,
+    MSG_TYPE_EDIT_POINTS: EditPointsMessage,
+}
+
+# ... and server -> client
+SERVER_MESSAGE_SCHEMAS: Dict[str, Any] = {
+    MSG_TYPE_CONFIG: ConfigMessage,
+    MSG_TYPE_STEP_RESULT: StepResultMessage,
+    MSG_TYPE_ARCHITECTURE_SYNCED: ArchitectureSyncedResponse,
+    MSG_TYPE_DATA_GENERATED: DataGeneratedResponse,
+    MSG_TYPE_ERROR: ErrorResponse,
+    MSG_TYPE_TRAINING_STATUS: TrainingStatusResponse,
+    MSG_TYPE_FRAME_FORMAT: FrameFormatMessage,
+}
+
+class ProtocolError(ValueError):
+    """A message that is not valid JSON or does not match its schema."""
+
+# A validator returns None for a valid value, otherwise where and why it is invalid
+Validator = Callable[[Any], Optional[str]]
+
+def _scalar(expected: Any, name: str) -> Validator:
+    def check(value: Any) -> Optional[str]:
+        # bool is an int subclass, but never a valid number here
+        if isinstance(value, expected) and (
+            expected is bool or not isinstance(value, bool)
+        ):
+            return None
+        return f": expected {name}, got {type(value).__name__}"
+    return check
+
+@lru_cache(maxsize=None)
+def _validator(hint: Any) -> Validator:
+    """Build (once per type) a validator for a TypedDict field type."""
+    if hint is Any:
+        return lambda value: None
+    if hint is type(None):
+        return lambda value: None if value is None else ": expected null"
+    if hint is float:
+        return _scalar((int, float, np.integer, np.floating), "number")
+    if hint is int:
+        return _scalar((int, np.integer), "int")
+    if hint in (str, bool):
+        return _scalar(hint, hint.__name__)
+
+    origin = get_origin(hint)
+    if origin in (Required, NotRequired):
+        return _validator(get_args(hint)[0])
+
+    if origin is Annotated:
+        base, *metadata = get_args(hint)
+        check_value = _validator(base)
+        bounds = [meta for meta in metadata if isinstance(meta, Range)]
+
+        def check_range(value: Any) -> Optional[str]:
+            error = check_value(value)
+            if error is not None:
+                return error
+            for low, high in bounds:
+                if not low <= value <= high:
+                    return f": expected {low} to {high}, got {value}"
+            return None
+        return check_range
+
+    if origin in (Union, types.UnionType):
+        options = [_validator(arg) for arg in get_args(hint)]
+
+        def check_union(value: Any) -> Optional[str]:
+            errors = [option(value) for option in options]
+            return None if None in errors else errors[0]
+        return check_union
+
+    if origin in (list, List):
+        item = _validator(get_args(hint)[0])
+
+        def check_list(value: Any) -> Optional[str]:
+            if not isinstance(value, list):
+                return ": expected list"
+            for i, element in enumerate(value):
+                error = item(element)
+                if error is not None:
+                    return f"[{i}]{error}"
+            return None
+        return check_list
+
+    if origin in (dict, Dict, Mapping):
+        return lambda value: None if isinstance(value, dict) else ": expected object"
+
+    if is_typeddict(hint):
+        fields = [
+            (key, _validator(field), key in hint.__required_keys__)
+            for key, field in get_type_hints(hint, include_extras=True).items()
+        ]
+
+        def check_struct(value: Any) -> Optional[str]:
+            if not isinstance(value, dict):
+                return ": expected object"
+            for key, check, required in fields:
+                if key not in value:
+                    if required:
+                        return f".{key}: missing"
+                    continue
+                error = check(value[key])
+                if error is not None:
+                    return f".{key}{error}"
+            return None
+        return check_struct
+
+    raise TypeError(f"Unsupported protocol type: {hint}")
+
+def validate_message(
+    message: Any, schemas: Mapping[str, Any] = MESSAGE_SCHEMAS
+) -> Dict[str, Any]:
+    """Check a decoded message against the schema of its type; raises ProtocolError."""
+    if not isinstance(message, dict) or not isinstance(message.get("type"), str):
+        raise ProtocolError("Message must be an object with a string type")
+    schema = schemas.get(message["type"])
+    if schema is None:
+        raise ProtocolError(f"Unknown message type: {message['type']}")
+    error = _validator(schema)(message)
+    if error is not None:
+        raise ProtocolError(f"Invalid {message['type']} message: message{error}")
+    return message
+
+def decode_message(
+    raw: str | bytes, schemas: Mapping[str, Any] = MESSAGE_SCHEMAS
+) -> Dict[str, Any]:
+    """Parse and validate a JSON message (client messages by default)."""
+    try:
+        message = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except ValueError as e:
+        raise ProtocolError(f"Invalid JSON: {e}") from None
+    return validate_message(message, schemas)
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def encode_message(message: Mapping[str, Any]) -> bytes:
+    """
+    Encode a message as UTF-8 JSON; numpy scalars and arrays are serialized
+    natively.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            message, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(message, default=_json_default, separators=(",", ":")).encode()
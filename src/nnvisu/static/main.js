@@ -11,17 +11,28 @@ let points = currentState.data;
 let config = currentState.config;
 let weights = currentState.weights;
 
+// Points carry stable ids so single edits can be sent (edit_points)
+let nextPointId = 0;
+function assignPointIds() {
+    nextPointId = points.reduce((next, p) => p.id === undefined ? next : Math.max(next, p.id + 1), 0);
+    for (const p of points) {
+        if (p.id === undefined) p.id = nextPointId++;
+    }
+}
+assignPointIds();
+
 let ws = null;
+let sessionId = null; // Server session, for the HTTP endpoints
 let isTraining = false;
+let trainingState = 'stopped'; // Last state reported by the server (training_status)
 let currentEpoch = 0; 
 let currentLoss = 0;
 let currentClass = 0;
 let currentTool = 'draw'; // 'draw' or 'erase'
 
-// Training History
-let history = []; // Array of { epoch, mapData, loss }
-let recordingInterval = 10;
-const MAX_HISTORY = 256;
+// Training History: the server keeps weight snapshots and re-renders any
+// past step on request (seek), so the seek bar just spans the steps so far
+let viewingHistory = false;
 
 const CLASS_COLORS = [
     '#3498db', // Blue
@@ -45,6 +56,14 @@ mapCanvas.width = 100;
 mapCanvas.height = 100;
 let mapCtx = mapCanvas.getContext('2d');
 let mapData = null;
+// Decoded pixels of recent keyframe/delta frames by id (delta bases)
+const frameRing = new Map();
+let frameFormat = { encodings: [], pixel_format: 'rgb', max_unacked: 8 };
+// Bytes per pixel by the pixel format code in the frame flags (rgb, index, top2)
+const PIXEL_FORMAT_CHANNELS = [3, 2, 3];
+const MAP_NEUTRAL = 128;
+let frameChain = Promise.resolve();
+let lastWeightsSave = 0;
 
 // Mouse tracking for eraser cursor
 let mousePos = { x: 0, y: 0 };
@@ -59,6 +78,9 @@ if (config.architecture) {
 const activationSelect = document.getElementById('activation-select');
 activationSelect.value = config.activation || 'tanh';
 
+const engineSelect = document.getElementById('engine-select');
+engineSelect.value = config.engine || 'torch';
+
 const optimizerSelect = document.getElementById('optimizer-select');
 optimizerSelect.value = config.optimizer || 'adam';
 
@@ -74,6 +96,12 @@ batchInput.value = config.batchSize || 0;
 const dropoutInput = document.getElementById('dropout-input');
 dropoutInput.value = config.dropout || 0;
 
+const stepsInput = document.getElementById('steps-input');
+stepsInput.value = config.stepsPerIteration || 1;
+
+const plateauSelect = document.getElementById('plateau-select');
+plateauSelect.value = config.onPlateau || 'throttle';
+
 const advancedOptions = document.getElementById('advanced-options');
 // Restore expanded state
 const isExpanded = localStorage.getItem('nnvisu_advanced_expanded') === 'true';
@@ -89,19 +117,25 @@ advancedOptions.addEventListener('toggle', () => {
 function resetAdvancedToDefaults() {
     // Original defaults before Advanced introduction
     config.activation = 'tanh';
+    config.engine = 'torch';
     config.optimizer = 'adam';
     config.learningRate = 0.01;
     config.regularization = 0;
     config.batchSize = 0;
     config.dropout = 0;
+    config.stepsPerIteration = 1;
+    config.onPlateau = 'throttle';
     
     // Update UI
     activationSelect.value = config.activation;
+    engineSelect.value = config.engine;
     optimizerSelect.value = config.optimizer;
     lrInput.valueAsNumber = config.learningRate;
     regInput.valueAsNumber = config.regularization;
     batchInput.valueAsNumber = config.batchSize;
     dropoutInput.valueAsNumber = config.dropout;
+    stepsInput.valueAsNumber = config.stepsPerIteration;
+    plateauSelect.value = config.onPlateau;
     
     stateManager.saveConfig(config);
     updateConfig();
@@ -114,11 +148,14 @@ document.getElementById('btn-reset-advanced-panel').onclick = resetAdvancedToDef
 // UI Handlers
 function updateConfig() {
     config.activation = activationSelect.value;
+    config.engine = engineSelect.value;
     config.optimizer = optimizerSelect.value;
     config.learningRate = parseFloat(lrInput.value) || 0.01;
     config.regularization = parseFloat(regInput.value) || 0;
     config.batchSize = parseInt(batchInput.value) || 0;
     config.dropout = parseFloat(dropoutInput.value) || 0;
+    config.stepsPerIteration = Math.max(1, parseInt(stepsInput.value) || 1);
+    config.onPlateau = plateauSelect.value;
     stateManager.saveConfig(config);
     
     if (ws && ws.readyState === WebSocket.OPEN) {
@@ -129,9 +166,9 @@ function updateConfig() {
     }
 }
 
-[activationSelect, optimizerSelect, lrInput, regInput, batchInput, dropoutInput].forEach(el => {
+[activationSelect, engineSelect, optimizerSelect, lrInput, regInput, batchInput, dropoutInput, stepsInput, plateauSelect].forEach(el => {
     el.addEventListener('change', () => {
-        if (el === activationSelect || el === dropoutInput) {
+        if (el === activationSelect || el === engineSelect || el === dropoutInput) {
             resetModel();
         } else {
             if (isTraining) {
@@ -159,15 +196,40 @@ initPalette();
 document.getElementById('btn-eraser').onclick = () => setTool('erase');
 
 document.getElementById('btn-clear').onclick = () => {
+    // Clears the server's points too, including imported ones that were
+    // never sent to the browser (only a preview is)
+    sendPointEdits({ clear: true });
     points = [];
     stateManager.saveData(points);
     mapData = null;
-    history = [];
     updateHistoryUI();
-    sendDataUpdate();
     render();
 };
 
+// Large datasets are uploaded over HTTP; the server trains on all points
+// and sends back a sample to draw
+const importInput = document.getElementById('import-input');
+document.getElementById('btn-import').onclick = () => importInput.click();
+importInput.onchange = async () => {
+    const file = importInput.files[0];
+    importInput.value = '';
+    if (!file || !sessionId) return;
+    statusDiv.textContent = `Status: Importing ${file.name}...`;
+    try {
+        const response = await fetch(`/api/session/${sessionId}/data`, { method: 'POST', body: file });
+        const reply = await response.json();
+        if (!response.ok) throw new Error(reply.error);
+        points = reply.data;
+        assignPointIds();
+        stateManager.saveData(points);
+        mapData = null;
+        updateHistoryUI();
+        statusDiv.textContent = `Status: Imported ${reply.points} points (${reply.classes} classes)`;
+    } catch (err) {
+        statusDiv.textContent = `Status: Import failed (${err.message})`;
+    }
+};
+
 document.getElementById('btn-play-pause').onclick = toggleTraining;
 
 document.getElementById('btn-reset').onclick = resetModel;
@@ -193,6 +255,7 @@ function syncArchitecture() {
     }
     
     config.activation = activationSelect.value;
+    config.engine = engineSelect.value;
     config.dropout = parseFloat(dropoutInput.value) || 0;
 
     if (ws && ws.readyState === WebSocket.OPEN) {
@@ -201,7 +264,8 @@ function syncArchitecture() {
             payload: {
                 hidden_layers: config.architecture,
                 activation: config.activation,
-                dropout: config.dropout
+                dropout: config.dropout,
+                engine: config.engine
             }
         }));
     }
@@ -214,8 +278,6 @@ function resetModel() {
     mapData = null;
     currentEpoch = 0;
     currentLoss = 0;
-    history = [];
-    recordingInterval = 10;
     updateHistoryUI();
     
     syncArchitecture();
@@ -250,20 +312,32 @@ canvas.addEventListener('mousedown', (e) => {
     const y = -((e.clientY - rect.top) / rect.height * 2 - 1); 
     
     if (currentTool === 'draw') {
-        points.push({ x, y, label: currentClass });
+        const point = { id: nextPointId++, x, y, label: currentClass };
+        points.push(point);
+        sendPointEdits({ add: [point] });
     } else {
         // Erase: Remove points within radius
         const radius = ERASER_RADIUS / rect.width * 2;
+        const removed = [];
         points = points.filter(p => {
             const dx = p.x - x;
             const dy = p.y - y;
-            return Math.sqrt(dx*dx + dy*dy) > radius;
+            const keep = Math.sqrt(dx*dx + dy*dy) > radius;
+            if (!keep) removed.push(p.id);
+            return keep;
         });
+        if (removed.length) sendPointEdits({ remove: removed });
     }
     stateManager.saveData(points);
-    sendDataUpdate();
 });
 
+// Only the change is sent; the server keeps training on its copy of the points
+function sendPointEdits(edits) {
+    if (ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ type: 'edit_points', ...edits }));
+    }
+}
+
 function sendDataUpdate() {
     if (ws && ws.readyState === WebSocket.OPEN) {
         ws.send(JSON.stringify({
@@ -295,7 +369,13 @@ function updateUIStatus() {
     playBtn.textContent = isTraining ? '⏸ Pause' : '▶ Train';
     playBtn.style.background = isTraining ? '#e74c3c' : '#2ecc71';
     
-    statusDiv.textContent = isTraining ? 'Status: Training...' : 'Status: Idle';
+    if (isTraining && trainingState === 'converged') {
+        statusDiv.textContent = 'Status: Converged (throttled)';
+    } else if (isTraining && trainingState === 'paused') {
+        statusDiv.textContent = 'Status: Converged (paused until changes)';
+    } else {
+        statusDiv.textContent = isTraining ? 'Status: Training...' : 'Status: Idle';
+    }
     metricsDiv.textContent = `Steps: ${currentEpoch} | Loss: ${currentLoss.toFixed(4)}`;
 
     // Add class for pulse animation
@@ -303,9 +383,10 @@ function updateUIStatus() {
 }
 
 function updateHistoryUI() {
-    historySeekbar.max = Math.max(0, history.length - 1);
-    if (isTraining || history.length > 0) {
-        historySeekbar.value = history.length - 1;
+    historySeekbar.max = Math.max(0, currentEpoch);
+    if (isTraining || !viewingHistory) {
+        viewingHistory = false;
+        historySeekbar.value = currentEpoch;
     }
 }
 
@@ -320,6 +401,19 @@ function connect() {
     ws.onopen = () => {
         statusDiv.textContent = 'Status: Connected';
         console.log('Connected to WS');
+        // Ask for top-2 class delta frames (colourized here), compressed if
+        // the browser can inflate them, and for tick frames that bundle them
+        // with the metrics and weights
+        frameRing.clear();
+        const encodings = ['delta'];
+        if (typeof DecompressionStream !== 'undefined') {
+            encodings.push('zlib');
+        }
+        ws.send(JSON.stringify({
+            type: 'frame_format',
+            payload: { encodings, pixel_format: 'top2', weights: 'f16', tick: TICK_VERSION }
+        }));
+        sendVisibility();
         // Sync initial state
         updateConfig();
         sendDataUpdate();
@@ -340,43 +434,260 @@ function connect() {
     };
 }
 
+// Background tabs get no map frames; training continues on the server
+function sendVisibility() {
+    if (ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ type: 'visibility', visible: !document.hidden }));
+    }
+}
+document.addEventListener('visibilitychange', sendVisibility);
+
+function applyMetrics(step, loss) {
+    currentLoss = loss;
+    // Use server step count for accuracy
+    currentEpoch = step || (currentEpoch + 1);
+    updateUIStatus();
+    updateHistoryUI();
+}
+
+const TICK_VERSION = 1;
+
 function handleBinaryMessage(buffer) {
     const view = new DataView(buffer);
     const type = view.getUint8(0);
     
-    if (type === 0x01) { // Map Update
+    if (type === 0x06) { // Tick: metrics + map frame + weights frame (negotiated)
+        if (view.getUint8(1) !== TICK_VERSION) return;
+        applyMetrics(view.getUint32(4, true), view.getFloat32(8, true));
+        const mapLength = view.getUint32(12, true);
+        const weightsLength = view.getUint32(16, true);
+        // Nested frames are copied out so typed arrays over them stay aligned
+        if (weightsLength) handleBinaryMessage(buffer.slice(20 + mapLength, 20 + mapLength + weightsLength));
+        if (mapLength) handleBinaryMessage(buffer.slice(20, 20 + mapLength));
+    } else if (type === 0x01) { // Map Update
         const width = view.getUint16(1, true); // Little endian
         const height = view.getUint16(3, true);
         
         const headerSize = 5;
-        const rgbData = new Uint8Array(buffer, headerSize);
-        
-        if (mapCanvas.width !== width || mapCanvas.height !== height) {
-            mapCanvas.width = width;
-            mapCanvas.height = height;
-            mapCtx = mapCanvas.getContext('2d');
+        drawMap(width, height, new Uint8Array(buffer, headerSize));
+    } else if (type === 0x04) { // History frame (reply to a seek)
+        const step = view.getUint32(1, true);
+        const loss = view.getFloat32(5, true);
+        const width = view.getUint16(9, true);
+        const height = view.getUint16(11, true);
+        if (isTraining) return;
+        drawMap(width, height, new Uint8Array(buffer, 13));
+        metricsDiv.textContent = `Steps: ${step} (History) | Loss: ${loss.toFixed(4)}`;
+    } else if (type === 0x05) { // Model parameters (negotiated)
+        weights = decodeWeights(buffer);
+        const now = Date.now();
+        if (now - lastWeightsSave > 1000) {
+            lastWeightsSave = now;
+            stateManager.saveWeights(weightsToLists(weights));
         }
-        
-        const imgData = mapCtx.createImageData(width, height);
-        // data is RGB (3 bytes), imgData is RGBA (4 bytes)
-        const len = rgbData.length;
-        for (let i = 0; i < len / 3; i++) {
-            const pixelIdx = i * 3;
-            const offset = i * 4;
-            imgData.data[offset] = rgbData[pixelIdx];
-            imgData.data[offset+1] = rgbData[pixelIdx+1];
-            imgData.data[offset+2] = rgbData[pixelIdx+2];
-            imgData.data[offset+3] = 255; // Alpha
+    } else if (type === 0x02 || type === 0x03) { // Keyframe / delta (negotiated)
+        // Decoding may be asynchronous (zlib), keep frames in order
+        frameChain = frameChain
+            .then(() => decodeFrame(buffer))
+            .catch(err => console.error('Frame decode error:', err));
+    }
+}
+
+function halfToFloat(h) {
+    const exponent = (h >> 10) & 0x1f;
+    const fraction = h & 0x3ff;
+    const sign = h & 0x8000 ? -1 : 1;
+    if (exponent === 0) return sign * Math.pow(2, -14) * (fraction / 1024);
+    if (exponent === 0x1f) return fraction ? NaN : sign * Infinity;
+    return sign * Math.pow(2, exponent - 15) * (1 + fraction / 1024);
+}
+
+// Weights frame: type, dtype (0 f32, 1 f16, 2 int8), layers u16, step u32,
+// layer sizes u16 padded to 4 bytes, int8 scales f32, then per layer the
+// weight matrix (out x in) and the bias vector
+function decodeWeights(buffer) {
+    const view = new DataView(buffer);
+    const dtype = view.getUint8(1);
+    const layers = view.getUint16(2, true);
+    const step = view.getUint32(4, true);
+    let offset = 8;
+    const dims = [];
+    for (let i = 0; i <= layers; i++) {
+        dims.push(view.getUint16(offset, true));
+        offset += 2;
+    }
+    offset += (4 - offset % 4) % 4;
+    const scales = [];
+    if (dtype === 2) {
+        for (let i = 0; i < 2 * layers; i++) {
+            scales.push(view.getFloat32(offset, true));
+            offset += 4;
         }
-        
-        mapCtx.putImageData(imgData, 0, 0);
-        createImageBitmap(mapCanvas).then(bmp => {
-            mapData = bmp;
-            if (isTraining && currentEpoch % recordingInterval === 0) {
-                recordHistory(bmp, currentEpoch, currentLoss);
+    }
+    const readTensor = (count, scale) => {
+        const values = new Float32Array(count);
+        for (let i = 0; i < count; i++) {
+            if (dtype === 0) {
+                values[i] = view.getFloat32(offset, true);
+                offset += 4;
+            } else if (dtype === 1) {
+                values[i] = halfToFloat(view.getUint16(offset, true));
+                offset += 2;
+            } else {
+                values[i] = view.getInt8(offset) * scale;
+                offset += 1;
             }
-        });
+        }
+        return values;
+    };
+    const result = { step, dims, weights: [], biases: [] };
+    for (let l = 0; l < layers; l++) {
+        result.weights.push(readTensor(dims[l] * dims[l + 1], scales[2 * l]));
+        result.biases.push(readTensor(dims[l + 1], scales[2 * l + 1]));
+    }
+    return result;
+}
+
+// Stored weights keep the JSON layout of the server's state dicts
+function weightsToLists(decoded) {
+    return {
+        weights: decoded.weights.map((w, l) => {
+            const fanIn = decoded.dims[l];
+            const rows = [];
+            for (let r = 0; r < w.length / fanIn; r++) {
+                rows.push(Array.from(w.subarray(r * fanIn, (r + 1) * fanIn)));
+            }
+            return rows;
+        }),
+        biases: decoded.biases.map(b => Array.from(b))
+    };
+}
+
+async function inflate(data) {
+    const stream = new Blob([data]).stream().pipeThrough(new DecompressionStream('deflate'));
+    return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+async function decodeFrame(buffer) {
+    const view = new DataView(buffer);
+    const type = view.getUint8(0);
+    const flags = view.getUint8(1);
+    const frameId = view.getUint32(2, true);
+    const formatCode = (flags >> 1) & 0x03;
+    const channels = PIXEL_FORMAT_CHANNELS[formatCode];
+
+    let width, height, headerSize, baseId = 0, tileSize = 0, tileCount = 0;
+    if (type === 0x02) {
+        width = view.getUint16(6, true);
+        height = view.getUint16(8, true);
+        headerSize = 10;
+    } else {
+        baseId = view.getUint32(6, true);
+        width = view.getUint16(10, true);
+        height = view.getUint16(12, true);
+        tileSize = view.getUint8(14);
+        tileCount = view.getUint32(15, true);
+        headerSize = 19;
+    }
+
+    let body = new Uint8Array(buffer, headerSize);
+    if (flags & 0x01) {
+        body = await inflate(body);
+    }
+
+    let pixels;
+    if (type === 0x02) {
+        pixels = body.slice();
+    } else {
+        const base = frameRing.get(baseId);
+        if (!base || base.length !== width * height * channels) {
+            // Lost the base frame: ask for a fresh keyframe
+            ws.send(JSON.stringify({ type: 'request_keyframe' }));
+            return;
+        }
+        pixels = base.slice();
+        const bodyView = new DataView(body.buffer, body.byteOffset, body.byteLength);
+        const tilesX = Math.ceil(width / tileSize);
+        const tileBytes = tileSize * tileSize * channels;
+        let tileOffset = tileCount * 4;
+        for (let t = 0; t < tileCount; t++) {
+            const index = bodyView.getUint32(t * 4, true);
+            const x0 = (index % tilesX) * tileSize;
+            const y0 = Math.floor(index / tilesX) * tileSize;
+            const rowBytes = Math.min(tileSize, width - x0) * channels;
+            for (let r = 0; r < tileSize && y0 + r < height; r++) {
+                const src = tileOffset + r * tileSize * channels;
+                pixels.set(body.subarray(src, src + rowBytes), ((y0 + r) * width + x0) * channels);
+            }
+            tileOffset += tileBytes;
+        }
+    }
+
+    frameRing.set(frameId, pixels);
+    while (frameRing.size > frameFormat.max_unacked) {
+        frameRing.delete(frameRing.keys().next().value);
     }
+    drawMap(width, height, formatCode === 0 ? pixels : colorizeMap(pixels, formatCode));
+    if (ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ type: 'frame_ack', frame_id: frameId }));
+    }
+}
+
+// Turns class-index pixels into RGB: index frames (class, confidence) fade
+// from neutral gray to the class colour, top2 frames (first, second, share
+// of first) mix the two class colours.
+function colorizeMap(pixels, formatCode) {
+    const palette = CLASS_COLORS.map(hexToRgb);
+    const black = { r: 0, g: 0, b: 0 };
+    const channels = PIXEL_FORMAT_CHANNELS[formatCode];
+    const count = pixels.length / channels;
+    const rgb = new Uint8Array(count * 3);
+    for (let i = 0; i < count; i++) {
+        const src = i * channels;
+        const a = palette[pixels[src]] || black;
+        let r, g, b;
+        if (formatCode === 1) {
+            const w = pixels[src + 1] / 255;
+            r = a.r * w + MAP_NEUTRAL * (1 - w);
+            g = a.g * w + MAP_NEUTRAL * (1 - w);
+            b = a.b * w + MAP_NEUTRAL * (1 - w);
+        } else {
+            const other = palette[pixels[src + 1]] || black;
+            const w = pixels[src + 2] / 255;
+            r = a.r * w + other.r * (1 - w);
+            g = a.g * w + other.g * (1 - w);
+            b = a.b * w + other.b * (1 - w);
+        }
+        rgb[i * 3] = r;
+        rgb[i * 3 + 1] = g;
+        rgb[i * 3 + 2] = b;
+    }
+    return rgb;
+}
+
+function drawMap(width, height, rgbData) {
+    if (mapCanvas.width !== width || mapCanvas.height !== height) {
+        mapCanvas.width = width;
+        mapCanvas.height = height;
+        mapCtx = mapCanvas.getContext('2d');
+    }
+    
+    const imgData = mapCtx.createImageData(width, height);
+    // data is RGB (3 bytes), imgData is RGBA (4 bytes)
+    const len = rgbData.length;
+    for (let i = 0; i < len / 3; i++) {
+        const pixelIdx = i * 3;
+        const offset = i * 4;
+        imgData.data[offset] = rgbData[pixelIdx];
+        imgData.data[offset+1] = rgbData[pixelIdx+1];
+        imgData.data[offset+2] = rgbData[pixelIdx+2];
+        imgData.data[offset+3] = 255; // Alpha
+    }
+    
+    mapCtx.putImageData(imgData, 0, 0);
+    createImageBitmap(mapCanvas).then(bmp => {
+        mapData = bmp;
+    });
 }
 
 function handleMessage(message) {
@@ -388,13 +699,21 @@ function handleMessage(message) {
         }
         
         if (message.metrics) {
-            currentLoss = message.metrics.loss;
-            // Use server step count for accuracy
-            currentEpoch = message.metrics.step || (currentEpoch + 1);
+            applyMetrics(message.metrics.step, message.metrics.loss);
         }
         
-        updateUIStatus();
-        
+    } else if (message.type === 'frame_format') {
+        frameFormat = message.payload;
+
+    } else if (message.type === 'training_status') {
+        const { state, position } = message.payload;
+        trainingState = state;
+        if (state === 'queued') {
+            statusDiv.textContent = `Status: Queued (position ${position})`;
+        } else {
+            updateUIStatus();
+        }
+
     } else if (message.type === 'architecture_synced') {
         const layers = message.payload.hidden_layers;
         statusDiv.textContent = `Status: Architecture Synced [${layers.join('-')}]`;
@@ -441,17 +760,16 @@ function handleMessage(message) {
         mapCtx.putImageData(imgData, 0, 0);
         createImageBitmap(mapCanvas).then(bmp => {
             mapData = bmp;
-            if (isTraining && currentEpoch % recordingInterval === 0) {
-                recordHistory(bmp, currentEpoch, currentLoss);
-            }
         });
     } else if (message.type === 'data_generated') {
         points = message.data;
+        assignPointIds();
         stateManager.saveData(points);
         // Reset model weights and training state when data changes
         resetModel();
     } else if (message.type === 'config') {
         const { version, author } = message.payload;
+        sessionId = message.payload.session_id;
         const footerInfo = document.querySelector('.footer-info');
         if (footerInfo) {
             footerInfo.innerHTML = `
@@ -475,15 +793,6 @@ function hexToRgb(hex) {
     } : { r: 0, g: 0, b: 0 };
 }
 
-function recordHistory(bmp, epoch, loss) {
-    history.push({ epoch, mapData: bmp, loss });
-    if (history.length > MAX_HISTORY) {
-        history = history.filter((_, i) => i % 2 === 0);
-        recordingInterval *= 2;
-    }
-    updateHistoryUI();
-}
-
 // Generator Handlers
 const genClassesInput = document.getElementById('gen-classes');
 const generatorButtons = {
@@ -510,13 +819,15 @@ Object.entries(generatorButtons).forEach(([id, dist]) => {
 });
 
 historySeekbar.oninput = () => {
-    if (isTraining) return;
-    const idx = parseInt(historySeekbar.value);
-    const snapshot = history[idx];
-    if (snapshot) {
-        mapData = snapshot.mapData;
-        metricsDiv.textContent = `Steps: ${snapshot.epoch} (History) | Loss: ${snapshot.loss.toFixed(4)}`;
-    }
+    if (isTraining || !ws || ws.readyState !== WebSocket.OPEN) return;
+    viewingHistory = true;
+    // Rendered at the canvas resolution from the closest recorded snapshot
+    ws.send(JSON.stringify({
+        type: 'seek',
+        step: parseInt(historySeekbar.value),
+        width: CANVAS_WIDTH,
+        height: CANVAS_HEIGHT
+    }));
 };
 
 function render() {
@@ -13,10 +13,13 @@ export class StateManager {
                 learningRate: 0.01, 
                 architecture: [10, 5], 
                 activation: 'tanh',
+                engine: 'torch',
                 optimizer: 'adam',
                 regularization: 0,
                 batchSize: 0,
-                dropout: 0
+                dropout: 0,
+                stepsPerIteration: 1,
+                onPlateau: 'throttle'
             }),
             weights: this._load(this.STORAGE_KEYS.WEIGHTS, null),
             data: this._load(this.STORAGE_KEYS.DATA, [])
@@ -0,0 +1,36 @@
+import time
+from typing import Callable
+
+import pytest
+from nnvisu.logic.backends import TrainingBackend
+from nnvisu.logic.dataset import Dataset
+from nnvisu.logic.model import NeuralNetwork
+from nnvisu.logic.session import TrainingSession
+
+@pytest.fixture
+def make_session() -> Callable[[], TrainingSession]:
+    """Factory of small sessions ready to train (ten points of two classes)."""
+    def make() -> TrainingSession:
+        session = TrainingSession()
+        session.set_model(NeuralNetwork(hidden_layers=[5], output_dim=2))
+        session.set_data(Dataset.from_points(
+            [{'x': 0.1 * i, 'y': -0.1 * i, 'label': i % 2} for i in range(10)]
+        ))
+        session.update_config({'learningRate': 0.01})
+        return session
+    return make
+
+@pytest.fixture
+def wait_for_metric() -> Callable[..., bool]:
+    """Poll a backend until a session has reported a training metric."""
+    def wait(
+        session: TrainingSession, backend: TrainingBackend, timeout: float = 5.0
+    ) -> bool:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            backend.poll(session)
+            if not session.step_queue.empty():
+                return True
+            time.sleep(0.01)
+        return False
+    return wait
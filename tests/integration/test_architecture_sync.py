@@ -3,6 +3,8 @@ from typing import Any
 from tornado.testing import AsyncHTTPTestCase, gen_test
 from tornado.websocket import websocket_connect
 from nnvisu.app import make_app
+from nnvisu.logic.model import NeuralNetwork
+from nnvisu.logic.weights import encode_weights
 
 class TestArchitectureUpdate(AsyncHTTPTestCase):
     def get_app(self) -> Any:
@@ -148,3 +150,30 @@ class TestArchitectureUpdate(AsyncHTTPTestCase):
         
         assert found_weights, "Did not receive model weights in step_result"
         client.close()
+
+    @gen_test
+    def test_weights_frame_must_match_architecture(self) -> None:
+        url = self.get_url('/ws').replace('http', 'ws')
+        client = yield websocket_connect(url)
+        yield client.read_message()
+
+        client.write_message(json.dumps({
+            "type": "update_architecture", "payload": {"hidden_layers": [4, 3]}
+        }))
+        while True:
+            message = json.loads((yield client.read_message()))
+            if message["type"] == "architecture_synced":
+                break
+
+        state = NeuralNetwork(hidden_layers=[5]).get_state_dict_as_arrays()
+        frame = encode_weights(state)
+        client.write_message(frame, binary=True)
+        error = json.loads((yield client.read_message()))
+        assert error["type"] == "error"
+        assert "[2, 5, 2]" in error["message"] and "[2, 4, 3, 2]" in error["message"]
+
+        client.write_message(frame[:10], binary=True)
+        error = json.loads((yield client.read_message()))
+        assert error["type"] == "error"
+        assert "Invalid weights frame" in error["message"]
+        client.close()
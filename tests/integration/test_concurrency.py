@@ -62,4 +62,30 @@ class TestConcurrency(AsyncHTTPTestCase): # type: ignore
         assert len(w2) == 5
 
         c1.close()
-        c2.close()
\ No newline at end of file
+        c2.close()
+
+    @gen_test # type: ignore
+    def test_large_dataset_is_generated_off_the_loop(self) -> None: # type: ignore
+        url = self.get_url('/ws').replace('http', 'ws')
+        c1 = yield websocket_connect(url)
+        c2 = yield websocket_connect(url)
+        yield c1.read_message()
+        yield c2.read_message()
+
+        c1.write_message(json.dumps({
+            "type": "generate_data", "distribution": "moons",
+            "num_classes": 3, "n_samples": 50000, "seed": 3
+        }))
+        # Another client is served while the dataset is being generated
+        c2.write_message(json.dumps({"type": "frame_format", "payload": {}}))
+        resp2 = json.loads((yield c2.read_message()))
+        assert resp2["type"] == "frame_format"
+
+        resp1 = json.loads((yield c1.read_message()))
+        assert resp1["type"] == "data_generated"
+        assert len(resp1["data"]) == 50000
+        assert {p["label"] for p in resp1["data"]} == {0, 1, 2}
+        assert len({p["id"] for p in resp1["data"]}) == 50000
+
+        c1.close()
+        c2.close()
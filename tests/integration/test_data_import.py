@@ -0,0 +1,55 @@
+import json
+import tempfile
+from typing import Any
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.websocket import websocket_connect
+from nnvisu.app import make_app
+
+class TestDataImport(AsyncHTTPTestCase): # type: ignore
+    def get_app(self) -> Any:
+        self.data_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.data_dir.cleanup)
+        return make_app(data_dir=self.data_dir.name)
+
+    @gen_test # type: ignore
+    def test_import_csv_into_session(self) -> None: # type: ignore
+        url = self.get_url('/ws').replace('http', 'ws')
+        client = yield websocket_connect(url)
+        config = json.loads((yield client.read_message()))
+        session_id = config["payload"]["session_id"]
+        data_url = self.get_url(f'/api/session/{session_id}/data')
+
+        rows = "\n".join(f"{i},{i % 7},{i % 3}" for i in range(500))
+        response = yield self.http_client.fetch(
+            data_url + '?preview=50', method="POST", body="x,y,label\n" + rows
+        )
+        reply = json.loads(response.body)
+        assert reply["points"] == 500
+        assert reply["classes"] == 3
+        assert len(reply["data"]) == 50
+        assert all(-1 <= p["x"] <= 1 and -1 <= p["y"] <= 1 for p in reply["data"])
+
+        # The session trains on the imported points
+        client.write_message(json.dumps({"type": "start_training"}))
+        trained = False
+        for _ in range(100):
+            msg = yield client.read_message()
+            if isinstance(msg, str) and json.loads(msg)["type"] == "step_result":
+                trained = True
+                break
+        assert trained
+
+        response = yield self.http_client.fetch(
+            data_url, method="POST", body="0,0,0.5\n", raise_error=False
+        )
+        assert response.code == 400
+        assert "Labels" in json.loads(response.body)["error"]
+        client.close()
+
+    @gen_test # type: ignore
+    def test_unknown_session(self) -> None: # type: ignore
+        response = yield self.http_client.fetch(
+            self.get_url('/api/session/0123abcd/data'), method="POST", body="0,0,0\n",
+            raise_error=False
+        )
+        assert response.code == 404
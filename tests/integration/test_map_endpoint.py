@@ -0,0 +1,61 @@
+import json
+from typing import Any
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.websocket import websocket_connect
+from nnvisu.app import make_app
+
+class TestMapEndpoint(AsyncHTTPTestCase): # type: ignore
+    def get_app(self) -> Any:
+        return make_app()
+
+    @gen_test # type: ignore
+    def test_session_map_is_cacheable(self) -> None: # type: ignore
+        url = self.get_url('/ws').replace('http', 'ws')
+        client = yield websocket_connect(url)
+        config = json.loads((yield client.read_message()))
+        session_id = config["payload"]["session_id"]
+
+        client.write_message(json.dumps({
+            "type": "update_architecture", "payload": {"hidden_layers": [4]}
+        }))
+        while True:
+            message = json.loads((yield client.read_message()))
+            if message["type"] == "architecture_synced":
+                break
+
+        map_url = self.get_url(f'/api/session/{session_id}/map?w=32&h=16')
+        response = yield self.http_client.fetch(map_url)
+        assert response.headers["Content-Type"] == "image/png"
+        assert response.body.startswith(b"\x89PNG")
+        etag = response.headers["Etag"]
+        version = response.headers["X-Model-Version"]
+        assert response.headers["Cache-Control"] == "no-cache"
+
+        # Unchanged model: revalidation without re-rendering
+        response = yield self.http_client.fetch(
+            map_url, headers={"If-None-Match": etag}, raise_error=False
+        )
+        assert response.code == 304
+
+        # A versioned URL of a zoomed-in viewport is immutable
+        response = yield self.http_client.fetch(
+            map_url + f'&v={version}&x0=0&x1=0.5&y0=0&y1=0.5&format=raw'
+        )
+        assert "immutable" in response.headers["Cache-Control"]
+        assert response.body[0] == 0x01 and len(response.body) == 5 + 32 * 16 * 3
+
+        response = yield self.http_client.fetch(
+            map_url + '&v=0.999999', raise_error=False
+        )
+        assert response.code == 404
+        response = yield self.http_client.fetch(
+            map_url + '&x0=1&x1=0', raise_error=False
+        )
+        assert response.code == 400
+
+        client.close()
+        missing = '/api/session/00000000-0000-0000-0000-000000000000/map'
+        response = yield self.http_client.fetch(
+            self.get_url(missing), raise_error=False
+        )
+        assert response.code == 404
@@ -0,0 +1,149 @@
+import json
+from typing import Any
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.websocket import websocket_connect
+from nnvisu.app import make_app
+from nnvisu.logic.frames import FRAME_TYPE_TICK, TICK_VERSION, decode_tick
+from nnvisu.logic.weights import FRAME_TYPE_WEIGHTS, decode_weights
+
+class TestMapFrames(AsyncHTTPTestCase): # type: ignore
+    def get_app(self) -> Any:
+        return make_app()
+
+    @gen_test # type: ignore
+    def test_map_frames_are_rendered_off_the_loop(self) -> None: # type: ignore
+        url = self.get_url('/ws').replace('http', 'ws')
+        client = yield websocket_connect(url)
+        yield client.read_message()
+
+        client.write_message(json.dumps({"type": "update_data", "data": [
+            {"x": 0.5, "y": 0.5, "label": 0}, {"x": -0.5, "y": -0.5, "label": 1}
+        ]}))
+        client.write_message(json.dumps({"type": "start_training"}))
+
+        frame = None
+        for _ in range(50):
+            msg = yield client.read_message()
+            if isinstance(msg, bytes):
+                frame = msg
+                break
+        assert frame is not None
+        assert frame[0] == 0x01
+        width = int.from_bytes(frame[1:3], 'little')
+        height = int.from_bytes(frame[3:5], 'little')
+        assert len(frame) == 5 + width * height * 3
+
+        # The loop keeps answering messages while renders are in flight
+        client.write_message(json.dumps(
+            {"type": "update_architecture", "payload": {"hidden_layers": [3]}}
+        ))
+        synced = False
+        for _ in range(50):
+            msg = yield client.read_message()
+            if (isinstance(msg, str) and
+                    json.loads(msg)["type"] == "architecture_synced"):
+                synced = True
+                break
+        assert synced
+        client.close()
+
+    @gen_test # type: ignore
+    def test_hidden_client_gets_no_frames(self) -> None: # type: ignore
+        url = self.get_url('/ws').replace('http', 'ws')
+        client = yield websocket_connect(url)
+        yield client.read_message()
+
+        client.write_message(json.dumps({"type": "visibility", "visible": False}))
+        client.write_message(json.dumps({"type": "update_data", "data": [
+            {"x": 0.5, "y": 0.5, "label": 0}, {"x": -0.5, "y": -0.5, "label": 1}
+        ]}))
+        client.write_message(json.dumps({"type": "start_training"}))
+
+        # Training goes on (metrics arrive), but no map is rendered
+        results = 0
+        while results < 5:
+            msg = yield client.read_message()
+            assert isinstance(msg, str)
+            if json.loads(msg)["type"] == "step_result":
+                results += 1
+
+        client.write_message(json.dumps({"type": "visibility", "visible": True}))
+        frame = None
+        for _ in range(50):
+            msg = yield client.read_message()
+            if isinstance(msg, bytes):
+                frame = msg
+                break
+        assert frame is not None and frame[0] == 0x01
+        client.close()
+
+    @gen_test # type: ignore
+    def test_tick_frames_carry_metrics_and_map(self) -> None: # type: ignore
+        url = self.get_url('/ws').replace('http', 'ws')
+        client = yield websocket_connect(url)
+        yield client.read_message()
+
+        client.write_message(json.dumps({
+            "type": "frame_format",
+            "payload": {"weights": "f16", "tick": TICK_VERSION + 1}
+        }))
+        accepted = json.loads((yield client.read_message()))
+        assert accepted["payload"]["tick"] == TICK_VERSION
+
+        client.write_message(json.dumps({"type": "update_data", "data": [
+            {"x": 0.5, "y": 0.5, "label": 0}, {"x": -0.5, "y": -0.5, "label": 1}
+        ]}))
+        client.write_message(json.dumps({"type": "start_training"}))
+
+        # Metrics no longer come as step_result; one binary message per update
+        map_frame = None
+        for _ in range(50):
+            msg = yield client.read_message()
+            if isinstance(msg, str):
+                assert json.loads(msg)["type"] != "step_result"
+                continue
+            assert msg[0] == FRAME_TYPE_TICK
+            step, loss, map_frame, weights_frame = decode_tick(msg)
+            assert step > 0 and loss > 0
+            assert weights_frame is None or weights_frame[0] == 0x05
+            if map_frame is not None:
+                break
+        assert map_frame is not None and map_frame[0] == 0x01
+        client.close()
+
+    @gen_test # type: ignore
+    def test_final_state_is_sent_after_stop(self) -> None: # type: ignore
+        url = self.get_url('/ws').replace('http', 'ws')
+        client = yield websocket_connect(url)
+        yield client.read_message()
+
+        client.write_message(json.dumps({
+            "type": "frame_format", "payload": {"weights": "f32"}
+        }))
+        client.write_message(json.dumps({"type": "update_data", "data": [
+            {"x": 0.5, "y": 0.5, "label": 0}, {"x": -0.5, "y": -0.5, "label": 1}
+        ]}))
+        client.write_message(json.dumps({"type": "start_training"}))
+        results = 0
+        while results < 5:
+            msg = yield client.read_message()
+            if isinstance(msg, str) and json.loads(msg)["type"] == "step_result":
+                results += 1
+        client.write_message(json.dumps({"type": "stop_training"}))
+
+        # Once stopped, no new metrics arrive; the weights (and map) of the
+        # last step still follow, even if no frame was due when it arrived
+        stopped = False
+        last_step = -1
+        weights_step = -2
+        while not (stopped and weights_step == last_step):
+            msg = yield client.read_message()
+            if isinstance(msg, str):
+                message = json.loads(msg)
+                if message["type"] == "step_result":
+                    last_step = message["metrics"]["step"]
+                elif message["type"] == "training_status":
+                    stopped = message["payload"]["state"] == "stopped"
+            elif msg[0] == FRAME_TYPE_WEIGHTS:
+                _, weights_step = decode_weights(msg)
+        client.close()
@@ -0,0 +1,80 @@
+from typing import Any
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.websocket import websocket_connect
+from nnvisu.app import make_app
+from nnvisu.protocol import SERVER_MESSAGE_SCHEMAS, decode_message, encode_message
+
+class TestTrainStepModelCache(AsyncHTTPTestCase): # type: ignore
+    def get_app(self) -> Any:
+        return make_app()
+
+    @gen_test # type: ignore
+    def test_version_token_reuses_live_model(self) -> None: # type: ignore
+        url = self.get_url('/ws').replace('http', 'ws')
+        client = yield websocket_connect(url)
+        yield client.read_message()
+
+        client.write_message(encode_message({
+            "type": "train_step",
+            "config": { "architecture": [6], "learningRate": 0.1 },
+            "model": { "weights": [], "biases": [] },
+            "data": [
+                { "x": 0.5, "y": 0.5, "label": 1 }, { "x": -0.5, "y": -0.5, "label": 0 }
+            ]
+        }))
+        first = decode_message((yield client.read_message()), SERVER_MESSAGE_SCHEMAS)
+        assert first["type"] == "step_result"
+        assert len(first["model"]["weights"][0]) == 6
+        token = first["version"]
+
+        # Echo the token without model or data: the server continues from its copy
+        client.write_message(encode_message({"type": "train_step", "version": token}))
+        second = decode_message((yield client.read_message()), SERVER_MESSAGE_SCHEMAS)
+        assert second["type"] == "step_result"
+        assert second["version"] != token
+        assert "model" not in second
+        assert second["metrics"]["loss"] > 0
+
+        # Weights are still available on request
+        client.write_message(encode_message({
+            "type": "train_step", "version": second["version"], "return_model": True
+        }))
+        third = decode_message((yield client.read_message()), SERVER_MESSAGE_SCHEMAS)
+        assert len(third["model"]["weights"][0]) == 6
+
+        # A stale token without a full payload gets an error naming the live token
+        client.write_message(encode_message({"type": "train_step", "version": token}))
+        stale = decode_message((yield client.read_message()), SERVER_MESSAGE_SCHEMAS)
+        assert stale["type"] == "error"
+        assert token in stale["message"]
+        assert stale["version"] == third["version"]
+
+        # A full payload still works
+        client.write_message(encode_message({
+            "type": "train_step",
+            "version": token,
+            "config": { "architecture": [3], "learningRate": 0.1 },
+            "model": { "weights": [], "biases": [] },
+            "data": [{ "x": 0.5, "y": 0.5, "label": 1 }]
+        }))
+        fourth = decode_message((yield client.read_message()), SERVER_MESSAGE_SCHEMAS)
+        assert len(fourth["model"]["weights"][0]) == 3
+
+        client.close()
+
+    @gen_test # type: ignore
+    def test_malformed_payload_is_rejected(self) -> None: # type: ignore
+        url = self.get_url('/ws').replace('http', 'ws')
+        client = yield websocket_connect(url)
+        yield client.read_message()
+
+        client.write_message(encode_message({
+            "type": "train_step",
+            "config": { "architecture": [6], "learningRate": 0.1 },
+            "model": { "weights": [], "biases": [] },
+            "data": [{ "x": 0.5, "y": 0.5, "label": "one" }]
+        }))
+        error = decode_message((yield client.read_message()), SERVER_MESSAGE_SCHEMAS)
+        assert error["type"] == "error"
+        assert "data[0].label" in error["message"]
+        client.close()
@@ -1,6 +1,8 @@
 import torch
+from nnvisu.logic.dataset import Dataset
 from nnvisu.logic.model import NeuralNetwork
-from nnvisu.logic.trainer import StatelessTrainer
+from nnvisu.logic.session import TrainingSession
+from nnvisu.logic.trainer import EpochSampler, StatelessTrainer, StatefulTrainer
 
 def test_neural_network_activation_switching():
     # Test Tanh
@@ -27,7 +29,7 @@ def test_neural_network_dropout_injection():
 def test_trainer_optimizer_selection():
     trainer = StatelessTrainer()
     model = NeuralNetwork(hidden_layers=[5], output_dim=2)
-    data = [{'x': 0.1, 'y': 0.2, 'label': 0}]
+    data = Dataset.from_points([{'x': 0.1, 'y': 0.2, 'label': 0}])
     
     # This is a bit tricky to test directly as optimizers are local to train_step
     # but we can verify the function runs without error for different configs
@@ -50,15 +52,29 @@ def test_trainer_optimizer_selection():
     loss_sgd = trainer.train_step(model, data, config_sgd)
     assert isinstance(loss_sgd, float)
 
+def test_stateful_optimizer_follows_output_layer():
+    trainer = StatefulTrainer()
+    model = NeuralNetwork(hidden_layers=[5], output_dim=2)
+    config = {'optimizer': 'adam', 'learningRate': 0.01}
+    optimizer = trainer._get_optimizer(model, config)
+    assert trainer._get_optimizer(model, config) is optimizer
+
+    # A new output layer needs a new optimizer
+    model.adapt_output_layer(3)
+    rebuilt = trainer._get_optimizer(model, config)
+    assert rebuilt is not optimizer
+    params = {id(p) for group in rebuilt.param_groups for p in group['params']}
+    assert params == {id(p) for p in model.parameters()}
+
 def test_trainer_batch_sampling():
     trainer = StatelessTrainer()
     model = NeuralNetwork(hidden_layers=[5], output_dim=2)
-    data = [
+    data = Dataset.from_points([
         {'x': 0.1, 'y': 0.1, 'label': 0},
         {'x': 0.2, 'y': 0.2, 'label': 1},
         {'x': 0.3, 'y': 0.3, 'label': 0},
         {'x': 0.4, 'y': 0.4, 'label': 1},
-    ]
+    ])
     
     config_batch = {
         'optimizer': 'adam',
@@ -71,3 +87,30 @@ def test_trainer_batch_sampling():
     # Sampling logic happens inside train_step.
     loss = trainer.train_step(model, data, config_batch)
     assert isinstance(loss, float)
+
+def test_epoch_sampler_covers_epoch():
+    sampler = EpochSampler()
+    seen = torch.cat([sampler.next_batch(10, 2, data_version=1) for _ in range(5)])
+    # One full epoch visits every point exactly once
+    assert sorted(seen.tolist()) == list(range(10))
+
+    # Data change forces a fresh permutation
+    sampler.next_batch(10, 2, data_version=1)
+    sampler.next_batch(6, 3, data_version=2)
+    assert sampler.permutation.shape[0] == 6
+
+def test_fused_iteration_reports_aggregated_metric():
+    trainer = StatefulTrainer()
+    session = TrainingSession()
+    session.set_model(NeuralNetwork(hidden_layers=[5], output_dim=2))
+    points = [{'x': 0.1 * i, 'y': 0.0, 'label': i % 2} for i in range(10)]
+    session.set_data(Dataset.from_points(points))
+    session.update_config({'batchSize': 2, 'stepsPerIteration': 8})
+
+    steps = trainer.run_iteration(session)
+    assert steps == 8
+
+    metric = session.step_queue.get_nowait()
+    assert metric['steps'] == 8
+    assert isinstance(metric['loss'], float)
+    assert session.step_queue.empty()
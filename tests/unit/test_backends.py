@@ -0,0 +1,107 @@
+import time
+from typing import Callable
+
+import torch
+from nnvisu.logic.backends import ProcessBackend, ThreadBackend, create_backend
+from nnvisu.logic.session import TrainingSession
+from nnvisu.logic.trainer import StatefulTrainer
+
+def test_create_backend_by_name() -> None:
+    assert isinstance(create_backend("thread"), ThreadBackend)
+    try:
+        create_backend("gpu-cluster")
+        assert False, "Unknown backend must be rejected"
+    except ValueError:
+        pass
+
+def test_thread_backend_start_stop(
+    make_session: Callable[[], TrainingSession], wait_for_metric: Callable[..., bool]
+) -> None:
+    backend = ThreadBackend()
+    session = make_session()
+
+    backend.start(session, StatefulTrainer())
+    assert wait_for_metric(session, backend, timeout=5.0)
+
+    backend.stop(session)
+    assert session.training_thread is None
+
+def test_process_backend_trains_shared_parameters(
+    make_session: Callable[[], TrainingSession], wait_for_metric: Callable[..., bool]
+) -> None:
+    backend = ProcessBackend(max_idle=1)
+    session = make_session()
+    assert session.model is not None
+    before = session.model.net[0].weight.detach().clone()
+
+    try:
+        backend.start(session, StatefulTrainer())
+        # Spawning a worker imports torch, which can take a while
+        assert wait_for_metric(session, backend, timeout=60.0)
+        backend.stop(session)
+
+        metric = session.step_queue.get_nowait()
+        assert metric['steps'] >= 1
+        # The worker updated the parameters in place through shared memory
+        assert not torch.equal(before, session.model.net[0].weight.detach())
+    finally:
+        backend.shutdown()
+
+def test_process_backend_sync_updates_the_running_job(
+    make_session: Callable[[], TrainingSession], wait_for_metric: Callable[..., bool]
+) -> None:
+    backend = ProcessBackend(max_idle=1)
+    session = make_session()
+    assert session.model is not None
+
+    try:
+        backend.start(session, StatefulTrainer())
+        assert wait_for_metric(session, backend, timeout=60.0)
+        worker = backend.assignments[session.id].worker
+
+        # A zero learning rate freezes the parameters without restarting the worker
+        session.update_config({'learningRate': 0.0})
+        backend.sync(session, StatefulTrainer())
+        time.sleep(1.0)
+        assignment = backend.assignments[session.id]
+        assert assignment.worker is worker
+        frozen = session.model.net[0].weight.detach().clone()
+        steps = assignment.reported_steps
+        deadline = time.time() + 5.0
+        while assignment.reported_steps == steps and time.time() < deadline:
+            backend.poll(session)
+            time.sleep(0.05)
+        assert assignment.reported_steps > steps
+        assert torch.equal(frozen, session.model.net[0].weight.detach())
+        backend.stop(session)
+    finally:
+        backend.shutdown()
+
+def test_process_backend_trains_loaded_weights(
+    make_session: Callable[[], TrainingSession], wait_for_metric: Callable[..., bool]
+) -> None:
+    backend = ProcessBackend(max_idle=1)
+    session = make_session()
+    assert session.model is not None
+
+    try:
+        backend.start(session, StatefulTrainer())
+        assert wait_for_metric(session, backend, timeout=60.0)
+
+        # A client weights frame mid-training lands in the shared parameters
+        state = session.model.get_state_dict_as_arrays()
+        loaded = [w + 1.0 for w in state["weights"]]
+        with session.lock:
+            session.model.load_state_dict_from_arrays({"weights": loaded})
+        assert session.model.net[0].weight.is_shared()
+        while not session.step_queue.empty():
+            session.step_queue.get()
+        assert wait_for_metric(session, backend, timeout=5.0)
+        backend.stop(session)
+
+        # ...so the worker trains on from them
+        trained = session.model.net[0].weight.detach()
+        assert not torch.equal(trained, torch.from_numpy(loaded[0]))
+        assert (trained - torch.from_numpy(loaded[0])).abs().mean() < 0.5
+    finally:
+        backend.shutdown()
@@ -0,0 +1,42 @@
+import copy
+
+import torch
+from torch import nn, optim
+from nnvisu.logic.batched import BatchedTrainer, model_signature
+from nnvisu.logic.model import NeuralNetwork
+
+def test_model_signature_groups_topologies() -> None:
+    a = NeuralNetwork(hidden_layers=[10, 10], output_dim=2)
+    b = NeuralNetwork(hidden_layers=[10, 10], output_dim=2)
+    c = NeuralNetwork(hidden_layers=[10, 10], output_dim=3)
+    d = NeuralNetwork(hidden_layers=[10, 10], output_dim=2, activation='relu')
+    assert model_signature(a) == model_signature(b)
+    assert model_signature(a) != model_signature(c)
+    assert model_signature(a) != model_signature(d)
+    assert model_signature(NeuralNetwork(hidden_layers=[5], dropout=0.5)) is None
+
+def test_batched_step_matches_individual_steps() -> None:
+    torch.manual_seed(0)
+    models = [NeuralNetwork(hidden_layers=[6], output_dim=2) for _ in range(2)]
+    references = [copy.deepcopy(m) for m in models]
+    # Different batch lengths exercise the padding mask
+    batches = [
+        (torch.randn(5, 2), torch.randint(0, 2, (5,))),
+        (torch.randn(3, 2), torch.randint(0, 2, (3,))),
+    ]
+
+    optimizers = [optim.SGD(m.parameters(), lr=0.1) for m in models]
+    losses = BatchedTrainer().step(models, batches, optimizers)
+
+    criterion = nn.CrossEntropyLoss()
+    for ref, (X, y), loss in zip(references, batches, losses):  # noqa: N806
+        opt = optim.SGD(ref.parameters(), lr=0.1)
+        opt.zero_grad()
+        ref_loss = criterion(ref(X), y)
+        ref_loss.backward()
+        opt.step()
+        assert abs(ref_loss.item() - loss) < 1e-5
+
+    for model, ref in zip(models, references):
+        for p, q in zip(model.parameters(), ref.parameters()):
+            assert torch.allclose(p, q, atol=1e-6)
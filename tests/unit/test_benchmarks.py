@@ -0,0 +1,35 @@
+from pathlib import Path
+from nnvisu.benchmarks import compare, main, measure, run
+
+def _report(seconds: float) -> dict:
+    return {"results": {"case": {"seconds": seconds}}}
+
+def test_compare_flags_regressions() -> None:
+    baseline = _report(1.0)
+    assert compare(_report(1.1), baseline, tolerance=0.25) == []
+    assert compare(_report(0.5), baseline, tolerance=0.25) == []
+    regressions = compare(_report(2.0), baseline, tolerance=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("case")
+
+def test_compare_ignores_new_cases() -> None:
+    assert compare(_report(1.0), {"results": {}}, tolerance=0.25) == []
+
+def test_measure_reports_timings() -> None:
+    result = measure(lambda: sum(range(100)), min_time=0.01, repeats=2)
+    assert result["seconds"] > 0
+    assert result["calls"] >= 2
+
+def test_quick_protocol_suite_runs() -> None:
+    report = run(["protocol"], quick=True, min_time=0.01)
+    assert report["meta"]["quick"] is True
+    assert any(name.startswith("protocol/") for name in report["results"])
+
+def test_missing_baseline_fails(tmp_path: Path) -> None:
+    baseline = tmp_path / "baseline.json"
+    args = ["--suite", "protocol", "--quick", "--min-time", "0.01"]
+    args += ["--baseline", str(baseline)]
+    assert main(args) == 2
+
+    assert main(args + ["--save-baseline"]) == 0
+    assert baseline.exists()
+    assert main(args + ["--tolerance", "100"]) == 0
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+import torch
+from nnvisu.logic.dataset import MAX_POINT_ID, Dataset
+
+def test_add_remove_keeps_ids_stable() -> None:
+    dataset = Dataset(capacity=2)
+    ids = [dataset.add(0.1 * i, -0.1 * i, i % 3) for i in range(5)]
+    assert ids == [0, 1, 2, 3, 4]
+    assert len(dataset) == 5
+
+    # The last point is swapped into the gap; ids still find their rows
+    assert dataset.remove(1)
+    assert not dataset.remove(1)
+    assert 1 not in dataset
+    points = {p["id"]: p for p in dataset.to_points()}
+    assert sorted(points) == [0, 2, 3, 4]
+    assert abs(points[4]["x"] - 0.4) < 1e-6
+    assert points[4]["label"] == 1
+
+    # Columns only cover the points present
+    assert dataset.x.shape == dataset.y.shape == dataset.label.shape == (4,)
+    assert sorted(dataset.label.tolist()) == [0, 0, 1, 2]
+
+def test_class_counts_track_output_dim() -> None:
+    dataset = Dataset()
+    assert dataset.required_output_dim() == 2
+    a = dataset.add(0.0, 0.0, 0)
+    b = dataset.add(0.5, 0.5, 4)
+    assert dataset.required_output_dim() == 5
+
+    dataset.move(b, 0.2, 0.2, label=2)
+    assert dataset.class_counts == {0: 1, 2: 1}
+    assert dataset.required_output_dim() == 3
+
+    dataset.remove(b)
+    dataset.remove(a)
+    assert dataset.class_counts == {}
+    assert dataset.required_output_dim() == 2
+
+def test_from_points_and_tensors() -> None:
+    dataset = Dataset.from_points([
+        {"x": 0.5, "y": -0.5, "label": 1, "id": 7}, {"x": 0.1, "y": 0.2, "label": 0}
+    ])
+    assert [p["id"] for p in dataset.to_points()] == [7, 8]
+    # Re-adding an id replaces the point
+    dataset.add(0.3, 0.3, 1, point_id=7)
+    assert len(dataset) == 2
+    assert dataset.class_counts == {0: 1, 1: 1}
+
+    data_x, data_y = dataset.tensors()
+    assert data_x.dtype == torch.float32 and data_x.shape == (2, 2)
+    assert data_y.dtype == torch.long
+    assert sorted(data_y.tolist()) == [0, 1]
+    # Tensors handed out keep their data; edits go to copies of the columns
+    dataset.move(7, 0.9, 0.9)
+    assert not torch.any(data_x == 0.9)
+    assert torch.any(dataset.tensors()[0] == 0.9)
+
+def test_published_rows_are_copy_on_write() -> None:
+    dataset = Dataset.from_points(
+        [{"x": 0.1 * i, "y": 0.0, "label": i % 2} for i in range(10)]
+    )
+    data_x, data_y = dataset.tensors()
+    before_x, before_y = data_x.clone(), data_y.clone()
+
+    # Removal moves the last point into the gap; the next add fills the row
+    # the removal freed, which the running view still covers
+    dataset.remove(3)
+    dataset.add(0.5, 0.5, 7)
+    assert torch.equal(data_x, before_x) and torch.equal(data_y, before_y)
+    assert dataset.tensors()[1].max() == 7
+
+    # Appends past the end of every view handed out need no copy
+    xy = dataset.xy
+    dataset.add(0.6, 0.6, 1)
+    assert dataset.xy is xy
+
+def test_from_arrays() -> None:
+    xy = np.random.default_rng(0).uniform(-1, 1, (1000, 2)).astype(np.float32)
+    labels = np.arange(1000) % 3
+    dataset = Dataset.from_arrays(xy, labels)
+    assert len(dataset) == 1000
+    assert dataset.class_counts == {0: 334, 1: 333, 2: 333}
+    assert np.array_equal(dataset.x, xy[:, 0])
+
+    assert dataset.remove(10)
+    assert dataset.add(0.0, 0.0, 5) == 1000
+    assert dataset.required_output_dim() == 6
+
+def test_point_ids_are_bounded() -> None:
+    dataset = Dataset()
+    with pytest.raises(ValueError):
+        dataset.add(0.0, 0.0, 0, point_id=MAX_POINT_ID)
+    with pytest.raises(ValueError):
+        dataset.add(0.0, 0.0, 0, point_id=-1)
+    assert len(dataset) == 0
+    assert dataset.add(0.0, 0.0, 0, point_id=100_000) == 100_000
+    assert 100_000 in dataset
@@ -0,0 +1,164 @@
+import zlib
+from typing import Dict
+
+import numpy as np
+import pytest
+from nnvisu.logic.frames import (
+    DELTA_HEADER, FLAG_ZLIB, FRAME_TYPE_DELTA, FRAME_TYPE_KEYFRAME, FRAME_TYPE_TICK,
+    KEYFRAME_HEADER, PIXEL_FORMAT_CODES, PIXEL_FORMAT_SHIFT, TICK_HEADER,
+    FrameEncoder, decode_tick, encode_tick
+)
+from nnvisu.logic.render import PIXEL_FORMATS
+
+WIDTH, HEIGHT = 40, 23
+
+def _image(value: int = 0, channels: int = 3) -> np.ndarray:
+    return np.full((HEIGHT, WIDTH, channels), value, dtype=np.uint8)
+
+def _channels(flags: int) -> int:
+    code = (flags >> PIXEL_FORMAT_SHIFT) & 0x03
+    name = next(name for name, value in PIXEL_FORMAT_CODES.items() if value == code)
+    return PIXEL_FORMATS[name]
+
+def _decode(message: bytes, frames: Dict[int, np.ndarray]) -> int:
+    """
+    Reference decoder (mirrors static/main.js); stores the frame and returns
+    its id.
+    """
+    if message[0] == FRAME_TYPE_KEYFRAME:
+        _, flags, frame_id, width, height = KEYFRAME_HEADER.unpack_from(message)
+        body = message[KEYFRAME_HEADER.size:]
+        if flags & FLAG_ZLIB:
+            body = zlib.decompress(body)
+        pixels = np.frombuffer(body, np.uint8)
+        frames[frame_id] = pixels.reshape(height, width, _channels(flags)).copy()
+        return frame_id
+
+    assert message[0] == FRAME_TYPE_DELTA
+    header = DELTA_HEADER.unpack_from(message)
+    _, flags, frame_id, base_id, width, height, ts, count = header
+    body = message[DELTA_HEADER.size:]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+    indices = np.frombuffer(body, "<u4", count=count)
+    tiles = np.frombuffer(body, np.uint8, offset=4 * count)
+    tiles = tiles.reshape(count, ts, ts, _channels(flags))
+    image = frames[base_id].copy()
+    tiles_x = -(-width // ts)
+    for index, tile in zip(indices, tiles):
+        y0, x0 = (index // tiles_x) * ts, (index % tiles_x) * ts
+        h, w = min(ts, height - y0), min(ts, width - x0)
+        image[y0:y0 + h, x0:x0 + w] = tile[:h, :w]
+    frames[frame_id] = image
+    return frame_id
+
+def test_keyframe_then_deltas_roundtrip() -> None:
+    encoder = FrameEncoder(["delta", "zlib"], tile_size=8)
+    frames: Dict[int, np.ndarray] = {}
+
+    image = _image(10)
+    first = encoder.encode(image.tobytes(), WIDTH, HEIGHT)
+    assert first is not None and first[0] == FRAME_TYPE_KEYFRAME
+    encoder.ack(_decode(first, frames))
+
+    # Change a small region on the bottom-right (partial) tile
+    image[20:23, 35:40] = 200
+    delta = encoder.encode(image.tobytes(), WIDTH, HEIGHT)
+    assert delta is not None and delta[0] == FRAME_TYPE_DELTA
+    frame_id = _decode(delta, frames)
+    assert (frames[frame_id] == image).all()
+    assert len(delta) < WIDTH * HEIGHT * 3 // 4
+
+    # Nothing changed against the base: nothing to send
+    encoder.ack(frame_id)
+    assert encoder.encode(image.tobytes(), WIDTH, HEIGHT) is None
+
+def test_deltas_use_last_acknowledged_frame() -> None:
+    encoder = FrameEncoder(["delta"], tile_size=8)
+    frames: Dict[int, np.ndarray] = {}
+    base_id = _decode(encoder.encode(_image().tobytes(), WIDTH, HEIGHT), frames)  # type: ignore[arg-type]
+    encoder.ack(base_id)
+
+    # Two frames in flight without acks: both are deltas against the same base
+    a = _image()
+    a[0:4, 0:4] = 50
+    b = a.copy()
+    b[10:12, 10:12] = 90
+    first = encoder.encode(a.tobytes(), WIDTH, HEIGHT)
+    second = encoder.encode(b.tobytes(), WIDTH, HEIGHT)
+    assert first is not None and second is not None
+    assert DELTA_HEADER.unpack_from(second)[3] == base_id
+
+    _decode(first, frames)
+    assert (frames[_decode(second, frames)] == b).all()
+
+def test_keyframes_for_resync() -> None:
+    encoder = FrameEncoder(["delta"], tile_size=8, keyframe_interval=3, max_unacked=4)
+    frames: Dict[int, np.ndarray] = {}
+    kinds = []
+    for i in range(6):
+        image = _image()
+        image[0, 0] = i
+        message = encoder.encode(image.tobytes(), WIDTH, HEIGHT)
+        assert message is not None
+        kinds.append(message[0])
+        encoder.ack(_decode(message, frames))
+    assert kinds == (
+        [FRAME_TYPE_KEYFRAME] + [FRAME_TYPE_DELTA] * 3 +
+        [FRAME_TYPE_KEYFRAME, FRAME_TYPE_DELTA]
+    )
+
+    encoder.request_keyframe()
+    assert encoder.encode(_image(1).tobytes(), WIDTH, HEIGHT)[0] == FRAME_TYPE_KEYFRAME  # type: ignore[index]
+
+    # A client that stops acknowledging falls back to keyframes
+    kinds = []
+    for i in range(5):
+        image = _image()
+        image[0, 0] = i + 20
+        message = encoder.encode(image.tobytes(), WIDTH, HEIGHT)
+        assert message is not None
+        kinds.append(message[0])
+    assert kinds == [FRAME_TYPE_DELTA] * 3 + [FRAME_TYPE_KEYFRAME] * 2
+
+def test_compression_only() -> None:
+    encoder = FrameEncoder(["zlib"])
+    assert encoder.describe()["encodings"] == ["zlib"]
+    message = encoder.encode(_image(7).tobytes(), WIDTH, HEIGHT)
+    assert message is not None and message[0] == FRAME_TYPE_KEYFRAME
+    assert len(message) < WIDTH * HEIGHT * 3
+    frames: Dict[int, np.ndarray] = {}
+    assert (frames[_decode(message, frames)] == _image(7)).all()
+
+def test_index_pixel_format() -> None:
+    encoder = FrameEncoder(["delta", "zlib"], pixel_format="index", tile_size=8)
+    assert encoder.describe()["pixel_format"] == "index"
+    frames: Dict[int, np.ndarray] = {}
+
+    image = _image(1, channels=2)
+    first = encoder.encode(image.tobytes(), WIDTH, HEIGHT)
+    assert first is not None
+    flags = KEYFRAME_HEADER.unpack_from(first)[1]
+    assert (flags >> PIXEL_FORMAT_SHIFT) == PIXEL_FORMAT_CODES["index"]
+    encoder.ack(_decode(first, frames))
+
+    image[5:9, 30:34] = (2, 255)
+    delta = encoder.encode(image.tobytes(), WIDTH, HEIGHT)
+    assert delta is not None and delta[0] == FRAME_TYPE_DELTA
+    assert (frames[_decode(delta, frames)] == image).all()
+
+def test_tick_bundles_map_and_weights() -> None:
+    encoder = FrameEncoder(["delta"])
+    map_frame = encoder.encode(_image(3).tobytes(), WIDTH, HEIGHT)
+    assert map_frame is not None
+    weights_frame = bytes([0x05]) + bytes(11)
+
+    tick = encode_tick(42, 0.25, map_frame, weights_frame)
+    assert tick[0] == FRAME_TYPE_TICK
+    assert len(tick) == TICK_HEADER.size + len(map_frame) + len(weights_frame)
+    assert decode_tick(tick) == (42, 0.25, map_frame, weights_frame)
+
+    # Metrics only
+    assert decode_tick(encode_tick(43, 0.5)) == (43, 0.5, None, None)
+    with pytest.raises(ValueError):
+        decode_tick(tick[:-1])
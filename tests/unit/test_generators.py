@@ -1,43 +1,55 @@
 import unittest
+
+import numpy as np
 from nnvisu.logic.generators import (
-    generate_circles, generate_moons, generate_blobs, 
+    GENERATORS, generate_circles, generate_moons, generate_blobs,
     generate_anisotropic, generate_varied_variance
 )
+from nnvisu.logic.dataset import Dataset
 
 class TestGenerators(unittest.TestCase):
+    def assertDataset(self, dataset, n_samples, n_classes=3):
+        xy, labels = dataset
+        self.assertEqual(xy.shape, (n_samples, 2))
+        self.assertEqual(xy.dtype, np.float32)
+        self.assertEqual(labels.shape, (n_samples,))
+        self.assertEqual(set(labels.tolist()), set(range(n_classes)))
+        # Points outside the canvas are redrawn
+        self.assertTrue((np.abs(xy) <= 1).all())
+
     def test_generate_circles(self):
-        data = generate_circles(n_samples=100, n_classes=3)
-        self.assertEqual(len(data), 100)
-        labels = [p['label'] for p in data]
-        self.assertEqual(set(labels), {0, 1, 2})
-        # Basic check for range
-        for p in data:
-            self.assertTrue(-2 <= p['x'] <= 2)
-            self.assertTrue(-2 <= p['y'] <= 2)
+        self.assertDataset(generate_circles(n_samples=100, n_classes=3), 100)
 
     def test_generate_moons(self):
-        data = generate_moons(n_samples=100, n_classes=3)
-        self.assertEqual(len(data), 100)
-        labels = [p['label'] for p in data]
-        self.assertEqual(set(labels), {0, 1, 2})
+        self.assertDataset(generate_moons(n_samples=100, n_classes=3), 100)
 
     def test_generate_blobs(self):
-        data = generate_blobs(n_samples=150, n_classes=3)
-        self.assertEqual(len(data), 150)
-        labels = [p['label'] for p in data]
-        self.assertEqual(set(labels), {0, 1, 2})
+        self.assertDataset(generate_blobs(n_samples=150, n_classes=3), 150)
 
     def test_generate_anisotropic(self):
-        data = generate_anisotropic(n_samples=150, n_classes=3)
-        self.assertEqual(len(data), 150)
-        labels = [p['label'] for p in data]
-        self.assertEqual(set(labels), {0, 1, 2})
+        self.assertDataset(generate_anisotropic(n_samples=150, n_classes=3), 150)
 
     def test_generate_varied_variance(self):
-        data = generate_varied_variance(n_samples=150, n_classes=3)
-        self.assertEqual(len(data), 150)
-        labels = [p['label'] for p in data]
-        self.assertEqual(set(labels), {0, 1, 2})
+        xy, labels = generate_varied_variance(n_samples=150, n_classes=3)
+        self.assertDataset((xy, labels), 150)
+        # Equal blocks per class
+        self.assertEqual(np.bincount(labels).tolist(), [50, 50, 50])
+
+    def test_seed_is_reproducible(self):
+        for name, generator in GENERATORS.items():
+            with self.subTest(name):
+                first = generator(n_samples=50, n_classes=4, seed=7)
+                second = generator(n_samples=50, n_classes=4, seed=7)
+                self.assertTrue(np.array_equal(first[0], second[0]))
+                self.assertTrue(np.array_equal(first[1], second[1]))
+
+    def test_large_dataset(self):
+        xy, labels = generate_circles(n_samples=200_000, n_classes=5, noise=0.2, seed=1)
+        self.assertDataset((xy, labels), 200_000, n_classes=5)
+        dataset = Dataset.from_arrays(xy, labels)
+        self.assertEqual(len(dataset), 200_000)
+        self.assertEqual(dataset.required_output_dim(), 5)
+        self.assertEqual(sum(dataset.class_counts.values()), 200_000)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,82 @@
+import numpy as np
+import torch
+from nnvisu.logic.history import (
+    FRAME_TYPE_HISTORY, HISTORY_HEADER, WeightHistory, copy_model
+)
+from nnvisu.logic.model import NeuralNetwork
+from nnvisu.logic.numpy_engine import NumpyNetwork
+from nnvisu.logic.render import RenderContext
+
+def test_snapshots_thin_out_geometrically() -> None:
+    history = WeightHistory(capacity=32)
+    model = NeuralNetwork(hidden_layers=[3])
+    for step in range(1, 1001):
+        history.record(model, step, 1.0 / step)
+    steps = history.steps()
+    assert len(steps) == 32
+    # The first and the latest steps are always kept
+    assert steps[0] == 1 and steps[-1] == 1000
+
+    gaps = np.diff(steps)
+    # Dense at the end, sparse at the start
+    assert gaps[-1] < gaps[0]
+    assert history.record(model, 1000, 0.0) is False
+
+def test_byte_budget() -> None:
+    model = NeuralNetwork(hidden_layers=[50])
+    size = sum(p.numel() for p in model.parameters()) * 2
+    history = WeightHistory(capacity=100, max_bytes=10 * size)
+    for step in range(50):
+        history.record(model, step, 0.0)
+    assert len(history) == 10
+    assert history.nbytes <= 10 * size
+
+def test_seek_renders_snapshot_at_any_resolution() -> None:
+    torch.manual_seed(0)
+    for model in (NeuralNetwork(hidden_layers=[6], output_dim=3, activation='relu'),
+                  NumpyNetwork(hidden_layers=[6], output_dim=3, activation='relu')):
+        history = WeightHistory()
+        history.record(model, 10, 0.5, 'relu')
+        reference = np.frombuffer(RenderContext(30, 20).render(model), np.uint8)[5:]
+
+        # Training goes on; the snapshot still shows step 10
+        model.adapt_output_layer(4)
+        history.record(model, 20, 0.25, 'relu')
+
+        frame = history.render(12, 30, 20)
+        assert frame is not None
+        kind, step, loss, width, height = HISTORY_HEADER.unpack_from(frame)
+        assert kind == FRAME_TYPE_HISTORY
+        assert (step, loss, width, height) == (10, 0.5, 30, 20)
+        pixels = np.frombuffer(frame, np.uint8, offset=HISTORY_HEADER.size)
+        # float16 weights change colors only slightly
+        assert np.abs(pixels.astype(int) - reference.astype(int)).mean() < 2.0
+
+        assert history.render(12, 30, 20) is frame
+        assert len(history.render(19, 64, 48)) == HISTORY_HEADER.size + 64 * 48 * 3  # type: ignore[arg-type]
+
+def test_empty_history() -> None:
+    history = WeightHistory()
+    assert history.render(0, 10, 10) is None
+    history.record(NeuralNetwork(), 1, 0.0)
+    history.clear()
+    assert history.nearest(1) is None
+
+def test_copy_model_is_exact_and_independent() -> None:
+    x = torch.tensor([[0.3, -0.2], [0.9, 0.1]])
+    models = (
+        NeuralNetwork(hidden_layers=[5], output_dim=3, activation='gelu', dropout=0.5),
+        NumpyNetwork(hidden_layers=[5], output_dim=3, activation='gelu'),
+    )
+    for model in models:
+        model.eval()
+        copy = copy_model(model)
+        assert torch.equal(copy(x), model(x))
+
+        # Training the original leaves the copy as it was
+        before = copy(x)
+        model.load_state_dict_from_arrays({
+            "weights": [w * 2 for w in model.get_state_dict_as_arrays()["weights"]]
+        })
+        assert torch.equal(copy(x), before)
+        assert not torch.equal(model(x), before)
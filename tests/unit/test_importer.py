@@ -0,0 +1,116 @@
+import io
+import os
+from pathlib import Path
+import numpy as np
+import pytest
+import torch
+from nnvisu.logic.importer import (
+    IMPORT_FORMAT_CSV, IMPORT_FORMAT_NPY, detect_format, evict_conversions,
+    fit_to_bounds, import_dataset, parse_points, preview_points
+)
+from nnvisu.logic.model import NeuralNetwork
+from nnvisu.logic.trainer import StatelessTrainer
+
+def _npy(array: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+def test_parse_csv_with_header() -> None:
+    raw = b"x,y,label,extra\n0.5,-1.5,1,a\n2,3,0,b\n"
+    assert detect_format(raw) == IMPORT_FORMAT_CSV
+    xy, labels = parse_points(raw, IMPORT_FORMAT_CSV)
+    assert xy.tolist() == [[0.5, -1.5], [2.0, 3.0]]
+    assert labels.tolist() == [1, 0]
+    assert labels.dtype == np.int64
+
+def test_parse_npy() -> None:
+    raw = _npy(np.array([[0.1, 0.2, 2], [0.3, 0.4, 0]]))
+    assert detect_format(raw) == IMPORT_FORMAT_NPY
+    xy, labels = parse_points(raw, IMPORT_FORMAT_NPY)
+    assert np.allclose(xy, [[0.1, 0.2], [0.3, 0.4]])
+    assert labels.tolist() == [2, 0]
+
+@pytest.mark.parametrize("raw", [
+    b"0,0,0.5\n",          # Fractional label
+    b"0,0,-1\n",           # Negative label
+    b"0,0,64\n",           # Too many classes
+    b"nan,0,0\n",          # Non-finite coordinate
+    b"0,0\n",              # Missing column
+])
+def test_invalid_files(raw: bytes) -> None:
+    with pytest.raises(ValueError):
+        parse_points(raw, IMPORT_FORMAT_CSV)
+
+def test_fit_to_bounds() -> None:
+    xy = fit_to_bounds(np.array([[10.0, 5.0], [30.0, 7.0], [20.0, 6.0]]))
+    # Uniform scaling keeps the aspect ratio
+    assert np.allclose(xy, [[-1.0, -0.1], [1.0, 0.1], [0.0, 0.0]])
+    assert np.allclose(fit_to_bounds(np.array([[3.0, 3.0]])), [[0.0, 0.0]])
+
+def test_import_is_memory_mapped_and_cached(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    n = 5000
+    array = np.column_stack([rng.normal(size=(n, 2)) * 50, rng.integers(0, 3, n)])
+    raw = _npy(array)
+
+    dataset = import_dataset(raw, tmp_path)
+    assert len(dataset) == n
+    assert isinstance(dataset.xy, np.memmap)
+    assert dataset.required_output_dim() == 3
+    assert np.abs(dataset.xy).max() <= 1.0
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # The same file reuses the conversion, other options get their own
+    again = import_dataset(raw, tmp_path)
+    assert np.array_equal(again.xy, dataset.xy)
+    import_dataset(raw, tmp_path, normalize=False)
+    assert len(list(tmp_path.iterdir())) == 2
+
+    preview = preview_points(dataset, 100)
+    assert len(preview) == 100
+    assert len({p["id"] for p in preview}) == 100
+
+    # Training samples straight from the mapping
+    model = NeuralNetwork(hidden_layers=[4], output_dim=3)
+    loss = StatelessTrainer().train_step(model, dataset, {"batchSize": 64})
+    assert np.isfinite(loss)
+
+def test_memory_mapped_edits_stay_in_memory(tmp_path: Path) -> None:
+    raw = b"0,0,0\n1,1,1\n"
+    dataset = import_dataset(raw, tmp_path, normalize=False)
+    dataset.move(0, 0.5, 0.5, 1)
+    dataset.remove(1)
+    new_id = dataset.add(0.2, 0.3, 2)
+    assert new_id == 2
+    assert len(dataset) == 2
+    assert dataset.required_output_dim() == 3
+    x, y = dataset.tensors()
+    assert torch.allclose(x, torch.tensor([[0.5, 0.5], [0.2, 0.3]]))
+
+    # The files still hold the imported points
+    fresh = import_dataset(raw, tmp_path, normalize=False)
+    assert fresh.xy.tolist() == [[0.0, 0.0], [1.0, 1.0]]
+    assert fresh.labels.tolist() == [0, 1]
+
+def test_least_recently_imported_are_evicted(tmp_path: Path) -> None:
+    files = [f"{i},0,0\n{i},1,1\n".encode() for i in range(3)]
+    for i, raw in enumerate(files[:2]):
+        import_dataset(raw, tmp_path)
+        # Distinct ages regardless of the file system's timestamp resolution
+        directory = max(tmp_path.iterdir(), key=lambda d: d.stat().st_mtime_ns)
+        os.utime(directory, (i, i))
+    first, second = sorted(tmp_path.iterdir(), key=lambda d: d.stat().st_mtime)
+    size = sum(path.stat().st_size for path in first.iterdir())
+
+    # Room for two conversions: the oldest one goes
+    import_dataset(files[2], tmp_path, max_bytes=2 * size)
+    remaining = set(tmp_path.iterdir())
+    assert len(remaining) == 2 and first not in remaining and second in remaining
+
+    # The newest conversion stays even when it alone is over the limit
+    evict_conversions(tmp_path, 0, keep=second)
+    assert list(tmp_path.iterdir()) == [second]
+
+    # An evicted file is converted again
+    assert len(import_dataset(files[0], tmp_path)) == 2
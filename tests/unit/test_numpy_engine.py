@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+import torch
+from torch import nn, optim
+from nnvisu.logic.engines import create_model, create_trainer
+from nnvisu.logic.model import NeuralNetwork
+from nnvisu.logic.numpy_engine import NumpyNetwork, NumpyOptimizer, NumpyTrainer
+
+def _paired_models(
+    activation: str, hidden_layers: list[int]
+) -> tuple[NeuralNetwork, NumpyNetwork]:
+    torch_model = NeuralNetwork(hidden_layers, output_dim=3, activation=activation)
+    numpy_model = NumpyNetwork(hidden_layers, output_dim=3, activation=activation)
+    numpy_model.load_state_dict_from_list(torch_model.get_state_dict_as_list())
+    return torch_model, numpy_model
+
+def _data() -> tuple[torch.Tensor, torch.Tensor]:
+    generator = torch.Generator().manual_seed(0)
+    X = torch.rand((16, 2), generator=generator) * 2 - 1  # noqa: N806
+    y = torch.randint(0, 3, (16,), generator=generator)
+    return X, y
+
+@pytest.mark.parametrize("activation", ["tanh", "relu", "leaky_relu", "gelu"])
+def test_forward_and_gradients_match_torch(activation: str) -> None:
+    torch_model, numpy_model = _paired_models(activation, [8, 6])
+    X, y = _data()  # noqa: N806
+
+    logits = numpy_model(X)
+    assert torch.allclose(logits, torch_model(X), atol=1e-5)
+
+    loss = numpy_model.loss_and_grad(X.numpy(), y.numpy())
+    torch_loss = nn.CrossEntropyLoss()(torch_model(X), y)
+    torch_loss.backward()
+    assert abs(loss - torch_loss.item()) < 1e-5
+
+    linears = [m for m in torch_model.net if isinstance(m, nn.Linear)]
+    for i, layer in enumerate(linears):
+        weight_grad, bias_grad = layer.weight.grad.numpy(), layer.bias.grad.numpy()
+        assert np.allclose(numpy_model.grad_weights[i], weight_grad, atol=1e-5)
+        assert np.allclose(numpy_model.grad_biases[i], bias_grad, atol=1e-5)
+
+@pytest.mark.parametrize("name, opt_class", [
+    ("sgd", optim.SGD), ("adam", optim.Adam), ("rmsprop", optim.RMSprop)
+])
+def test_optimizers_match_torch(name: str, opt_class: type) -> None:
+    torch_model, numpy_model = _paired_models("tanh", [5])
+    X, y = _data()  # noqa: N806
+
+    torch_opt = opt_class(torch_model.parameters(), lr=0.01, weight_decay=0.001)
+    numpy_opt = NumpyOptimizer(name, 0.01, 0.001, numpy_model.flat.shape[0])
+    for _ in range(5):
+        torch_opt.zero_grad()
+        nn.CrossEntropyLoss()(torch_model(X), y).backward()
+        torch_opt.step()
+        numpy_model.loss_and_grad(X.numpy(), y.numpy())
+        numpy_opt.step(numpy_model.flat, numpy_model.grad)
+
+    expected = torch_model.get_state_dict_as_list()
+    actual = numpy_model.get_state_dict_as_list()
+    for w_expected, w_actual in zip(expected["weights"], actual["weights"]):
+        assert np.allclose(w_expected, w_actual, atol=1e-5)
+
+def test_adapt_output_layer_preserves_hidden_layers() -> None:
+    model = NumpyNetwork(hidden_layers=[4], output_dim=2)
+    hidden = model.weights[0].copy()
+    head = model.weights[-1].copy()
+
+    model.adapt_output_layer(4)
+    assert model.dims == [2, 4, 4]
+    assert np.array_equal(model.weights[0], hidden)
+    assert np.array_equal(model.weights[-1][:2], head)
+
+def test_engine_selection() -> None:
+    assert isinstance(create_model("numpy", [5]), NumpyNetwork)
+    assert isinstance(create_model("torch", [5]), NeuralNetwork)
+    assert isinstance(create_model("unknown", [5]), NeuralNetwork)
+    assert isinstance(create_trainer("numpy"), NumpyTrainer)
+
+def test_numpy_trainer_reduces_loss() -> None:
+    trainer = NumpyTrainer()
+    model = NumpyNetwork(hidden_layers=[10, 10], output_dim=2)
+    X, _ = _data()  # noqa: N806
+    y = (X[:, 0] > 0).long()
+    config = {"learningRate": 0.05, "optimizer": "adam"}
+
+    first = trainer.train_step_stateful(model, (X, y), config)
+    for _ in range(200):
+        last = trainer.train_step_stateful(model, (X, y), config)
+    assert last < first
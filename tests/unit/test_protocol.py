@@ -0,0 +1,57 @@
+import json
+import re
+
+import numpy as np
+import pytest
+from nnvisu.protocol import (
+    SERVER_MESSAGE_SCHEMAS, ProtocolError, decode_message, encode_message,
+    validate_message
+)
+
+def test_valid_messages() -> None:
+    points = [{"x": i / 10, "y": 0, "label": i % 2} for i in range(10)]
+    message = decode_message(json.dumps({"type": "update_data", "data": points}))
+    assert message["data"] == points
+
+    # Optional fields may be left out, unknown extra keys are kept
+    assert decode_message(
+        '{"type": "update_architecture", "payload": {"hidden_layers": [3]}}'
+    )
+    step = decode_message('{"type": "train_step", "version": "a:1:2", "extra": 1}')
+    assert step["extra"] == 1
+    assert decode_message(b'{"type": "frame_format", "payload": {"weights": null}}')
+
+@pytest.mark.parametrize("raw,error", [
+    ('{"type": "update_data", "data": '
+     '[{"x": 0, "y": 0, "label": 0}, {"x": 0, "y": "1", "label": 0}]}',
+     "message.data[1].y: expected number"),
+    ('{"type": "update_data"}', "message.data: missing"),
+    ('{"type": "seek", "step": true}', "message.step: expected int"),
+    # Labels and class counts are bounded like those of imported files
+    ('{"type": "update_data", "data": [{"x": 0, "y": 0, "label": -1}]}',
+     "message.data[0].label: expected 0 to 63, got -1"),
+    ('{"type": "edit_points", "move": [{"id": 1, "x": 0, "y": 0, "label": 1000000}]}',
+     "message.move[0].label: expected 0 to 63"),
+    ('{"type": "generate_data", "distribution": "moons", "num_classes": 1000000}',
+     "message.num_classes: expected 1 to 64"),
+    ('{"type": "launch"}', "Unknown message type"),
+    ('[1, 2]', "string type"),
+    ('{"type": ', "Invalid JSON"),
+])
+def test_malformed_messages(raw: str, error: str) -> None:
+    with pytest.raises(ProtocolError, match=re.escape(error)):
+        decode_message(raw)
+
+def test_encode_numpy() -> None:
+    message = {
+        "type": "data_generated",
+        "data": [{"x": np.float32(0.5), "y": np.float64(-0.25), "label": np.int64(1)}],
+        "extra": np.arange(3, dtype=np.int32)
+    }
+    encoded = encode_message(message)
+    assert isinstance(encoded, bytes)
+    decoded = decode_message(encoded, SERVER_MESSAGE_SCHEMAS)
+    assert decoded["data"] == [{"x": 0.5, "y": -0.25, "label": 1}]
+    assert decoded["extra"] == [0, 1, 2]
+    # Server messages are validated against their own schemas
+    validate_message(message, SERVER_MESSAGE_SCHEMAS)
@@ -0,0 +1,188 @@
+import gc
+import zlib
+
+import numpy as np
+import pytest
+import torch
+from nnvisu.logic.model import NeuralNetwork
+from nnvisu.logic.numpy_engine import NumpyNetwork, NumpyTrainer
+from nnvisu.logic.render import (
+    AdaptiveRenderContext, MapRenderCache, MAP_CACHE, RenderContext, class_palette,
+    create_render_context, encode_png, grid_tensor, render_context_tag
+)
+from nnvisu.logic.trainer import StatefulTrainer
+
+DATA = (torch.tensor([[0.5, 0.5], [-0.5, -0.5]]), torch.tensor([0, 1]))
+
+def test_grid_and_palette_are_cached() -> None:
+    grid = grid_tensor(4, 3)
+    assert grid.shape == (12, 2)
+    assert grid_tensor(4, 3) is grid
+    # Top-left corner first
+    assert grid[0].tolist() == [-1.0, 1.0]
+
+    palette = class_palette(10)
+    assert palette.shape == (10, 3)
+    # Extra classes get the same colors every time
+    class_palette.cache_clear()
+    assert (class_palette(10) == palette).all()
+
+def test_map_is_recomputed_only_after_training() -> None:
+    MAP_CACHE.clear()
+    trainer = StatefulTrainer()
+    model = NeuralNetwork(hidden_layers=[5])
+
+    first = trainer.generate_map_frame(model, 20, 20)
+    assert trainer.generate_map_frame(model, 20, 20) is first
+    assert MAP_CACHE.hits == 1
+
+    # Another resolution is a separate entry
+    assert len(trainer.generate_binary_map(model, 10, 10)) == 10 * 10 * 3
+
+    version = model.version
+    trainer.train_step_stateful(model, DATA, {'learningRate': 0.5})
+    assert model.version == version + 1
+    assert trainer.generate_map_frame(model, 20, 20) is not first
+
+def test_cache_hits_allocate_no_context(monkeypatch: pytest.MonkeyPatch) -> None:
+    MAP_CACHE.clear()
+    trainer = StatefulTrainer()
+    model = NeuralNetwork(hidden_layers=[5])
+    first = trainer.generate_binary_map(model, 24, 24)
+
+    def no_context(*args: object) -> None:
+        raise AssertionError("a cache hit must not build a render context")
+    monkeypatch.setattr("nnvisu.logic.trainer.RenderContext", no_context)
+    assert trainer.generate_binary_map(model, 24, 24) == first
+    assert MAP_CACHE.hits == 1
+    assert render_context_tag(True) == AdaptiveRenderContext(4, 4).tag
+
+def test_structural_changes_bump_version() -> None:
+    for model in (NeuralNetwork(hidden_layers=[3]), NumpyNetwork(hidden_layers=[3])):
+        version = model.version
+        model.adapt_output_layer(3)
+        assert model.version > version
+
+        version = model.version
+        model.load_state_dict_from_list(model.get_state_dict_as_list())
+        assert model.version > version
+
+def test_numpy_trainer_bumps_version() -> None:
+    trainer = NumpyTrainer()
+    model = NumpyNetwork(hidden_layers=[3])
+    trainer.train_steps_fused(model, DATA[0], DATA[1], 1, {}, num_steps=5)
+    assert model.version == 5
+
+def test_cache_is_bounded_and_follows_model_lifetime() -> None:
+    cache = MapRenderCache(max_frames_per_model=2)
+    model = NeuralNetwork(hidden_layers=[2])
+    for version in range(3):
+        cache.put(model, (version, 1, 1, 2), bytes([version]))
+    assert cache.get(model, (0, 1, 1, 2)) is None
+    assert cache.get(model, (2, 1, 1, 2)) == bytes([2])
+
+    del model
+    gc.collect()
+    assert len(cache.frames) == 0
+
+def test_render_context_matches_reference() -> None:
+    model = NeuralNetwork(hidden_layers=[4], output_dim=3)
+    context = RenderContext(8, 6)
+    frame = context.render(model)
+    assert isinstance(frame, memoryview)
+    assert bytes(frame[:5]) == bytes([0x01, 8, 0, 6, 0])
+
+    with torch.no_grad():
+        probs = torch.softmax(model(grid_tensor(8, 6)), dim=1).double()
+    expected = (probs @ torch.from_numpy(class_palette(3)).double()).numpy()
+    pixels = np.frombuffer(context.rgb(), dtype=np.uint8).reshape(-1, 3)
+    # float32 blending may round differently by one level
+    assert np.abs(pixels.astype(np.int64) - expected.astype(np.int64)).max() <= 1
+
+    # The buffer is reused for the next render
+    assert context.render(model).obj is frame.obj
+
+def test_adaptive_render_refines_near_boundaries() -> None:
+    torch.manual_seed(0)
+    model = NeuralNetwork(hidden_layers=[8], output_dim=3)
+    dense = RenderContext(97, 64)
+    adaptive = AdaptiveRenderContext(97, 64, coarse_step=8, threshold=0.05)
+
+    reference = np.frombuffer(dense.render(model), dtype=np.uint8)[5:].astype(np.int64)
+    frame = adaptive.render(model)
+    assert bytes(frame[:5]) == bytes(dense.view[:5])
+    assert 0 < adaptive.evaluated < 97 * 64
+
+    pixels = np.frombuffer(frame, dtype=np.uint8)[5:].astype(np.int64)
+    # Interpolated regions are smooth, so colors stay close to the exact map
+    assert np.abs(pixels - reference).mean() < 2.0
+
+def test_adaptive_render_without_threshold_is_exact() -> None:
+    model = NeuralNetwork(hidden_layers=[4], output_dim=2)
+    # A negative threshold refines every cell down to single pixels
+    adaptive = AdaptiveRenderContext(20, 13, coarse_step=4, threshold=-1.0)
+    frame = bytes(adaptive.render(model))
+    assert adaptive.evaluated == 20 * 13
+
+    reference = bytes(RenderContext(20, 13).render(model))
+    pixels = np.frombuffer(frame, np.uint8).astype(int)
+    diff = np.abs(pixels - np.frombuffer(reference, np.uint8).astype(int))
+    assert diff.max() <= 1
+
+def test_render_cache_separates_renderers() -> None:
+    MAP_CACHE.clear()
+    trainer = StatefulTrainer()
+    model = NeuralNetwork(hidden_layers=[3])
+    trainer.generate_map_frame(model, 16, 16, RenderContext(16, 16))
+    trainer.generate_map_frame(model, 16, 16, AdaptiveRenderContext(16, 16))
+    assert MAP_CACHE.hits == 0
+
+def test_quantized_pixel_formats() -> None:
+    torch.manual_seed(1)
+    model = NeuralNetwork(hidden_layers=[6], output_dim=4)
+    with torch.no_grad():
+        probs = torch.softmax(model(grid_tensor(12, 9)), dim=1)
+    top = torch.topk(probs, 2, dim=1)
+
+    index = RenderContext(12, 9, pixel_format="index")
+    pixels = np.frombuffer(index.render(model), np.uint8)[5:].reshape(-1, 2)
+    assert (pixels[:, 0] == top.indices[:, 0].numpy()).all()
+    confidence = np.round(top.values[:, 0].numpy() * 255)
+    assert np.abs(pixels[:, 1] - confidence).max() <= 1
+    # The winner of four classes has at least a quarter of the mass
+    assert pixels[:, 1].min() >= 255 // 4
+
+    top2 = RenderContext(12, 9, pixel_format="top2")
+    top2.render(model)
+    pixels = np.frombuffer(top2.data(), np.uint8).reshape(-1, 3)
+    assert (pixels[:, :2] == top.indices.numpy()).all()
+    # The first class always has at least half of the top-2 mixture
+    assert pixels[:, 2].min() >= 127
+    assert len(top2.data()) == 12 * 9 * 3
+
+    adaptive = create_render_context(12, 9, adaptive=True, pixel_format="top2")
+    assert adaptive.tag != top2.tag
+    adaptive.render(model)
+    assert len(adaptive.data()) == 12 * 9 * 3
+
+def test_viewport_and_png() -> None:
+    model = NeuralNetwork(hidden_layers=[4], output_dim=2)
+    # The top-right quadrant of the default map, at twice the resolution
+    full = RenderContext(21, 21)
+    full.render(model)
+    zoomed = RenderContext(21, 21, bounds=(0.0, 1.0, 0.0, 1.0))
+    zoomed.render(model)
+    assert zoomed.tag != full.tag
+    a = np.frombuffer(full.rgb(), np.uint8).reshape(21, 21, 3)[:11, 10:]
+    b = np.frombuffer(zoomed.rgb(), np.uint8).reshape(21, 21, 3)[::2, ::2]
+    assert np.abs(a.astype(int) - b.astype(int)).max() <= 1
+
+    png = encode_png(full.rgb(), 21, 21)
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
+    # Single IDAT chunk right after IHDR (8 + 25 bytes)
+    length = int.from_bytes(png[33:37], 'big')
+    assert png[37:41] == b"IDAT"
+    rows = np.frombuffer(zlib.decompress(png[41:41 + length]), np.uint8)
+    rows = rows.reshape(21, 1 + 21 * 3)
+    assert (rows[:, 0] == 0).all()
+    assert rows[:, 1:].tobytes() == bytes(full.rgb())
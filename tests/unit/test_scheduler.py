@@ -0,0 +1,72 @@
+from typing import Callable
+
+from nnvisu.logic.scheduler import TrainingScheduler
+from nnvisu.logic.session import TrainingSession
+from nnvisu.logic.trainer import StatefulTrainer
+
+def test_admission_control_queues_sessions(
+    make_session: Callable[[], TrainingSession], wait_for_metric: Callable[..., bool]
+) -> None:
+    scheduler = TrainingScheduler(workers=2, max_active=1)
+    first, second = make_session(), make_session()
+    try:
+        scheduler.start(first, StatefulTrainer())
+        scheduler.start(second, StatefulTrainer())
+
+        assert scheduler.queue_position(first) is None
+        assert scheduler.queue_position(second) == 1
+        assert wait_for_metric(first, scheduler)
+        assert second.step_queue.empty()
+
+        # Freeing the slot admits the queued session
+        scheduler.stop(first)
+        assert scheduler.queue_position(second) is None
+        assert wait_for_metric(second, scheduler)
+    finally:
+        scheduler.stop(second)
+        scheduler.shutdown()
+
+def test_sessions_share_workers(
+    make_session: Callable[[], TrainingSession], wait_for_metric: Callable[..., bool]
+) -> None:
+    scheduler = TrainingScheduler(workers=1, max_active=4)
+    sessions = [make_session() for _ in range(3)]
+    try:
+        for session in sessions:
+            scheduler.start(session, StatefulTrainer())
+        # A single worker still serves every admitted session
+        for session in sessions:
+            assert wait_for_metric(session, scheduler)
+    finally:
+        for session in sessions:
+            scheduler.stop(session)
+        scheduler.shutdown()
+
+def test_converged_sessions_release_their_slot(
+    make_session: Callable[[], TrainingSession], wait_for_metric: Callable[..., bool]
+) -> None:
+    scheduler = TrainingScheduler(workers=2, max_active=1)
+    first, second = make_session(), make_session()
+    # Converges after a few steps, then throttles to one step per 10 s
+    first.update_config(
+        {'plateauWindow': 4, 'plateauTolerance': 1e9, 'idleInterval': 10.0}
+    )
+    try:
+        scheduler.start(first, StatefulTrainer())
+        scheduler.start(second, StatefulTrainer())
+
+        # The converged session lets the queued one run
+        assert wait_for_metric(second, scheduler)
+        assert first.converged
+        assert scheduler.queue_position(second) is None
+
+        # A change wakes the converged session, which queues up again
+        first.update_config({'onPlateau': 'continue'})
+        scheduler.stop(second)
+        while not first.step_queue.empty():
+            first.step_queue.get()
+        assert wait_for_metric(first, scheduler)
+    finally:
+        scheduler.stop(first)
+        scheduler.stop(second)
+        scheduler.shutdown()
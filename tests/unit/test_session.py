@@ -0,0 +1,156 @@
+import threading
+import time
+
+import torch
+from nnvisu.logic.dataset import Dataset
+from nnvisu.logic.model import NeuralNetwork
+from nnvisu.logic.session import TrainingSession
+from nnvisu.logic.trainer import PlateauDetector, StatefulTrainer
+
+def test_set_data_builds_tensors() -> None:
+    session = TrainingSession()
+    assert session.data_x.shape == (0, 2)
+    assert session.data_version == 0
+
+    session.set_data(Dataset.from_points([
+        {'x': 0.1, 'y': 0.2, 'label': 0},
+        {'x': -0.3, 'y': 0.4, 'label': 2},
+    ]))
+
+    assert session.data_x.dtype == torch.float32
+    assert session.data_y.dtype == torch.long
+    assert session.data_x.shape == (2, 2)
+    assert session.data_y.tolist() == [0, 2]
+    assert session.data_version == 1
+
+    session.set_data(Dataset())
+    assert session.data_x.shape == (0, 2)
+    assert session.data_version == 2
+
+def test_edit_points() -> None:
+    session = TrainingSession()
+    session.set_data(Dataset.from_points([
+        {'x': 0.0, 'y': 0.0, 'label': 0}, {'x': 0.5, 'y': 0.5, 'label': 1}
+    ]))
+    ids = [p['id'] for p in session.dataset.to_points()]
+
+    required = session.edit_points(
+        add=[{'id': 10, 'x': -0.5, 'y': 0.5, 'label': 3}],
+        remove=[ids[0], 99],
+        move=[{'id': ids[1], 'x': 0.25, 'y': 0.25}]
+    )
+    assert required == 4
+    assert session.data_version == 2
+    assert sorted(session.data_y.tolist()) == [1, 3]
+    positions = {p['id']: (p['x'], p['y']) for p in session.dataset.to_points()}
+    assert positions[ids[1]] == (0.25, 0.25)
+
+    assert session.edit_points(remove=[10]) == 2
+    assert session.data_x.shape == (1, 2)
+
+    # Clearing removes points whatever their ids; adds apply afterwards
+    assert session.edit_points(clear=True, add=[{'x': 0.1, 'y': 0.1, 'label': 2}]) == 3
+    assert session.data_y.tolist() == [2]
+    assert session.edit_points(clear=True) == 2
+    assert len(session.dataset) == 0 and session.data_x.shape == (0, 2)
+
+def test_tensors_are_views_of_the_dataset() -> None:
+    session = TrainingSession()
+    session.set_data(Dataset.from_points([{'x': 0.5, 'y': -0.5, 'label': 1, 'id': 3}]))
+    assert torch.allclose(session.data_x, torch.tensor([[0.5, -0.5]]))
+    assert session.data_y.tolist() == [1]
+
+    previous = session.data_x
+    session.edit_points(move=[{'id': 3, 'x': 0.25, 'y': 0.0}])
+    data_x = session.data_x
+    assert data_x.data_ptr() == session.dataset.xy.ctypes.data
+    assert torch.allclose(data_x, torch.tensor([[0.25, 0.0]]))
+    # An iteration still holding the previous tensors keeps its data
+    assert torch.allclose(previous, torch.tensor([[0.5, -0.5]]))
+
+def test_train_step_accepts_tensors() -> None:
+    trainer = StatefulTrainer()
+    model = NeuralNetwork(hidden_layers=[5], output_dim=2)
+    session = TrainingSession()
+    points = [{'x': 0.1 * i, 'y': -0.1 * i, 'label': i % 2} for i in range(8)]
+    session.set_data(Dataset.from_points(points))
+
+    data_x, data_y, _ = session.get_tensors()
+    loss = trainer.train_step_stateful(model, (data_x, data_y), {'batchSize': 4})
+    assert isinstance(loss, float)
+
+def test_plateau_detector() -> None:
+    detector = PlateauDetector(window=4, tolerance=0.01)
+    # Not enough losses yet
+    assert not detector.update(1.0)
+    assert not detector.update(0.8)
+    assert not detector.update(0.6)
+    # Still improving: older half 0.9, newer half 0.5
+    assert not detector.update(0.4)
+    for _ in range(4):
+        flat = detector.update(0.4)
+    assert flat
+
+    detector.reset()
+    assert not detector.update(0.4)
+
+def test_session_converges_and_wakes_on_change() -> None:
+    session = TrainingSession()
+    session.update_config({'plateauWindow': 4})
+    assert session.plateau_action() is None
+
+    for _ in range(4):
+        converged = session.record_loss(0.01)
+    assert converged
+    assert session.plateau_action() == 'throttle'
+    assert not session.wait_for_wake(timeout=0.01)
+
+    session.update_config({'onPlateau': 'pause'})
+    assert not session.converged
+    assert session.wait_for_wake(timeout=0.01)
+
+    for _ in range(4):
+        session.record_loss(0.01)
+    assert session.plateau_action() == 'pause'
+    session.set_data(Dataset.from_points([{'x': 0.0, 'y': 0.0, 'label': 0}]))
+    assert session.plateau_action() is None
+
+def test_plateau_detection_can_be_disabled() -> None:
+    session = TrainingSession()
+    session.update_config({'plateauWindow': 2, 'onPlateau': 'continue'})
+    for _ in range(10):
+        assert not session.record_loss(0.01)
+
+def test_wait_for_wake_returns_on_stop() -> None:
+    session = TrainingSession()
+    session.wake_event.clear()
+    session.stop_event.set()
+    assert not session.wait_for_wake()
+
+def test_run_loop_throttles_converged_session() -> None:
+    session = TrainingSession()
+    session.set_model(NeuralNetwork(hidden_layers=[4]))
+    session.set_data(Dataset.from_points([
+        {'x': 0.5, 'y': 0.5, 'label': 0}, {'x': -0.5, 'y': -0.5, 'label': 1}
+    ]))
+    # A huge tolerance converges after the first full window
+    session.update_config(
+        {'plateauWindow': 4, 'plateauTolerance': 1e9, 'idleInterval': 10.0}
+    )
+
+    trainer = StatefulTrainer()
+    t = threading.Thread(target=trainer.run_loop, args=(session,))
+    t.start()
+    deadline = time.time() + 5.0
+    while not session.converged and time.time() < deadline:
+        time.sleep(0.01)
+    assert session.converged
+
+    steps = session.step_queue.qsize()
+    time.sleep(0.3)
+    # Throttled to one iteration per idle interval
+    assert session.step_queue.qsize() <= steps + 1
+
+    session.stop_event.set()
+    t.join(timeout=1.0)
+    assert not t.is_alive()
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import torch
+from nnvisu.logic.model import NeuralNetwork
+from nnvisu.logic.numpy_engine import NumpyNetwork
+from nnvisu.logic.weights import (
+    FRAME_TYPE_WEIGHTS, WEIGHTS_HEADER, decode_weights, encode_weights
+)
+
+def _max_error(a: dict, b: dict) -> float:
+    return max(
+        float(np.abs(x - y).max())
+        for key in ("weights", "biases") for x, y in zip(a[key], b[key])
+    )
+
+@pytest.mark.parametrize(
+    "dtype,tolerance", [("f32", 0.0), ("f16", 1e-3), ("int8", 1e-2)]
+)
+def test_roundtrip(dtype: str, tolerance: float) -> None:
+    model = NeuralNetwork(hidden_layers=[7, 3], output_dim=4)
+    state = model.get_state_dict_as_arrays()
+    frame = encode_weights(state, dtype, step=123)
+    assert frame[0] == FRAME_TYPE_WEIGHTS
+
+    decoded, step = decode_weights(frame)
+    assert step == 123
+    assert [w.shape for w in decoded["weights"]] == [(7, 2), (3, 7), (4, 3)]
+    assert [b.shape for b in decoded["biases"]] == [(7,), (3,), (4,)]
+    assert _max_error(state, decoded) <= tolerance
+
+def test_binary_frames_are_compact() -> None:
+    model = NeuralNetwork(hidden_layers=[100] * 3)
+    state = model.get_state_dict_as_arrays()
+    params = sum(p.numel() for p in model.parameters())
+    # Header and layer sizes (padded) only add a few bytes
+    assert len(encode_weights(state, "f32")) == WEIGHTS_HEADER.size + 12 + 4 * params
+    assert len(encode_weights(state, "f16")) < 2 * params + 32
+    assert len(encode_weights(state, "int8")) < params + 64
+
+def test_load_from_arrays() -> None:
+    x = torch.tensor([[0.3, -0.2], [0.9, 0.1]])
+    pairs = (
+        (NeuralNetwork([5]), NeuralNetwork([5])),
+        (NumpyNetwork([5]), NumpyNetwork([5])),
+    )
+    for source, target in pairs:
+        decoded, _ = decode_weights(encode_weights(source.get_state_dict_as_arrays()))
+        version = target.version
+        target.load_state_dict_from_arrays(decoded)
+        assert target.version > version
+        assert torch.allclose(source(x), target(x))
+
+def test_invalid_frame() -> None:
+    with pytest.raises(ValueError):
+        decode_weights(bytes([0x01, 0, 1, 0, 0, 0, 0, 0]))